@@ -0,0 +1,57 @@
+"""
+Preallocated capture buffer for recorded audio
+"""
+import numpy as np
+
+
+class AudioBuffer:
+    """Fixed-capacity float32 arena that recorded chunks are written into.
+
+    Multi-channel chunks are downmixed straight into the arena, so no
+    intermediate copies are made, and view() returns the recorded audio without
+    copying. The arena is allocated with np.empty, so the OS only commits pages
+    as they are written and short recordings stay cheap even with a large
+    capacity.
+    """
+
+    def __init__(self, capacity: int, downmix: str = "first"):
+        if downmix not in ("first", "mean"):
+            raise ValueError(f"Unknown downmix mode: {downmix}")
+        self.capacity = capacity
+        self.downmix = downmix
+        self._data = np.empty(capacity, dtype=np.float32)
+        self._length = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def remaining(self) -> int:
+        """Samples that can still be written"""
+        return self.capacity - self._length
+
+    @property
+    def full(self) -> bool:
+        return self._length >= self.capacity
+
+    def write(self, chunk: np.ndarray) -> np.ndarray:
+        """Write a (frames,) or (frames, channels) chunk, returning a view of the mono samples written.
+
+        Frames beyond the remaining capacity are discarded.
+        """
+        frames = min(len(chunk), self.remaining)
+        dest = self._data[self._length:self._length + frames]
+
+        if chunk.ndim == 1:
+            np.copyto(dest, chunk[:frames], casting="unsafe")
+        elif self.downmix == "mean" and chunk.shape[1] > 1:
+            np.mean(chunk[:frames], axis=1, out=dest)
+        else:
+            np.copyto(dest, chunk[:frames, 0], casting="unsafe")
+
+        self._length += frames
+        return dest
+
+    def view(self) -> np.ndarray:
+        """Zero-copy view of everything recorded so far"""
+        return self._data[:self._length]
@@ -0,0 +1,64 @@
+"""
+Audio file decoding and encoding using PyAV
+"""
+from typing import BinaryIO, Iterator, Union
+
+import av
+import numpy as np
+
+
+def iter_audio_file(path: Union[str, BinaryIO], sample_rate: int = 16000) -> Iterator[np.ndarray]:
+    """Decode a file (path or file object) frame by frame, yielding mono float32 blocks at sample_rate"""
+    resampler = av.AudioResampler(format="flt", layout="mono", rate=sample_rate)
+    
+    with av.open(path) as container:
+        stream = container.streams.audio[0]
+        stream.thread_type = "AUTO"
+        
+        for frame in container.decode(stream):
+            frame.pts = None
+            for resampled in resampler.resample(frame):
+                yield resampled.to_ndarray().reshape(-1)
+                
+        # Drain samples still buffered in the resampler
+        for resampled in resampler.resample(None):
+            yield resampled.to_ndarray().reshape(-1)
+
+
+def load_audio_file(path: Union[str, BinaryIO], sample_rate: int = 16000) -> np.ndarray:
+    """Decode a whole file into one mono float32 array"""
+    blocks = list(iter_audio_file(path, sample_rate))
+    if not blocks:
+        return np.zeros(0, dtype=np.float32)
+    return np.concatenate(blocks)
+
+
+# Container and encoder for each supported compressed format
+ENCODINGS = {
+    "flac": ("flac", "flac"),
+    "opus": ("ogg", "libopus"),
+}
+
+
+def encode_audio_file(path: str, audio: np.ndarray, sample_rate: int = 16000,
+                      encoding: str = "flac", bit_rate: int = 24000, block_size: int = 4096):
+    """Encode mono float32 samples to a compressed file (lossless FLAC or Opus)"""
+    container_format, codec = ENCODINGS[encoding]
+    
+    with av.open(path, "w", format=container_format) as container:
+        stream = container.add_stream(codec, rate=sample_rate)
+        stream.layout = "mono"
+        if encoding == "opus":
+            stream.bit_rate = bit_rate
+            
+        # PyAV converts each frame to the encoder's sample format and frame size
+        for start in range(0, len(audio), block_size):
+            block = np.ascontiguousarray(audio[start:start + block_size], dtype=np.float32)
+            frame = av.AudioFrame.from_ndarray(block.reshape(1, -1), format="flt", layout="mono")
+            frame.sample_rate = sample_rate
+            frame.pts = start
+            for packet in stream.encode(frame):
+                container.mux(packet)
+                
+        for packet in stream.encode(None):
+            container.mux(packet)
@@ -4,107 +4,274 @@ Global hotkey handling using keyboard library
 import asyncio
 import logging
 import threading
-from typing import Dict, Callable, Optional
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
 import keyboard
 
+# Key names reported by keyboard that should match the same chord key
+KEY_ALIASES = {
+    "control": "ctrl", "left ctrl": "ctrl", "right ctrl": "ctrl",
+    "left alt": "alt", "right alt": "alt", "alt gr": "alt", "option": "alt",
+    "left shift": "shift", "right shift": "shift",
+    "left windows": "windows", "right windows": "windows", "win": "windows",
+    "cmd": "windows", "command": "windows", "super": "windows",
+    "return": "enter", "escape": "esc", "del": "delete",
+}
+
+# Always tracked, so a chord only matches when no other modifier is held
+MODIFIERS = ("ctrl", "alt", "shift", "windows")
+
+
+class Binding(NamedTuple):
+    """A compiled hotkey: the chord's key bitmask and what it triggers"""
+    action: str               # toggle, hold, cancel, reprocess or mode
+    chord: str
+    mask: int
+    arg: Optional[str] = None  # Processing mode for mode bindings
+
+
+class ChordMatcher:
+    """Compiled chord state machine.
+
+    Every key used by a binding, plus the standard modifiers, gets one bit; the
+    keys currently held are a bitmask. A key-down that changes the mask looks the
+    new mask up in a dict, so matching is constant time per event however many
+    bindings there are, and other keys are discarded with a single dict miss.
+    Because the modifiers are always in the mask, ctrl+shift+alt+t does not fire
+    a ctrl+shift+t binding. Left and right modifiers share a bit that is only
+    cleared once neither side is held. OS auto-repeat does not change the mask
+    and so never retriggers; a chord that fires again within debounce seconds is
+    ignored. Hold bindings end when any of their keys is released.
+    """
+    
+    def __init__(self, chords: List[Tuple[str, str, Optional[str]]], debounce: float = 0.15):
+        self.debounce = debounce
+        self.bits: Dict[str, int] = {}
+        self.bindings: Dict[int, Binding] = {}
+        
+        for action, chord, arg in chords:
+            mask = 0
+            for key in self.parse_chord(chord):
+                if key not in self.bits:
+                    self.bits[key] = 1 << len(self.bits)
+                mask |= self.bits[key]
+            if mask in self.bindings:
+                raise ValueError(f"Hotkey {chord} is bound to both {self.bindings[mask].action} and {action}")
+            self.bindings[mask] = Binding(action, chord, mask, arg)
+        for key in MODIFIERS:
+            if key not in self.bits:
+                self.bits[key] = 1 << len(self.bits)
+            
+        # Resolve every alias to its bit up front so events need one lookup
+        for alias, key in KEY_ALIASES.items():
+            if key in self.bits:
+                self.bits[alias] = self.bits[key]
+                
+        self.state = 0
+        self.held: Dict[str, int] = {}  # Physical key name -> bit, for keys currently down
+        self.active_holds: Dict[int, Binding] = {}
+        self._last_fired: Dict[int, float] = {}
+        
+    @staticmethod
+    def parse_chord(chord: str) -> List[str]:
+        keys = [KEY_ALIASES.get(part.strip().lower(), part.strip().lower()) for part in chord.split("+")]
+        if not all(keys):
+            raise ValueError(f"Invalid hotkey: {chord!r}")
+        return keys
+        
+    def bit(self, name: Optional[str]) -> Optional[int]:
+        if not name:
+            return None
+        bit = self.bits.get(name)
+        if bit is None:
+            bit = self.bits.get(name.lower())  # Shifted letters arrive upper-case
+        return bit
+        
+    def key_down(self, name: Optional[str], now: float) -> Optional[Binding]:
+        """Update the key state; return the binding whose chord was just completed"""
+        bit = self.bit(name)
+        if bit is None:
+            return None  # Untracked key
+        name = name.lower()
+        if name in self.held:
+            return None  # Auto-repeat
+        self.held[name] = bit
+        if self.state & bit:
+            return None  # The other side of this modifier is already down
+        self.state |= bit
+        
+        binding = self.bindings.get(self.state)
+        if binding is None:
+            return None
+        last = self._last_fired.get(binding.mask)
+        if last is not None and now - last < self.debounce:
+            return None
+        self._last_fired[binding.mask] = now
+        if binding.action == "hold":
+            self.active_holds[binding.mask] = binding
+        return binding
+        
+    def key_up(self, name: Optional[str]) -> List[Binding]:
+        """Update the key state; return hold bindings that this release ended"""
+        bit = self.bit(name)
+        if bit is None:
+            return []
+        self.held.pop(name.lower(), None)
+        if bit in self.held.values():
+            return []  # The other side of this modifier is still down
+        self.state &= ~bit
+        if not self.active_holds:
+            return []
+        ended = [binding for mask, binding in self.active_holds.items() if mask & bit]
+        for binding in ended:
+            del self.active_holds[binding.mask]
+        return ended
+
 
 class HotkeyManager:
-    def __init__(self, hotkey_config: Dict[str, str]):
+    def __init__(self, hotkey_config: Dict[str, Any], metrics=None):
         self.hotkey_config = hotkey_config
         self.logger = logging.getLogger(__name__)
+        self.metrics = metrics  # Optional utils.metrics.Metrics for hook/dispatch latency
         
         self.toggle_callback: Optional[Callable] = None
         self.hold_start_callback: Optional[Callable] = None
         self.hold_end_callback: Optional[Callable] = None
+        self.cancel_callback: Optional[Callable] = None
+        self.reprocess_callback: Optional[Callable] = None
+        self.mode_callback: Optional[Callable] = None
         
-        self.hold_key_pressed = False
+        self.matcher = ChordMatcher(self._chords(), hotkey_config.get("debounce_ms", 150) / 1000)
         self.hotkeys_registered = False
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.counters = {"events": 0, "dispatched": 0}
+        
+    def _chords(self) -> List[Tuple[str, str, Optional[str]]]:
+        """(action, chord, arg) for every configured binding"""
+        chords = []
+        for action in ("toggle", "hold", "cancel", "reprocess"):
+            if self.hotkey_config.get(action):
+                chords.append((action, self.hotkey_config[action], None))
+        for chord, mode in (self.hotkey_config.get("modes") or {}).items():
+            chords.append(("mode", chord, mode))
+        return chords
         
-    def set_callbacks(self, toggle_callback: Callable = None, 
+    def set_callbacks(self, toggle_callback: Callable = None,
                      hold_start_callback: Callable = None,
-                     hold_end_callback: Callable = None):
-        """Set the callback functions for hotkey events"""
+                     hold_end_callback: Callable = None,
+                     cancel_callback: Callable = None,
+                     reprocess_callback: Callable = None,
+                     mode_callback: Callable = None):
+        """Set the callback functions for hotkey events.
+
+        Every callback is called with event_at, the time.monotonic() of the key
+        event; mode_callback also receives the mode name.
+        """
         self.toggle_callback = toggle_callback
         self.hold_start_callback = hold_start_callback
         self.hold_end_callback = hold_end_callback
+        self.cancel_callback = cancel_callback
+        self.reprocess_callback = reprocess_callback
+        self.mode_callback = mode_callback
+        
+    def _run_async_callback(self, callback, *args, event_at: Optional[float] = None):
+        """Schedule an async callback on the application event loop, passing it event_at"""
+        if event_at is None:
+            event_at = time.monotonic()
+        self.counters["dispatched"] += 1
         
-    def _run_async_callback(self, callback):
-        """Run an async callback in a new thread"""
+        async def timed_callback():
+            # Key event until the callback runs: hook delivery plus loop scheduling
+            if self.metrics is not None:
+                self.metrics.observe("hotkey_dispatch", time.monotonic() - event_at)
+            await callback(*args, event_at=event_at)
+            
+        if self.loop is not None and self.loop.is_running():
+            future = asyncio.run_coroutine_threadsafe(timed_callback(), self.loop)
+            future.add_done_callback(self._log_callback_error)
+            return
+            
+        # No application loop (standalone use) - run the callback in its own thread
         def run_callback():
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
-            loop.run_until_complete(callback())
+            loop.run_until_complete(timed_callback())
             loop.close()
             
         threading.Thread(target=run_callback, daemon=True).start()
         
-    def _on_toggle_hotkey(self):
-        """Handle toggle hotkey"""
-        self.logger.info("🔄 Toggle hotkey detected!")
-        if self.toggle_callback:
-            self._run_async_callback(self.toggle_callback)
+    def _log_callback_error(self, future):
+        """Log exceptions raised by callbacks scheduled on the event loop"""
+        if not future.cancelled() and future.exception() is not None:
+            self.logger.error(f"Hotkey callback failed: {future.exception()}")
             
-    def _on_hold_press(self):
-        """Handle hold hotkey press"""
-        if not self.hold_key_pressed:
-            self.hold_key_pressed = True
-            self.logger.info("🎤 Hold hotkey start detected!")
-            if self.hold_start_callback:
-                self._run_async_callback(self.hold_start_callback)
-                
-    def _on_hold_release(self):
-        """Handle hold hotkey release"""
-        if self.hold_key_pressed:
-            self.hold_key_pressed = False
-            self.logger.info("🛑 Hold hotkey end detected!")
-            if self.hold_end_callback:
-                self._run_async_callback(self.hold_end_callback)
-        
-    def start(self):
-        """Start listening for hotkeys"""
-        try:
-            # Register toggle hotkey
-            keyboard.add_hotkey(
-                self.hotkey_config["toggle"], 
-                self._on_toggle_hotkey
-            )
+    def _on_key_event(self, event):
+        """Global keyboard hook: runs for every key event, so keep it to a few dict/bit operations"""
+        started = time.perf_counter()
+        self.counters["events"] += 1
+        if event.event_type == keyboard.KEY_DOWN:
+            binding = self.matcher.key_down(event.name, time.monotonic())
+            if binding is not None:
+                self._dispatch(binding, event)
+        else:
+            for binding in self.matcher.key_up(event.name):
+                self.logger.info("🛑 Hold hotkey end detected!")
+                if self.hold_end_callback:
+                    self._run_async_callback(self.hold_end_callback, event_at=self._event_time(event))
+        if self.metrics is not None:
+            self.metrics.observe("hotkey_hook", time.perf_counter() - started)
             
-            # Register hold hotkey using the same combination but with callback tracking
-            keyboard.add_hotkey(
-                self.hotkey_config["hold"], 
-                self._on_hold_press,
-                suppress=False
-            )
+    @staticmethod
+    def _event_time(event) -> float:
+        """The event's OS timestamp (wall clock) on the monotonic clock"""
+        event_time = getattr(event, "time", None)
+        if not event_time:
+            return time.monotonic()
+        return time.monotonic() - max(0.0, time.time() - event_time)
+        
+    def _dispatch(self, binding: Binding, event):
+        event_at = self._event_time(event)
+        if binding.action == "toggle":
+            self.logger.info("🔄 Toggle hotkey detected!")
+            callback, args = self.toggle_callback, ()
+        elif binding.action == "hold":
+            self.logger.info("🎤 Hold hotkey start detected!")
+            callback, args = self.hold_start_callback, ()
+        elif binding.action == "cancel":
+            self.logger.info("🗑️ Cancel hotkey detected!")
+            callback, args = self.cancel_callback, ()
+        elif binding.action == "reprocess":
+            self.logger.info("🔁 Reprocess hotkey detected!")
+            callback, args = self.reprocess_callback, ()
+        else:
+            self.logger.info(f"🎯 {binding.arg} hotkey detected!")
+            callback, args = self.mode_callback, (binding.arg,)
+        if callback:
+            self._run_async_callback(callback, *args, event_at=event_at)
             
-            # We'll use a different approach for hold release - monitor key releases
-            self._setup_hold_release_monitoring()
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """Start listening for hotkeys, dispatching callbacks onto the given event loop"""
+        self.loop = loop
+        try:
+            # One hook for all bindings; chords are matched by the compiled state machine
+            keyboard.hook(self._on_key_event)
             
             self.hotkeys_registered = True
-            self.logger.info(f"Hotkey listener started with toggle: {self.hotkey_config['toggle']}, hold: {self.hotkey_config['hold']}")
+            chords = ", ".join(f"{b.action if b.action != 'mode' else b.arg}: {b.chord}"
+                               for b in self.matcher.bindings.values())
+            self.logger.info(f"Hotkey listener started with {chords}")
             
         except Exception as e:
             self.logger.error(f"Failed to start hotkey listener: {e}")
             self.logger.error("Another application may be using these hotkey combinations")
             raise
             
-    def _setup_hold_release_monitoring(self):
-        """Setup monitoring for hold key release"""
-        def on_key_event(event):
-            # Check if any key in the hold combination was released
-            if event.event_type == keyboard.KEY_UP and self.hold_key_pressed:
-                # Simple check: if any modifier key is released, end hold
-                if event.name in ['ctrl', 'alt', 'shift'] or event.name == 'h':
-                    self._on_hold_release()
-                    
-        keyboard.hook(on_key_event)
-            
     def stop(self):
         """Stop listening for hotkeys"""
         if self.hotkeys_registered:
             try:
-                keyboard.clear_all_hotkeys()
                 keyboard.unhook_all()
                 self.hotkeys_registered = False
                 self.logger.info("Hotkey listener stopped")
             except Exception as e:
-                self.logger.warning(f"Error stopping hotkey listener: {e}")
\ No newline at end of file
+                self.logger.warning(f"Error stopping hotkey listener: {e}")
@@ -0,0 +1,210 @@
+"""
+Concurrent capture from several input devices, combined into one channel by SNR
+"""
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import soundcard as sc
+
+from audio.recorder import AudioRecorder
+from audio.resample import StreamingResampler
+
+
+def channel_snr(audio: np.ndarray, sample_rate: int, frame_ms: float = 20) -> np.ndarray:
+    """Estimated SNR in dB of each column of a (frames, channels) array.
+
+    Frame energies are computed for every channel at once; the noise floor is the
+    10th percentile of a channel's frame energies and the speech level the 90th.
+    """
+    frame = max(1, int(sample_rate * frame_ms / 1000))
+    n_frames = len(audio) // frame
+    if n_frames < 2:
+        return np.zeros(audio.shape[1], dtype=np.float32)
+    framed = audio[:n_frames * frame].reshape(n_frames, frame, audio.shape[1])
+    energy = np.einsum("fsc,fsc->fc", framed, framed) / frame
+    noise, speech = np.percentile(energy, [10, 90], axis=0)
+    return (10 * np.log10((speech + 1e-10) / (noise + 1e-10))).astype(np.float32)
+
+
+def combine_channels(audio: np.ndarray, snr_db: np.ndarray, mode: str = "best",
+                     mix_within_db: float = 6.0) -> Tuple[np.ndarray, np.ndarray]:
+    """Reduce a (frames, channels) array to mono, returning (audio, per-channel weights).
+
+    "best" keeps the channel with the highest SNR. "mix" averages the channels
+    within mix_within_db of the best one, weighted by linear SNR, after scaling
+    each to the best channel's level.
+    """
+    best = int(np.argmax(snr_db))
+    weights = np.zeros(audio.shape[1], dtype=np.float32)
+    if mode == "best" or audio.shape[1] == 1:
+        weights[best] = 1.0
+        return np.ascontiguousarray(audio[:, best]), weights
+    if mode != "mix":
+        raise ValueError(f"Unknown channel combine mode: {mode}")
+        
+    selected = snr_db >= snr_db[best] - mix_within_db
+    weights[selected] = 10 ** (snr_db[selected] / 10)
+    weights /= weights.sum()
+    rms = np.sqrt(np.mean(np.square(audio), axis=0)) + 1e-10
+    gains = weights * (rms[best] / rms)
+    return (audio @ gains.astype(np.float32)).astype(np.float32), weights
+
+
+class _Capture:
+    """One device's capture thread state: the channels kept and when its first sample arrived"""
+    
+    def __init__(self, microphone, label: str, channels: List[int], capacity: int, sample_rate: int,
+                 capture_rate: int):
+        self.microphone = microphone
+        self.capture_rate = capture_rate
+        self.resampler = StreamingResampler(capture_rate, sample_rate) if capture_rate != sample_rate else None
+        self.label = label
+        self.channels = channels
+        self.open_channels = max(channels) + 1
+        self.data = np.empty((capacity, len(channels)), dtype=np.float32)
+        self.length = 0
+        self.first_at: Optional[float] = None
+        self.thread: Optional[threading.Thread] = None
+        
+    def write(self, block: np.ndarray, now: float) -> np.ndarray:
+        if self.first_at is None:
+            # The block finished arriving at now, so its first sample is one block earlier
+            self.first_at = now - len(block) / self.capture_rate
+        selected = block[:, self.channels] if block.ndim == 2 else block[:, None]
+        if self.resampler is not None:
+            selected = self.resampler.process(selected)
+        frames = min(len(selected), len(self.data) - self.length)
+        selected = selected[:frames]
+        dest = self.data[self.length:self.length + frames]
+        np.copyto(dest, selected, casting="unsafe")
+        self.length += frames
+        return dest
+
+
+class MultiDeviceRecorder(AudioRecorder):
+    """Records several input devices at once and hands back one mono signal.
+
+    Every device has its own capture thread writing into its own preallocated
+    buffer. At stop the streams are aligned on the time their first block
+    arrived, per-channel SNR is estimated in one vectorized pass, and the best
+    channel is kept (or the good ones mixed). Streaming sessions are fed the
+    first configured channel as it is captured. Clock drift between devices is
+    not corrected, which is fine for dictation-length recordings.
+    """
+    
+    def __init__(self, audio_config: Dict[str, Any]):
+        super().__init__(audio_config)
+        self.combine = audio_config.get("combine", "best")
+        self.mix_within_db = audio_config.get("mix_within_db", 6.0)
+        self.last_snr: Dict[str, float] = {}
+        self._captures: List[_Capture] = []
+        self._active = 0
+        self._active_lock = threading.Lock()
+        
+        self.devices: List[Tuple[Any, str, List[int], int]] = []
+        for device in audio_config["devices"]:
+            spec = {"name": device} if isinstance(device, str) else dict(device)
+            try:
+                microphone = sc.get_microphone(spec["name"]) if spec.get("name") else sc.default_microphone()
+            except Exception as e:
+                self.logger.error(f"Input device {spec.get('name')!r} not found: {e}")
+                continue
+            channels = list(spec.get("channels") or [0])
+            label = spec.get("label") or str(spec.get("name") or "default")
+            self.devices.append((microphone, label, channels, spec.get("rate") or self.capture_rate))
+            self.logger.debug(f"Capturing {microphone} channels {channels}")
+            
+        if self.devices:
+            self.microphone = self.devices[0][0]
+            
+    def start_recording(self):
+        """Start one capture thread per configured device"""
+        if self.is_recording:
+            self.logger.warning("Already recording")
+            return
+            
+        if not self.devices:
+            raise RuntimeError("No microphone available")
+            
+        self.is_recording = True
+        self.start_time = time.time()
+        capacity = int(self.max_duration * self.sample_rate)
+        self._captures = [_Capture(mic, label, channels, capacity, self.sample_rate, rate)
+                          for mic, label, channels, rate in self.devices]
+        with self._active_lock:
+            self._active = len(self._captures)
+        for index, capture in enumerate(self._captures):
+            capture.thread = threading.Thread(
+                target=self._capture_worker, args=(capture, index == 0), name=f"capture-{capture.label}", daemon=True
+            )
+            capture.thread.start()
+            
+    def _capture_worker(self, capture: _Capture, primary: bool):
+        try:
+            block_frames = max(1, int(capture.capture_rate * self.block_ms / 1000))
+            with capture.microphone.recorder(
+                samplerate=capture.capture_rate,
+                channels=capture.open_channels,
+                blocksize=block_frames
+            ) as stream:
+                while self.is_recording:
+                    if time.time() - self.start_time > self.max_duration or capture.length >= len(capture.data):
+                        self.logger.warning(f"Recording stopped: exceeded max duration of {self.max_duration}s")
+                        break
+                        
+                    self._write_block(capture, stream.record(numframes=block_frames), primary)
+                    
+                tail = stream.flush()
+                if len(tail):
+                    self._write_block(capture, tail, primary)
+                    
+        except Exception as e:
+            self.logger.error(f"Recording error on {capture.label}: {e}")
+        finally:
+            with self._active_lock:
+                self._active -= 1
+                if self._active == 0:
+                    self.is_recording = False
+                    
+    def _write_block(self, capture: _Capture, block: np.ndarray, primary: bool):
+        written = capture.write(block, time.monotonic())
+        if primary and self.chunk_callback and len(written):
+            self.chunk_callback(written[:, 0])
+            
+    def stop_recording(self) -> Optional[np.ndarray]:
+        """Stop every capture thread and return the aligned, combined mono audio"""
+        if not self.is_recording:
+            self.logger.warning("Not currently recording")
+            return None
+            
+        self.is_recording = False
+        for capture in self._captures:
+            if capture.thread is not None and capture.thread.is_alive():
+                capture.thread.join(timeout=2.0)
+                
+        captures = [c for c in self._captures if c.first_at is not None and c.length]
+        if not captures:
+            return None
+        aligned = self._align(captures)
+        if len(aligned) == 0:
+            return None
+            
+        labels = [f"{c.label}:{channel}" for c in captures for channel in c.channels]
+        snr_db = channel_snr(aligned, self.sample_rate)
+        audio, weights = combine_channels(aligned, snr_db, self.combine, self.mix_within_db)
+        self.last_snr = dict(zip(labels, snr_db.tolist()))
+        chosen = ", ".join(label for label, weight in zip(labels, weights) if weight > 0)
+        self.logger.info("🎚️ Channel SNR: " + " ".join(f"{label}={snr:.1f}dB" for label, snr in self.last_snr.items())
+                         + f" -> {chosen}")
+        return audio
+        
+    def _align(self, captures: List[_Capture]) -> np.ndarray:
+        """(frames, channels) array of every captured channel, trimmed to the span all devices covered"""
+        start = max(c.first_at for c in captures)
+        offsets = [int(round((start - c.first_at) * self.sample_rate)) for c in captures]
+        frames = max(0, min(c.length - offset for c, offset in zip(captures, offsets)))
+        return np.concatenate(
+            [c.data[offset:offset + frames] for c, offset in zip(captures, offsets)], axis=1
+        )
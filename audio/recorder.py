@@ -4,10 +4,12 @@ Audio recording functionality using soundcard library
 import logging
 import numpy as np
 import soundcard as sc
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable
 import threading
 import time
 
+from audio.buffer import AudioBuffer
+
 
 class AudioRecorder:
     def __init__(self, audio_config: Dict[str, Any]):
@@ -15,12 +17,17 @@ class AudioRecorder:
         self.channels = audio_config["channels"] 
         self.dtype = audio_config["dtype"]
         self.max_duration = audio_config.get("max_duration", 300)
+        self.downmix = audio_config.get("downmix", "first")
+        self.block_ms = audio_config.get("block_ms", 30)
+        # Device rate to capture at, converted to sample_rate in-process (None lets the backend resample)
+        self.capture_rate = audio_config.get("capture_rate") or self.sample_rate
         self.logger = logging.getLogger(__name__)
         
         self.is_recording = False
-        self.audio_data = []
+        self.buffer: Optional[AudioBuffer] = None
         self.recording_thread = None
         self.start_time = None
+        self.chunk_callback: Optional[Callable[[np.ndarray], None]] = None
         
         # Get default microphone
         try:
@@ -32,6 +39,10 @@ class AudioRecorder:
         except Exception as e:
             self.logger.error(f"Error getting default microphone: {e}")
             self.microphone = None
+            
+    def set_chunk_callback(self, callback: Optional[Callable[[np.ndarray], None]]):
+        """Set a callback that receives each captured chunk as a mono float32 view into the buffer"""
+        self.chunk_callback = callback
         
     def start_recording(self):
         """Start recording audio to memory"""
@@ -43,30 +54,38 @@ class AudioRecorder:
             raise RuntimeError("No microphone available")
             
         self.is_recording = True
-        self.audio_data = []
+        # A fresh arena per recording: views handed to earlier jobs stay valid
+        self.buffer = AudioBuffer(int(self.max_duration * self.sample_rate), self.downmix)
         self.start_time = time.time()
         
+        resampler = None
+        if self.capture_rate != self.sample_rate:
+            from audio.resample import StreamingResampler
+            resampler = StreamingResampler(self.capture_rate, self.sample_rate)
+            
         def record_worker():
             """Worker thread for recording"""
             try:
-                # Record in chunks of 1 second
-                chunk_size = self.sample_rate  # 1 second of samples
+                block_frames = max(1, int(self.capture_rate * self.block_ms / 1000))
                 
-                while self.is_recording:
-                    # Check for timeout
-                    if time.time() - self.start_time > self.max_duration:
-                        self.logger.warning(f"Recording stopped: exceeded max duration of {self.max_duration}s")
-                        break
+                # One recorder stream for the whole recording, read in small blocks
+                with self.microphone.recorder(
+                    samplerate=self.capture_rate,
+                    channels=self.channels,
+                    blocksize=block_frames
+                ) as stream:
+                    while self.is_recording:
+                        # Check for timeout
+                        if time.time() - self.start_time > self.max_duration or self.buffer.full:
+                            self.logger.warning(f"Recording stopped: exceeded max duration of {self.max_duration}s")
+                            break
+                            
+                        self._write_chunk(stream.record(numframes=block_frames), resampler)
                         
-                    # Record chunk
-                    chunk = self.microphone.record(
-                        samplerate=self.sample_rate,
-                        numframes=chunk_size,
-                        channels=self.channels
-                    )
-                    
-                    if self.is_recording:  # Check again in case we were stopped
-                        self.audio_data.append(chunk)
+                    # Keep the partial block buffered by the backend at stop time
+                    tail = stream.flush()
+                    if len(tail):
+                        self._write_chunk(tail, resampler)
                         
             except Exception as e:
                 self.logger.error(f"Recording error: {e}")
@@ -88,27 +107,23 @@ class AudioRecorder:
         if self.recording_thread and self.recording_thread.is_alive():
             self.recording_thread.join(timeout=2.0)
             
-        if not self.audio_data:
+        if self.buffer is None or len(self.buffer) == 0:
             return None
             
-        # Concatenate all recorded chunks
-        try:
-            audio_array = np.concatenate(self.audio_data, axis=0)
-            
-            # Convert to mono if needed (take first channel)
-            if len(audio_array.shape) > 1 and audio_array.shape[1] > 1:
-                audio_array = audio_array[:, 0]
-            
-            # Ensure it's a 1D array
-            if len(audio_array.shape) > 1:
-                audio_array = audio_array.squeeze()
-                
-            return audio_array.astype(np.float32)
-            
-        except Exception as e:
-            self.logger.error(f"Error processing audio data: {e}")
-            return None
+        # Samples were downmixed to float32 as they arrived, so this is a zero-copy view
+        return self.buffer.view()
         
+    def _write_chunk(self, chunk: np.ndarray, resampler=None):
+        """Store a captured chunk and pass it on to the chunk callback"""
+        if resampler is not None:
+            # Downmix first so only one channel is resampled
+            if chunk.ndim == 2:
+                chunk = chunk.mean(axis=1) if self.downmix == "mean" else chunk[:, 0]
+            chunk = resampler.process(chunk)
+        written = self.buffer.write(chunk)
+        if self.chunk_callback and len(written):
+            self.chunk_callback(written)
+            
     def get_available_devices(self):
         """Get list of available audio devices"""
         try:
@@ -120,4 +135,12 @@ class AudioRecorder:
             }
         except Exception as e:
             self.logger.error(f"Error getting devices: {e}")
-            return {"microphones": [], "speakers": []}
\ No newline at end of file
+            return {"microphones": [], "speakers": []}
+
+
+def create_recorder(audio_config: Dict[str, Any]) -> AudioRecorder:
+    """Recorder for the default microphone, or for every configured device when AUDIO["devices"] is set"""
+    if audio_config.get("devices"):
+        from audio.multi_device import MultiDeviceRecorder
+        return MultiDeviceRecorder(audio_config)
+    return AudioRecorder(audio_config)
@@ -0,0 +1,69 @@
+"""
+Streaming polyphase resampler for converting native-rate capture to Whisper's rate
+"""
+from math import gcd
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def design_filter(up: int, down: int, taps_per_phase: int = 24, rolloff: float = 0.9,
+                  beta: float = 8.0) -> np.ndarray:
+    """Kaiser-windowed sinc low-pass at the upsampled rate, split into (up, taps_per_phase) phases.
+
+    Each phase is stored reversed so it lines up with a window of consecutive
+    input samples ending at the newest one.
+    """
+    length = up * taps_per_phase
+    cutoff = rolloff * 0.5 / max(up, down)  # Cycles per upsampled sample
+    m = np.arange(length) - (length - 1) / 2
+    h = 2 * cutoff * np.sinc(2 * cutoff * m) * np.kaiser(length, beta) * up
+    return np.ascontiguousarray(h.reshape(taps_per_phase, up).T[:, ::-1], dtype=np.float32)
+
+
+class StreamingResampler:
+    """Rational-ratio resampler that converts audio block by block.
+
+    process() accepts blocks of any size, as (frames,) or (frames, channels),
+    and returns every output sample the input so far determines. The last
+    taps_per_phase - 1 input samples are carried over between blocks, so the
+    concatenated output equals resampling the whole recording at once. Each
+    block is a single gather of input windows plus one einsum against the
+    polyphase filter bank; there are no per-sample Python loops. The output lags
+    the input by about taps_per_phase / 2 input samples (under 0.5 ms at 48 kHz).
+    """
+    
+    def __init__(self, in_rate: int, out_rate: int, taps_per_phase: int = 24):
+        divisor = gcd(in_rate, out_rate)
+        self.in_rate = in_rate
+        self.out_rate = out_rate
+        self.up = out_rate // divisor
+        self.down = in_rate // divisor
+        self.taps = taps_per_phase
+        self.filters = design_filter(self.up, self.down, taps_per_phase)
+        self._history: np.ndarray = None
+        self._received = 0   # Input samples seen so far
+        self._next_out = 0   # Index of the next output sample
+        
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """Resample the next block, returning float32 output at out_rate"""
+        block = np.asarray(block, dtype=np.float32)
+        if self._history is None:
+            self._history = np.zeros((self.taps - 1,) + block.shape[1:], dtype=np.float32)
+        buffer = np.concatenate([self._history, block])
+        base = self._received - (self.taps - 1)  # Absolute index of buffer[0]
+        self._received += len(block)
+        
+        # Output n sits at input position n * down / up, in phase (n * down) % up;
+        # emit every n whose newest input sample, n * down // up, has arrived
+        last_out = (self._received * self.up - 1) // self.down
+        n = np.arange(self._next_out, last_out + 1, dtype=np.int64)
+        self._next_out = last_out + 1
+        self._history = buffer[len(buffer) - (self.taps - 1):]
+        if len(n) == 0:
+            return np.zeros((0,) + block.shape[1:], dtype=np.float32)
+            
+        position = n * self.down
+        newest = position // self.up
+        windows = sliding_window_view(buffer, self.taps, axis=0)[newest - base - (self.taps - 1)]
+        return np.einsum("n...k,nk->n...", windows, self.filters[position % self.up])
@@ -0,0 +1,149 @@
+"""
+Voice activity detection - trim silence before audio reaches Whisper
+"""
+import logging
+from typing import Any, Dict, List, NamedTuple, Tuple
+
+import numpy as np
+
+
+class VADResult(NamedTuple):
+    """Outcome of a VAD pass over one recording"""
+    original_seconds: float
+    trimmed_seconds: float
+    regions: int
+
+    @property
+    def saved_seconds(self) -> float:
+        return self.original_seconds - self.trimmed_seconds
+
+
+class VoiceActivityDetector:
+    """Base class: subclasses find speech regions, this class trims around them"""
+
+    def __init__(self, vad_config: Dict[str, Any], sample_rate: int):
+        self.sample_rate = sample_rate
+        self.pad_ms = vad_config.get("pad_ms", 200)
+        self.max_pause_ms = vad_config.get("max_pause_ms", 1000)
+        self.logger = logging.getLogger(__name__)
+
+    def speech_regions(self, audio: np.ndarray) -> List[Tuple[int, int]]:
+        """Return (start, end) sample ranges containing speech"""
+        raise NotImplementedError
+
+    def process(self, audio: np.ndarray) -> Tuple[np.ndarray, VADResult]:
+        """Trim leading/trailing silence and shorten long pauses"""
+        original_seconds = len(audio) / self.sample_rate
+        regions = self._pad_and_merge(self.speech_regions(audio), len(audio))
+
+        if not regions:
+            return audio[:0], VADResult(original_seconds, 0.0, 0)
+
+        # Keep each speech region plus at most max_pause_ms of the gap after it
+        max_pause = int(self.max_pause_ms * self.sample_rate / 1000)
+        pieces = []
+        for index, (start, end) in enumerate(regions):
+            if index + 1 < len(regions):
+                end = min(regions[index + 1][0], end + max_pause)
+            pieces.append(audio[start:end])
+
+        trimmed = pieces[0] if len(pieces) == 1 else np.concatenate(pieces)
+        return trimmed, VADResult(original_seconds, len(trimmed) / self.sample_rate, len(regions))
+
+    def _pad_and_merge(self, regions: List[Tuple[int, int]], length: int) -> List[Tuple[int, int]]:
+        """Pad regions so word edges survive, merging any that overlap"""
+        pad = int(self.pad_ms * self.sample_rate / 1000)
+        merged: List[Tuple[int, int]] = []
+        for start, end in regions:
+            start, end = max(0, start - pad), min(length, end + pad)
+            if merged and start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+        return merged
+
+
+class EnergyVAD(VoiceActivityDetector):
+    """Pure NumPy detector using frame energy and zero-crossing rate.
+
+    The noise floor is estimated per recording from the quietest frames, so the
+    threshold adapts to the microphone. Frames slightly below the energy
+    threshold still count as speech when their zero-crossing rate is high, which
+    keeps unvoiced consonants like "s" and "f".
+    """
+
+    def __init__(self, vad_config: Dict[str, Any], sample_rate: int):
+        super().__init__(vad_config, sample_rate)
+        self.frame_ms = vad_config.get("frame_ms", 30)
+        self.threshold_db = vad_config.get("threshold_db", 12.0)
+        self.min_energy_db = vad_config.get("min_energy_db", -55.0)
+        self.zcr_threshold = vad_config.get("zcr_threshold", 0.25)
+
+    def speech_regions(self, audio: np.ndarray) -> List[Tuple[int, int]]:
+        frame = max(1, int(self.frame_ms * self.sample_rate / 1000))
+        n_frames = len(audio) // frame
+        if n_frames == 0:
+            return []
+
+        frames = audio[:n_frames * frame].reshape(n_frames, frame)
+        energy_db = 10.0 * np.log10(np.mean(frames * frames, axis=1) + 1e-12)
+        zcr = np.mean(np.signbit(frames[:, 1:]) != np.signbit(frames[:, :-1]), axis=1)
+
+        if energy_db.max() < self.min_energy_db:
+            return []  # Nothing above digital silence
+
+        noise_floor = np.percentile(energy_db, 10)
+        if energy_db.max() - noise_floor < self.threshold_db:
+            # No usable contrast (all speech or a noisy room) - keep everything
+            return [(0, len(audio))]
+
+        threshold = max(noise_floor + self.threshold_db, self.min_energy_db)
+        speech = (energy_db > threshold) | (
+            (energy_db > threshold - self.threshold_db / 2) & (zcr > self.zcr_threshold)
+        )
+
+        # Convert the frame mask into contiguous sample ranges
+        edges = np.diff(np.concatenate(([0], speech.astype(np.int8), [0])))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        regions = [(int(s) * frame, int(e) * frame) for s, e in zip(starts, ends)]
+        if regions and ends[-1] == n_frames:
+            regions[-1] = (regions[-1][0], len(audio))
+        return regions
+
+
+class SileroVAD(VoiceActivityDetector):
+    """Silero VAD bundled with faster-whisper (needs a working onnxruntime)"""
+
+    def __init__(self, vad_config: Dict[str, Any], sample_rate: int):
+        super().__init__(vad_config, sample_rate)
+        from faster_whisper.vad import VadOptions, get_speech_timestamps, get_vad_model
+
+        get_vad_model()  # Load the ONNX model now so failures fall back at construction
+        self._get_speech_timestamps = get_speech_timestamps
+        self._options = VadOptions(
+            threshold=vad_config.get("silero_threshold", 0.5),
+            min_silence_duration_ms=vad_config.get("max_pause_ms", 1000),
+            speech_pad_ms=0  # Padding is applied by the base class
+        )
+
+    def speech_regions(self, audio: np.ndarray) -> List[Tuple[int, int]]:
+        timestamps = self._get_speech_timestamps(audio, self._options)
+        return [(ts["start"], ts["end"]) for ts in timestamps]
+
+
+def create_vad(vad_config: Dict[str, Any], sample_rate: int):
+    """Build the configured detector, falling back to EnergyVAD if Silero is unavailable"""
+    backend = vad_config.get("backend", "energy")
+    if not vad_config.get("enabled", True) or backend == "none":
+        return None
+
+    if backend == "silero":
+        try:
+            return SileroVAD(vad_config, sample_rate)
+        except Exception as e:
+            logging.getLogger(__name__).warning(f"Silero VAD unavailable, using energy VAD: {e}")
+    elif backend != "energy":
+        raise ValueError(f"Unknown VAD backend: {backend}")
+
+    return EnergyVAD(vad_config, sample_rate)
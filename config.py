@@ -3,14 +3,81 @@
 # Global Hotkeys
 HOTKEYS = {
     "toggle": "ctrl+alt+t",  # Press once to start, press again to stop
-    "hold": "ctrl+alt+h"     # Hold to record, release to stop
+    "hold": "ctrl+alt+h",    # Hold to record, release to stop
+    "cancel": "ctrl+alt+x",  # Discard the current recording (or cancel transcription when idle)
+    "reprocess": "ctrl+alt+r",  # Process the last recording again
+    "modes": {},             # Toggle a recording with a specific mode, e.g. {"ctrl+alt+e": "email"}
+    "debounce_ms": 150       # Ignore a chord repeated within this window
 }
 
 # Whisper Configuration
 WHISPER = {
     "model": "small",    # Options: tiny, base, small, medium, large, turbo
     "language": None,   # Auto-detect language (or specify like "en", "es", etc.)
-    "device": "cpu"     # Options: "cpu", "cuda" (if available)
+    "device": "cpu",    # Options: "cpu", "cuda" (if available)
+    "compute_type": "default",  # e.g. "int8", "int8_float32", "float16" (see `bench-models`)
+    "model_path": None,  # Local CTranslate2 model directory (overrides "model")
+    "download_root": "~/.cache/whisper",  # Where named models are downloaded
+    "cpu_threads": 0,   # Threads per decode (0 = CTranslate2 default)
+    "num_workers": 1,   # Decodes that can run in parallel (size of the decode pool)
+    "tiers": {
+        "enabled": False,        # Copy a fast draft first, then refine with "model" above
+        "draft_model": "tiny",   # Draft tier (tiny or base)
+        "draft_cpu_threads": 2
+    },
+    "policy": {
+        "enabled": False,        # Pick model/compute type/beam/threads per job to meet the SLO below
+        "tiers": [               # Most accurate first; the first tier predicted to meet the SLO is used
+            {"model": "small", "compute_type": "int8", "beam_size": 5},
+            {"model": "small", "compute_type": "int8", "beam_size": 1},
+            {"model": "base", "compute_type": "int8", "beam_size": 1},
+            {"model": "tiny", "compute_type": "int8", "beam_size": 1}
+        ],
+        "slo": [                 # Latency targets by clip length (max_seconds None = any length)
+            {"max_seconds": 10, "target_latency": 1.5},
+            {"max_seconds": 60, "target_latency": 5.0},
+            {"max_seconds": None, "target_latency": 20.0}
+        ]
+    },
+    "long_audio": {
+        "enabled": False,       # Split long recordings into chunks decoded in parallel; only takes
+                                # effect with num_workers > 1 or batched (otherwise chunks run serially)
+        "min_seconds": 60,      # Recordings at least this long are chunked
+        "chunk_seconds": 30,    # Maximum chunk length (cuts prefer pauses)
+        "overlap_seconds": 1.0, # Overlap used when no pause is found near a cut (not batched)
+        "batched": False,       # Use faster-whisper's BatchedInferencePipeline instead (>= 1.1)
+        "batch_size": 8
+    },
+    "preload": True,    # Load the model in the background when the service starts
+    "warmup": True      # Run a short silent decode after preloading to prime the model
+}
+
+# Voice Activity Detection (trim silence before transcription)
+VAD = {
+    "enabled": True,
+    "backend": "energy",   # "energy" (pure NumPy, no onnx), "silero" (needs onnxruntime) or "none"
+    "frame_ms": 30,        # Analysis frame length
+    "threshold_db": 12.0,  # Speech must be this far above the estimated noise floor
+    "min_energy_db": -55.0,# Anything quieter is treated as digital silence
+    "zcr_threshold": 0.25, # Zero-crossing rate that keeps quiet fricatives
+    "pad_ms": 200,         # Audio kept either side of detected speech
+    "max_pause_ms": 1000   # Longer pauses are shortened to this
+}
+
+# Streaming Transcription (decode while recording, re-decode only the unstable tail)
+STREAMING = {
+    "enabled": False,          # Feed chunks to Whisper as they are captured
+    "step_seconds": 2.0,       # Decode after this much new audio has arrived
+    "unstable_seconds": 3.0,   # Segments ending within this window of the live edge are re-decoded
+    "max_buffer_seconds": 25.0 # Force a commit if the pending buffer grows past this
+}
+
+# Processing Pipeline (finished recordings are queued and processed in order)
+PIPELINE = {
+    "max_queue": 4,          # Maximum recordings waiting to be processed
+    "concurrency": 1,        # Recordings processed at the same time
+    "backpressure": "queue", # When full: "queue" (wait), "drop" (discard new) or "coalesce" (merge into newest)
+    "preempt": False         # Cancel in-flight transcriptions when a new recording starts
 }
 
 # LLM Provider Configuration
@@ -27,16 +94,98 @@ LLM_PROVIDERS = {
     }
 }
 
+# LLM HTTP Settings (one pooled keep-alive session per provider)
+LLM_HTTP = {
+    "stream": True,          # Stream chat/completions tokens (server-sent events)
+    "echo_tokens": False,    # Also print raw tokens to the console (interleaved with log lines)
+    "timeout": 30,           # Total request timeout in seconds
+    "connect_timeout": 5,    # Connection timeout in seconds
+    "pool_size": 4,          # Maximum open connections per provider
+    "keepalive_timeout": 60  # Seconds an idle connection is kept open
+}
+
+# LLM Response Cache (stored on local disk, so opt-in). Entries are keyed on the provider
+# that answered; with LLM_ROUTING enabled, a cached answer from any routed provider is reused.
+LLM_CACHE = {
+    "enabled": False,
+    "path": "~/.cache/vibe-transcribe/llm_cache.sqlite3",
+    "ttl_seconds": 7 * 24 * 3600,  # Entries expire after a week (0 = never)
+    "max_entries": 1000,           # Least recently used entries are evicted beyond this
+    "max_bytes": 10 * 1024 * 1024, # ...or beyond this total response size
+    "exclude_modes": []            # Modes that always call the provider
+}
+
+# LLM Routing (hedge across providers and route around slow or failing ones)
+LLM_ROUTING = {
+    "enabled": False,
+    "providers": ["openai", "ollama"], # Candidates; the default provider is preferred until latencies are known
+    "hedge_after_ms": 1500,  # Also send to the next provider if no response within this budget
+    "max_parallel": 2,       # Providers racing at once
+    "ewma_alpha": 0.3,       # Weight of the newest sample in latency/error averages
+    "failure_threshold": 3,  # Consecutive failures before a provider's circuit opens
+    "cooldown_seconds": 30   # Time an open circuit waits before a probe request
+}
+
 # Default Settings
 DEFAULT_PROVIDER = "openai"
 DEFAULT_MODE = "transcribe"
 
+# Where finished text goes; every listed sink gets it concurrently, the first one is waited on
+OUTPUT = {
+    "sinks": ["clipboard"],                # Any of: clipboard, typing, file, stdout, socket
+    "stream_tokens": True,                 # Start typing/stdout/socket output at the first LLM token
+    "clipboard": {"verify": False},        # Read back after copying (an extra xclip/xsel launch on Linux)
+    "typing": {"delay": 0},                # Type into the focused window; seconds between keystrokes
+    "file": {"path": "~/vibe-transcribe.txt", "timestamps": True, "verify": False},  # verify fsyncs
+    "socket": {"address": "127.0.0.1:9479"}  # "host:port" or a Unix socket path; one JSON line per text
+}
+
+# Spoken mode switching: start a dictation with e.g. "Email: ..." or "Tasks, ..." to use that mode
+SPOKEN_MODES = {
+    "enabled": False,
+    "require_separator": True,  # Only match when the phrase is followed by punctuation (a spoken pause)
+    "aliases": {}               # Extra spoken phrases, e.g. {"reply": "email"}
+}
+
 # Audio Settings
 AUDIO = {
     "sample_rate": 16000,  # Whisper works best with 16kHz
     "channels": 1,         # Mono audio
     "dtype": "float32",
-    "max_duration": 300    # Maximum recording duration in seconds (5 minutes)
+    "max_duration": 300,   # Maximum recording duration in seconds (5 minutes), sizes the capture buffer
+    "downmix": "first",    # Multi-channel input: "first" keeps channel 0, "mean" averages channels
+    "block_ms": 30,        # Capture block size; bounds stop latency (20-50 ms is a good range)
+    "capture_rate": None,  # e.g. 48000: capture at the device's native rate and resample in-process
+    # Capture several inputs at once (empty uses the default microphone), e.g.
+    # ["Headset", {"name": "USB Array", "channels": [0, 1], "label": "room", "rate": 48000}]
+    "devices": [],
+    "combine": "best",     # Multiple devices/channels: "best" keeps the highest-SNR channel, "mix" blends the good ones
+    "mix_within_db": 6.0   # "mix" only uses channels within this many dB of the best
+}
+
+# Latency Metrics
+METRICS = {
+    "enabled": False,        # Serve per-stage latency histograms over HTTP (read by `stats`)
+    "host": "127.0.0.1",
+    "port": 9477             # /metrics (Prometheus text) and /stats (JSON)
+}
+
+# Recording history (opt-in): keeps audio and results for `history`, `replay` and `reprocess`
+HISTORY = {
+    "enabled": False,
+    "path": "~/.local/share/vibe-transcribe/history",
+    "encoding": "flac",      # "flac" (lossless) or "opus" (about 10x smaller)
+    "max_age_days": 30,      # 0 = keep regardless of age
+    "max_bytes": 500 * 1024 * 1024  # Total audio kept; oldest recordings are removed first
+}
+
+# Local API served by `start` for scripts and editor integrations (see the `client` command)
+API = {
+    "enabled": False,
+    "host": "127.0.0.1",
+    "port": 9478,
+    "unix_socket": None,     # e.g. "~/.cache/vibe-transcribe/api.sock" (used instead of host/port)
+    "token": None            # Require "Authorization: Bearer <token>" on the TCP listener (client sends it)
 }
 
 # Optional Logging
@@ -1,128 +1,36 @@
 #!/usr/bin/env python3
 """
 Vibe Transcribe - Voice transcription with global hotkeys and LLM processing
+
+Heavy dependencies (faster-whisper, soundcard, keyboard, aiohttp, numpy) are
+imported inside the commands that use them so lightweight commands start fast;
+scripts/check_import_time.py enforces this.
 """
 import os
 # Fix OpenMP library conflict on Windows
 os.environ['KMP_DUPLICATE_LIB_OK'] = 'True'
 
-import asyncio
 import logging
-from typing import Optional
+from typing import List, Optional
 import typer
 from pathlib import Path
 
 import config
-from audio.hotkeys import HotkeyManager
-from audio.recorder import AudioRecorder
-from transcription.whisper_client import WhisperClient
-from processing.llm_client import LLMClient
-from utils.clipboard import ClipboardManager
 from utils.logger import setup_logging
 
 app = typer.Typer(help="Vibe Transcribe - Voice transcription with global hotkeys")
 
-class VibeTranscribe:
-    def __init__(self):
-        self.logger = logging.getLogger(__name__)
-        self.clipboard = ClipboardManager()
-        self.whisper = WhisperClient(config.WHISPER)
-        self.llm = LLMClient(config.LLM_PROVIDERS, config.DEFAULT_PROVIDER)
-        self.recorder = AudioRecorder(config.AUDIO)
-        self.hotkey_manager = HotkeyManager(config.HOTKEYS)
-        
-        # Set up callbacks
-        self.hotkey_manager.set_callbacks(
-            toggle_callback=self._handle_toggle_recording,
-            hold_start_callback=self._handle_start_recording,
-            hold_end_callback=self._handle_stop_recording
-        )
-        
-    async def _handle_toggle_recording(self):
-        """Handle toggle recording hotkey"""
-        if self.recorder.is_recording:
-            await self._stop_and_process()
-        else:
-            self._start_recording()
-            
-    async def _handle_start_recording(self):
-        """Handle start of hold-to-record"""
-        self._start_recording()
-        
-    async def _handle_stop_recording(self):
-        """Handle end of hold-to-record"""
-        await self._stop_and_process()
-        
-    def _start_recording(self):
-        """Start audio recording"""
-        try:
-            self.recorder.start_recording()
-            self.logger.info("🎤 Recording started...")
-        except Exception as e:
-            self.logger.error(f"Failed to start recording: {e}")
-            
-    async def _stop_and_process(self):
-        """Stop recording and process audio"""
-        try:
-            audio_data = self.recorder.stop_recording()
-            if audio_data is None:
-                self.logger.warning("No audio data captured")
-                return
-
-            self.logger.info("🔄 Transcribing...")
-            transcription = await self.whisper.transcribe(audio_data)
-
-            if not transcription.strip():
-                self.logger.warning("No speech detected")
-                return
-
-            # Process with LLM if not just transcribe mode
-            if config.DEFAULT_MODE != "transcribe":
-                self.logger.info(f"🧠 Processing with mode: {config.DEFAULT_MODE}")
-                try:
-                    processed_text = await self.llm.process_text(transcription, config.DEFAULT_MODE)
-                    final_text = processed_text
-                except Exception as e:
-                    self.logger.warning(f"LLM processing failed, using transcription: {e}")
-                    final_text = transcription
-            else:
-                final_text = transcription
-
-            self.logger.info(f"Transcribed text[:50] = {final_text[:50]}")
-            # Copy to clipboard
-            if self.clipboard.copy_to_clipboard(final_text):
-                self.logger.info("✅ Text copied to clipboard")
-            else:
-                self.logger.info("📝 Clipboard failed")
-
-        except Exception as e:
-            self.logger.error(f"Processing failed: {e}")
-            
-    async def run(self):
-        """Main application loop"""
-        self.logger.info("🚀 Vibe Transcribe starting...")
-        self.logger.info(f"🎯 Mode: {config.DEFAULT_MODE}")
-        self.logger.info(f"🔥 Hotkeys: {config.HOTKEYS}")
-        
-        try:
-            # Start hotkey listeners
-            self.hotkey_manager.start()
-            self.logger.info("🎮 Hotkeys active - Press Ctrl+C to exit")
-            
-            # Keep running until interrupted
-            while True:
-                await asyncio.sleep(1)
-                
-        except KeyboardInterrupt:
-            self.logger.info("👋 Shutting down...")
-        finally:
-            self.hotkey_manager.stop()
-
 @app.command()
-def start():
+def start(preload: bool = typer.Option(config.WHISPER.get("preload", True), "--preload/--no-preload",
+                                      help="Load and warm up the Whisper model at startup"),
+          api: bool = typer.Option(config.API.get("enabled", False), "--api/--no-api",
+                                  help="Serve the local API used by the client command")):
     """Start the transcription service"""
+    import asyncio
+    from service import VibeTranscribe
+    
     setup_logging(config.LOG_FILE)
-    vibe = VibeTranscribe()
+    vibe = VibeTranscribe(preload=preload, api=api)
     asyncio.run(vibe.run())
 
 @app.command()
@@ -134,13 +42,15 @@ def config_setup():
 @app.command()
 def test_audio():
     """Test audio recording"""
+    import time
+    from audio.recorder import create_recorder
+    
     setup_logging()
     logger = logging.getLogger(__name__)
-    recorder = AudioRecorder(config.AUDIO)
+    recorder = create_recorder(config.AUDIO)
     
     logger.info("🎤 Testing audio recording for 3 seconds...")
     recorder.start_recording()
-    import time
     time.sleep(3)
     audio_data = recorder.stop_recording()
     
@@ -152,14 +62,18 @@ def test_audio():
 @app.command()
 def test_whisper():
     """Test Whisper transcription"""
+    import asyncio
+    import time
+    from audio.recorder import create_recorder
+    from transcription.whisper_client import WhisperClient
+    
     setup_logging()
     logger = logging.getLogger(__name__)
     whisper = WhisperClient(config.WHISPER)
     
     logger.info("🎤 Testing Whisper - speak for 3 seconds...")
-    recorder = AudioRecorder(config.AUDIO)
+    recorder = create_recorder(config.AUDIO)
     recorder.start_recording()
-    import time
     time.sleep(3)
     audio_data = recorder.stop_recording()
     
@@ -170,13 +84,287 @@ def test_whisper():
     else:
         logger.info("❌ No audio to transcribe")
 
+@app.command()
+def transcribe_batch(
+    inputs: List[str] = typer.Argument(..., help="Audio files, directories or glob patterns"),
+    output: Path = typer.Option(Path("transcripts.jsonl"), "--output", "-o", help="JSONL file to append results to"),
+    workers: int = typer.Option(max(1, (os.cpu_count() or 2) // 2), "--workers", "-w", help="Worker processes"),
+    cpu_threads: int = typer.Option(0, help="Threads per worker (0 = split cores evenly)"),
+    model: Optional[str] = typer.Option(None, help="Whisper model (defaults to config)"),
+    resume: bool = typer.Option(True, "--resume/--no-resume", help="Skip files already in the output")
+):
+    """Transcribe a backlog of audio files with a pool of worker processes"""
+    from transcription.batch import completed_paths, find_audio_files, run_batch
+    
+    setup_logging(config.LOG_FILE)
+    logger = logging.getLogger(__name__)
+    
+    files = find_audio_files(inputs)
+    if resume:
+        done = completed_paths(output)
+        files = [f for f in files if str(f) not in done]
+    if not files:
+        logger.info("Nothing to transcribe")
+        return
+        
+    whisper_config = dict(config.WHISPER, cpu_threads=cpu_threads)
+    if model:
+        whisper_config["model"] = model
+        
+    def report(record):
+        if "error" in record:
+            logger.error(f"❌ {record['path']}: {record['error']}")
+        else:
+            logger.info(f"📝 {record['path']} ({record['duration']:.1f}s audio, RTF {record['rtf']})")
+            
+    summary = run_batch(files, output, whisper_config, workers, config.AUDIO["sample_rate"], on_result=report)
+    logger.info(f"✅ {summary['files'] - summary['failed']}/{summary['files']} file(s), "
+                f"{summary['audio_seconds']:.0f}s of audio in {summary['wall_seconds']:.0f}s "
+                f"({summary['throughput'] or 0:.1f}x real time) -> {output}")
+
+@app.command()
+def bench_models(
+    corpus: Path = typer.Argument(..., help="Directory of audio files with matching .txt reference transcripts"),
+    models: Optional[List[str]] = typer.Option(None, "--model", "-m", help="Model to test (repeatable; default: installed models)"),
+    compute_types: Optional[List[str]] = typer.Option(None, "--compute-type", "-c", help="Compute type to test (repeatable; default: all supported)"),
+    output: Optional[Path] = typer.Option(None, "--output", "-o", help="Write results as JSON")
+):
+    """Compare model x compute type variants by speed, memory and word error rate"""
+    import json
+    from transcription.benchmark import find_corpus, installed_models, run_benchmark, supported_compute_types
+    
+    setup_logging(config.LOG_FILE)
+    
+    samples = find_corpus(corpus)
+    if not samples:
+        typer.echo(f"❌ No audio files with .txt references found in {corpus}")
+        raise typer.Exit(1)
+        
+    if not models:
+        models = installed_models(config.WHISPER.get("download_root") or "~/.cache/whisper")
+        if config.WHISPER.get("model_path"):
+            models.append(config.WHISPER["model_path"])
+    if not models:
+        typer.echo("❌ No installed models found; pass --model")
+        raise typer.Exit(1)
+    compute_types = compute_types or supported_compute_types(config.WHISPER.get("device", "cpu"))
+    
+    typer.echo(f"{'model':<24} {'compute type':<16} {'load s':>8} {'RTF':>8} {'WER':>8} {'peak MB':>9}")
+    
+    def report(result):
+        if "error" in result:
+            typer.echo(f"{result['model']:<24} {result['compute_type']:<16} ❌ {result['error']}")
+            return
+        wer = f"{result['wer']:.1%}" if result["wer"] is not None else "-"
+        peak = f"{result['peak_rss_mb']:.0f}" if result["peak_rss_mb"] is not None else "-"
+        typer.echo(f"{result['model']:<24} {result['compute_type']:<16} {result['load_seconds']:>8.2f} "
+                   f"{result['rtf']:>8.3f} {wer:>8} {peak:>9}")
+        
+    results = run_benchmark(samples, config.WHISPER, models, compute_types,
+                            config.AUDIO["sample_rate"], on_result=report)
+    if output:
+        output.write_text(json.dumps(results, indent=2))
+        typer.echo(f"💾 Results written to {output}")
+
+@app.command()
+def stats(
+    host: str = typer.Option(config.METRICS.get("host", "127.0.0.1"), help="Metrics endpoint host"),
+    port: int = typer.Option(config.METRICS.get("port", 9477), help="Metrics endpoint port")
+):
+    """Show per-stage latency of the running service"""
+    import json
+    import urllib.request
+    from utils.metrics import STAGES
+    
+    try:
+        with urllib.request.urlopen(f"http://{host}:{port}/stats", timeout=2) as response:
+            data = json.loads(response.read())
+    except OSError as e:
+        typer.echo(f"❌ Could not reach the metrics endpoint at {host}:{port} ({e})")
+        typer.echo("   Start the service with METRICS['enabled'] = True in config.py")
+        raise typer.Exit(1)
+        
+    typer.echo("📊 " + ", ".join(f"{name}: {value}" for name, value in data["counters"].items()))
+    typer.echo(f"{'stage':<22} {'count':>6} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    
+    def ms(value):
+        return f"{value * 1000:.0f}" if value is not None else "-"
+        
+    stages = data["stages"]
+    for stage in [s for s in STAGES if s in stages] + [s for s in stages if s not in STAGES]:
+        h = stages[stage]
+        typer.echo(f"{stage:<22} {h['count']:>6} {ms(h['mean']):>9} {ms(h['p50']):>9} "
+                   f"{ms(h['p95']):>9} {ms(h['p99']):>9}")
+
+@app.command()
+def client(
+    audio_file: Optional[Path] = typer.Argument(None, help="Audio file to transcribe with the running service"),
+    text: Optional[str] = typer.Option(None, "--text", "-t", help="Process this text instead of audio"),
+    mode: Optional[str] = typer.Option(None, "--mode", "-m", help="Processing mode to apply"),
+    status: bool = typer.Option(False, "--status", help="Show the service status"),
+    no_vad: bool = typer.Option(False, "--no-vad", help="Skip silence trimming"),
+    json_output: bool = typer.Option(False, "--json", help="Print the full JSON response")
+):
+    """Send audio or text to a service started with --api (no model load in this process)"""
+    import json
+    from utils.api_client import APIClient, APIError
+    
+    api_client = APIClient(config.API)
+    try:
+        if status:
+            result = api_client.status()
+            json_output = True
+        elif text is not None:
+            if not mode or mode == "transcribe":
+                typer.echo("❌ --text needs a processing --mode")
+                raise typer.Exit(1)
+            result = api_client.process_text(text, mode)
+        elif audio_file is not None:
+            result = api_client.transcribe_file(str(audio_file), mode=mode, vad=not no_vad)
+        else:
+            typer.echo("❌ Give an audio file, --text or --status")
+            raise typer.Exit(1)
+    except (APIError, OSError) as e:
+        typer.echo(f"❌ {e}", err=True)
+        raise typer.Exit(1)
+        
+    if json_output:
+        typer.echo(json.dumps(result, indent=2, ensure_ascii=False))
+    else:
+        typer.echo(result.get("processed") or result.get("text", ""))
+
+def _open_history():
+    """The history store, or exit with a hint when history is disabled (opening it creates the DB)"""
+    if not config.HISTORY.get("enabled"):
+        typer.echo("❌ History is disabled; set HISTORY['enabled'] = True in config.py to keep recordings")
+        raise typer.Exit(1)
+    from utils.history import HistoryStore
+    return HistoryStore(config.HISTORY)
+
+@app.command()
+def history(limit: int = typer.Option(20, "--limit", "-n", help="Number of recordings to list")):
+    """List recent recordings in the history store"""
+    import time
+    
+    store = _open_history()
+    entries = store.recent(limit)
+    store.close()
+    if not entries:
+        typer.echo("No recordings in history")
+        return
+        
+    for entry in entries:
+        when = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry["created_at"]))
+        text = (entry["processed"] or entry["transcription"] or entry["error"] or "").replace("\n", " ")
+        typer.echo(f"{entry['id']:>5}  {when}  {entry['duration']:6.1f}s  {entry['status']:<10} "
+                   f"{entry['mode'] or '-':<12} {text[:60]}")
+
+def _rerun_recording(entry_id: int, model: Optional[str], compute_type: Optional[str],
+                     mode: Optional[str], copy: bool, retranscribe: bool):
+    """Run a stored recording through transcription and/or an LLM mode again"""
+    import asyncio
+    
+    modes = ["transcribe", *config.PROCESSING_MODES]
+    if mode is not None and mode not in modes:
+        typer.echo(f"❌ Unknown mode {mode!r} (choose from {', '.join(modes)})")
+        raise typer.Exit(1)
+        
+    setup_logging(config.LOG_FILE)
+    logger = logging.getLogger(__name__)
+    store = _open_history()
+    try:
+        entry = store.get(entry_id)
+        if entry is None:
+            typer.echo(f"❌ No recording {entry_id} in history")
+            raise typer.Exit(1)
+        # Default to the mode the recording was dictated in, if it still exists
+        if mode is None:
+            mode = entry["mode"] if entry["mode"] in modes else config.DEFAULT_MODE
+            
+        transcription = None if retranscribe else entry["transcription"]
+        if not transcription:
+            from audio.vad import create_vad
+            from transcription.whisper_client import SAMPLE_RATE, WhisperClient
+            
+            try:
+                audio = store.load_audio(entry, SAMPLE_RATE)
+            except FileNotFoundError:
+                typer.echo(f"❌ Recording {entry_id} has no stored audio to transcribe")
+                raise typer.Exit(1)
+            vad = create_vad(config.VAD, SAMPLE_RATE)
+            if vad is not None:
+                audio, _ = vad.process(audio)
+                
+            whisper_config = dict(config.WHISPER, preload=False)
+            if model:
+                whisper_config.update(model=model, model_path=None)
+            if compute_type:
+                whisper_config["compute_type"] = compute_type
+            whisper = WhisperClient(whisper_config)
+            logger.info(f"🔄 Transcribing recording {entry_id} ({entry['duration']:.1f}s) with "
+                        f"{whisper.model_path or whisper.model_name}...")
+            transcription = asyncio.run(whisper.transcribe(audio)) if len(audio) else ""
+            whisper.shutdown()
+            
+        result = transcription
+        if mode != "transcribe" and transcription.strip():
+            from processing.llm_client import LLMClient
+            
+            async def process() -> str:
+                llm = LLMClient(config.LLM_PROVIDERS, config.DEFAULT_PROVIDER, config.LLM_HTTP,
+                                config.LLM_CACHE, config.LLM_ROUTING)
+                try:
+                    return await llm.process_text(transcription, mode)
+                finally:
+                    await llm.close()
+                    
+            logger.info(f"🧠 Processing with mode: {mode}")
+            result = asyncio.run(process())
+    finally:
+        store.close()
+        
+    if not result.strip():
+        typer.echo("❌ No speech detected")
+        raise typer.Exit(1)
+    typer.echo(result)
+    if copy:
+        from utils.clipboard import ClipboardManager
+        if ClipboardManager().copy_to_clipboard(result):
+            logger.info("✅ Text copied to clipboard")
+
+@app.command()
+def replay(
+    entry_id: int = typer.Argument(..., help="Recording ID (see the history command)"),
+    copy: bool = typer.Option(True, "--copy/--no-copy", help="Copy the result to the clipboard")
+):
+    """Re-run a stored recording through the current pipeline and its original mode, e.g. after a failed dictation"""
+    _rerun_recording(entry_id, None, None, None, copy, retranscribe=True)
+
+@app.command()
+def reprocess(
+    entry_id: int = typer.Argument(..., help="Recording ID (see the history command)"),
+    model: Optional[str] = typer.Option(None, help="Whisper model to transcribe with"),
+    compute_type: Optional[str] = typer.Option(None, help="Compute type to transcribe with"),
+    mode: Optional[str] = typer.Option(None, "--mode", "-m", help="Processing mode (defaults to the recording's)"),
+    copy: bool = typer.Option(False, "--copy/--no-copy", help="Copy the result to the clipboard")
+):
+    """Process a stored recording with a different model or mode without re-recording.
+
+    The stored transcription is reused unless a model or compute type is given.
+    """
+    _rerun_recording(entry_id, model, compute_type, mode, copy,
+                     retranscribe=bool(model or compute_type))
+
 @app.command() 
 def show_config():
     """Display current configuration"""
     typer.echo("📋 Current Configuration:")
     typer.echo(f"  Hotkeys: {config.HOTKEYS}")
-    typer.echo(f"  Whisper Model: {config.WHISPER['model']}")
+    typer.echo(f"  Whisper Model: {config.WHISPER.get('model_path') or config.WHISPER['model']} "
+               f"({config.WHISPER.get('compute_type', 'default')}, preload: {config.WHISPER.get('preload', True)})")
     typer.echo(f"  Default Provider: {config.DEFAULT_PROVIDER}")
+    typer.echo(f"  LLM Cache: {'enabled' if config.LLM_CACHE.get('enabled') else 'disabled'}")
+    typer.echo(f"  History: {'enabled' if config.HISTORY.get('enabled') else 'disabled'}")
     typer.echo(f"  Default Mode: {config.DEFAULT_MODE}")
     typer.echo(f"  Available Modes: {list(config.PROCESSING_MODES.keys())}")
 
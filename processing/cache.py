@@ -0,0 +1,131 @@
+"""
+Persistent content-addressed cache for LLM responses
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Sequence
+
+
+class ResponseCache:
+    """SQLite-backed response cache keyed on a hash of the request payload.
+
+    Entries expire after ttl_seconds (0 disables expiry). When the cache grows
+    past max_entries or max_bytes, the least recently used entries are evicted.
+    """
+    
+    def __init__(self, cache_config: Dict[str, Any]):
+        self.path = os.path.expanduser(cache_config.get("path", "~/.cache/vibe-transcribe/llm_cache.sqlite3"))
+        self.ttl_seconds = cache_config.get("ttl_seconds", 7 * 24 * 3600)
+        self.max_entries = cache_config.get("max_entries", 1000)
+        self.max_bytes = cache_config.get("max_bytes", 10 * 1024 * 1024)
+        self.logger = logging.getLogger(__name__)
+        
+        self.hits = 0
+        self.misses = 0
+        
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_access)")
+        self._conn.commit()
+        
+    @staticmethod
+    def make_key(payload: Dict[str, Any]) -> str:
+        """Hash a request payload into a stable cache key"""
+        canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+        
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response, or None on a miss or expired entry"""
+        return self.get_first([key])
+        
+    def get_first(self, keys: Sequence[str]) -> Optional[str]:
+        """Return the response of the first key that is cached, counting one hit or miss"""
+        now = time.time()
+        with self._lock:
+            for key in keys:
+                row = self._conn.execute(
+                    "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                
+                if row is not None and self.ttl_seconds and now - row[1] > self.ttl_seconds:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._conn.commit()
+                    row = None
+                    
+                if row is not None:
+                    self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+                    self._conn.commit()
+                    self.hits += 1
+                    return row[0]
+                    
+            self.misses += 1
+            return None
+            
+    def put(self, key: str, response: str):
+        """Store a response and evict least recently used entries over the caps"""
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)", (key, response, size, now, now)
+            )
+            self._evict()
+            self._conn.commit()
+            
+    def _evict(self):
+        """Drop expired entries, then LRU entries until both caps are met"""
+        if self.ttl_seconds:
+            self._conn.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+            
+        count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+            
+        evicted = 0
+        rows = self._conn.execute("SELECT key, size FROM responses ORDER BY last_access ASC").fetchall()
+        for key, size in rows:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            count -= 1
+            total -= size
+            evicted += 1
+        self.logger.debug(f"Evicted {evicted} cached LLM response(s)")
+        
+    def clear(self):
+        """Remove every cached response"""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current cache size"""
+        with self._lock:
+            count, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else None,
+            "entries": count,
+            "bytes": total,
+        }
+        
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
@@ -1,19 +1,54 @@
 """
 LLM client for text processing using OpenAI API and Ollama
 """
+import asyncio
 import logging
-import requests
-from typing import Dict, Any, Optional
+import time
+import aiohttp
+from typing import Dict, Any, Optional, AsyncIterator, Callable, Tuple
 import json
 import config
+from processing.cache import ResponseCache
+from processing.router import ProviderRouter
 
 
 class LLMClient:
-    def __init__(self, providers_config: Dict[str, Dict], default_provider: str):
+    def __init__(self, providers_config: Dict[str, Dict], default_provider: str,
+                 http_config: Optional[Dict[str, Any]] = None,
+                 cache_config: Optional[Dict[str, Any]] = None,
+                 routing_config: Optional[Dict[str, Any]] = None):
         self.providers_config = providers_config
         self.default_provider = default_provider
+        self.http_config = http_config or {}
         self.logger = logging.getLogger(__name__)
         
+        # One pooled keep-alive session per provider, created on first use
+        self._sessions: Dict[str, aiohttp.ClientSession] = {}
+        
+        # Optional on-disk response cache
+        cache_config = cache_config or {}
+        self.cache: Optional[ResponseCache] = None
+        self.cache_exclude_modes = set(cache_config.get("exclude_modes", []))
+        if cache_config.get("enabled"):
+            try:
+                self.cache = ResponseCache(cache_config)
+            except Exception as e:
+                self.logger.warning(f"LLM response cache disabled: {e}")
+                
+        # Optional routing/hedging across providers
+        routing_config = routing_config or {}
+        self.router: Optional[ProviderRouter] = None
+        self.hedge_after = routing_config.get("hedge_after_ms", 1500) / 1000
+        self.max_parallel = max(1, routing_config.get("max_parallel", 2))
+        if routing_config.get("enabled"):
+            providers = [p for p in routing_config.get("providers", providers_config) if p in providers_config]
+            if not providers:
+                self.logger.warning("None of the LLM routing providers are configured, "
+                                    f"routing to {default_provider} only")
+                providers = [default_provider]
+            self.router = ProviderRouter(providers, default_provider, routing_config)
+            
+
     def _get_provider_config(self, provider: str = None) -> Dict[str, Any]:
         """Get configuration for specified provider"""
         provider = provider or self.default_provider
@@ -23,92 +58,304 @@ class LLMClient:
             
         return self.providers_config[provider]
         
-    async def process_text(self, text: str, mode: str, provider: str = None) -> str:
-        """Process text using specified mode and provider"""
-        try:
-            provider = provider or self.default_provider
-            provider_config = self._get_provider_config(provider)
-            
-            # Get the prompt for this mode
-            if mode not in config.PROCESSING_MODES:
-                raise ValueError(f"Unknown processing mode: {mode}")
-                
-            system_prompt = config.PROCESSING_MODES[mode]
+    def _get_session(self, provider: str) -> aiohttp.ClientSession:
+        """Get the persistent HTTP session for a provider"""
+        session = self._sessions.get(provider)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.http_config.get("pool_size", 4),
+                keepalive_timeout=self.http_config.get("keepalive_timeout", 60)
+            )
+            timeout = aiohttp.ClientTimeout(
+                total=self.http_config.get("timeout", 30),
+                connect=self.http_config.get("connect_timeout", 5)
+            )
+            session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+            self._sessions[provider] = session
+        return session
+        
+    def _build_request(self, text: str, mode: str, provider: str,
+                       stream: bool) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+        """Build the chat/completions URL, headers and payload"""
+        provider_config = self._get_provider_config(provider)
+        
+        # Get the prompt for this mode
+        if mode not in config.PROCESSING_MODES:
+            raise ValueError(f"Unknown processing mode: {mode}")
             
-            # Prepare the API request
-            headers = {
-                "Content-Type": "application/json"
-            }
+        system_prompt = config.PROCESSING_MODES[mode]
+        
+        # Prepare the API request
+        headers = {
+            "Content-Type": "application/json"
+        }
+        
+        # Add authorization if API key is provided
+        api_key = provider_config.get("api_key", "")
+        if api_key:
+            headers["Authorization"] = f"Bearer {api_key}"
             
-            # Add authorization if API key is provided
-            api_key = provider_config.get("api_key", "")
-            if api_key:
-                headers["Authorization"] = f"Bearer {api_key}"
-                
-            # Prepare messages for chat completion
-            messages = [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": text}
-            ]
-            
-            payload = {
-                "model": provider_config["model"],
-                "messages": messages,
-                "temperature": 0.3,  # Slightly creative but focused
-                "max_tokens": 1000,  # Reasonable limit
-                "stream": False  # TODO: v2 - implement streaming
-            }
-            
-            # Make the API request
-            base_url = provider_config["base_url"].rstrip("/")
-            url = f"{base_url}/chat/completions"
-            
-            self.logger.debug(f"Making LLM request to {provider} at {url}")
-            
-            response = requests.post(
-                url,
-                headers=headers,
-                json=payload,
-                timeout=30  # 30 second timeout
-            )
+        # Prepare messages for chat completion
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": text}
+        ]
+        
+        payload = {
+            "model": provider_config["model"],
+            "messages": messages,
+            "temperature": 0.3,  # Slightly creative but focused
+            "max_tokens": 1000,  # Reasonable limit
+            "stream": stream
+        }
+        
+        base_url = provider_config["base_url"].rstrip("/")
+        return f"{base_url}/chat/completions", headers, payload
+        
+    async def stream_text(self, text: str, mode: str, provider: str = None) -> AsyncIterator[str]:
+        """Process text and yield the completion incrementally as it is generated"""
+        provider = provider or self.default_provider
+        url, headers, payload = self._build_request(text, mode, provider, stream=True)
+        
+        self.logger.debug(f"Streaming LLM request to {provider} at {url}")
+        
+        session = self._get_session(provider)
+        async with session.post(url, headers=headers, json=payload) as response:
+            response.raise_for_status()
             
+            # Server-sent events: one "data: {...}" line per chunk, "data: [DONE]" at the end
+            async for raw_line in response.content:
+                line = raw_line.decode("utf-8").strip()
+                if not line.startswith("data:"):
+                    continue
+                    
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                    
+                chunk = json.loads(data)
+                choices = chunk.get("choices") or []
+                if choices:
+                    token = (choices[0].get("delta") or {}).get("content")
+                    if token:
+                        yield token
+                        
+    async def _complete(self, text: str, mode: str, provider: str) -> str:
+        """Process text with a single non-streaming request"""
+        url, headers, payload = self._build_request(text, mode, provider, stream=False)
+        
+        self.logger.debug(f"Making LLM request to {provider} at {url}")
+        
+        session = self._get_session(provider)
+        async with session.post(url, headers=headers, json=payload) as response:
             response.raise_for_status()
             
             # Parse response
-            result = response.json()
+            result = await response.json()
+            
+        if "choices" in result and len(result["choices"]) > 0:
+            processed_text = result["choices"][0]["message"]["content"].strip()
+            
+            # Log token usage if available
+            if "usage" in result:
+                usage = result["usage"]
+                self.logger.debug(f"Token usage - input: {usage.get('prompt_tokens', 'N/A')}, "
+                                f"output: {usage.get('completion_tokens', 'N/A')}, "
+                                f"total: {usage.get('total_tokens', 'N/A')}")
+                                
+            return processed_text
+        else:
+            raise ValueError("No valid response from LLM")
             
-            if "choices" in result and len(result["choices"]) > 0:
-                processed_text = result["choices"][0]["message"]["content"].strip()
+    def _cache_key(self, text: str, mode: str, provider: str) -> str:
+        """Cache key covering everything that determines the completion"""
+        url, _, payload = self._build_request(text, mode, provider, stream=False)
+        return ResponseCache.make_key({"provider": provider, "url": url, **payload})
+        
+    async def process_text(self, text: str, mode: str, provider: str = None,
+                           on_token: Optional[Callable[[str], None]] = None,
+                           use_cache: bool = True) -> str:
+        """Process text using specified mode and provider.
+
+        When streaming is enabled each token is passed to on_token as it arrives;
+        the full completion is returned either way. Cached responses are delivered
+        to on_token in one piece. Without an explicit provider, requests go through
+        the router when routing is enabled.
+
+        Responses are cached under the provider that produced them; a routed
+        request reuses a cached answer from any of its candidate providers.
+        """
+        routed = provider is None and self.router is not None
+        provider = provider or self.default_provider
+        
+        use_cache = use_cache and self.cache is not None and mode not in self.cache_exclude_modes
+        if use_cache:
+            candidates = self.router.ranked() if routed else [provider]
+            cached = self.cache.get_first([self._cache_key(text, mode, p) for p in candidates])
+            if cached is not None:
+                self.logger.info("💾 Using cached LLM response")
+                if on_token:
+                    on_token(cached)
+                return cached
                 
-                # Log token usage if available
-                if "usage" in result:
-                    usage = result["usage"]
-                    self.logger.debug(f"Token usage - input: {usage.get('prompt_tokens', 'N/A')}, "
-                                    f"output: {usage.get('completion_tokens', 'N/A')}, "
-                                    f"total: {usage.get('total_tokens', 'N/A')}")
+        if routed:
+            processed_text, provider = await self._process_routed(text, mode, on_token)
+        else:
+            processed_text = await self._process_uncached(text, mode, provider, on_token)
+            
+        if use_cache:
+            self.cache.put(self._cache_key(text, mode, provider), processed_text)
+        return processed_text
+        
+    async def _process_uncached(self, text: str, mode: str, provider: str,
+                                on_token: Optional[Callable[[str], None]]) -> str:
+        """Send the request to the provider, streaming if enabled"""
+        try:
+            if not self.http_config.get("stream", True):
+                return await self._complete(text, mode, provider)
                 
-                return processed_text
-            else:
+            start = time.monotonic()
+            parts = []
+            async for token in self.stream_text(text, mode, provider):
+                if not parts:
+                    self.logger.debug(f"First LLM token from {provider} after {time.monotonic() - start:.2f}s")
+                parts.append(token)
+                if on_token:
+                    on_token(token)
+                    
+            processed_text = "".join(parts).strip()
+            if not processed_text:
                 raise ValueError("No valid response from LLM")
-                
-        except requests.exceptions.RequestException as e:
+            return processed_text
+            
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
             self.logger.error(f"LLM API request failed: {e}")
             raise
         except Exception as e:
             self.logger.error(f"LLM processing failed: {e}")
             raise
             
-    def test_connection(self, provider: str = None) -> bool:
+    async def _first_response(self, text: str, mode: str, provider: str):
+        """Start a request and wait for its first output.
+
+        Returns (stream, first_token) when streaming, or (None, full_text) otherwise.
+        """
+        if not self.http_config.get("stream", True):
+            return None, await self._complete(text, mode, provider)
+            
+        stream = self.stream_text(text, mode, provider)
+        try:
+            return stream, await stream.__anext__()
+        except StopAsyncIteration:
+            raise ValueError("No valid response from LLM")
+        except BaseException:
+            await stream.aclose()
+            raise
+            
+    async def _process_routed(self, text: str, mode: str,
+                              on_token: Optional[Callable[[str], None]]) -> Tuple[str, str]:
+        """Send to the best provider, hedging to the next one if it misses the latency budget.
+
+        Providers race on time to first token (or the full response when not
+        streaming); the first to answer wins and the others are cancelled. A
+        cancelled provider's elapsed time is recorded as a lower bound on its
+        latency. Failed providers are replaced by the next candidate until none
+        are left. Returns (text, provider that answered).
+        """
+        candidates = self.router.ranked()
+        pending: Dict[asyncio.Task, Tuple[str, float]] = {}
+        errors = []
+        winner = None
+        next_candidate = 0
+        
+        def launch():
+            nonlocal next_candidate
+            provider = candidates[next_candidate]
+            next_candidate += 1
+            task = asyncio.create_task(self._first_response(text, mode, provider))
+            pending[task] = (provider, time.monotonic())
+            
+        launch()
+        try:
+            while pending and winner is None:
+                can_hedge = len(pending) < self.max_parallel and next_candidate < len(candidates)
+                done, _ = await asyncio.wait(pending, timeout=self.hedge_after if can_hedge else None,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    self.logger.info(f"⏱️ No LLM response within {self.hedge_after:.1f}s, "
+                                     f"hedging to {candidates[next_candidate]}")
+                    launch()
+                    continue
+                    
+                for task in done:
+                    provider, launched = pending.pop(task)
+                    if task.exception() is not None:
+                        self.router.record_failure(provider)
+                        errors.append(f"{provider}: {task.exception()}")
+                    elif winner is None:
+                        winner = (provider, launched, task.result())
+                    else:
+                        # Answered in the same instant as the winner: a real measurement
+                        self.router.record_success(provider, time.monotonic() - launched)
+                        if task.result()[0] is not None:
+                            await task.result()[0].aclose()
+                        
+                # Fail over to the next candidate once everything in flight has failed
+                if winner is None and not pending and next_candidate < len(candidates):
+                    launch()
+        finally:
+            now = time.monotonic()
+            for task, (provider, launched) in pending.items():
+                task.cancel()
+                self.router.record_censored(provider, now - launched)
+            await asyncio.gather(*pending, return_exceptions=True)
+            
+        if winner is None:
+            raise RuntimeError(f"All LLM providers failed: {'; '.join(errors)}")
+            
+        provider, launched, (stream, first) = winner
+        latency = time.monotonic() - launched
+        self.logger.debug(f"LLM provider {provider} answered first after {latency:.2f}s")
+        if on_token:
+            on_token(first)
+        if stream is None:
+            self.router.record_success(provider, latency)
+            return first.strip(), provider
+            
+        parts = [first]
+        try:
+            async for token in stream:
+                parts.append(token)
+                if on_token:
+                    on_token(token)
+        except Exception:
+            self.router.record_failure(provider)
+            raise
+        self.router.record_success(provider, latency)
+        return "".join(parts).strip(), provider
+        
+    async def close(self):
+        """Close the pooled provider sessions and the response cache"""
+        for session in self._sessions.values():
+            await session.close()
+        self._sessions.clear()
+        if self.cache is not None:
+            stats = self.cache.get_stats()
+            self.logger.info(f"💾 LLM cache: {stats['hits']} hit(s), {stats['misses']} miss(es)")
+            self.cache.close()
+            self.cache = None
+        
+    async def test_connection(self, provider: str = None) -> bool:
         """Test connection to the LLM provider"""
         try:
             provider = provider or self.default_provider
-            provider_config = self._get_provider_config(provider)
             
             # Simple test with minimal input
-            test_result = self.process_text(
-                "Hello", 
-                "transcribe", 
-                provider
+            await self.process_text(
+                "Hello",
+                "transcribe+",
+                provider,
+                use_cache=False
             )
             
             self.logger.info(f"LLM connection test successful for {provider}")
@@ -124,4 +371,4 @@ class LLMClient:
         
     def get_available_modes(self) -> list:
         """Get list of available processing modes"""
-        return list(config.PROCESSING_MODES.keys())
\ No newline at end of file
+        return list(config.PROCESSING_MODES.keys())
@@ -0,0 +1,67 @@
+"""
+Spoken mode switching: pick the processing mode from the first words of a transcript
+"""
+import re
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+# Spoken forms of mode names that Whisper will not transcribe literally
+DEFAULT_ALIASES = {
+    "transcribe plus": "transcribe+",
+    "clean up": "transcribe+",
+    "summary": "summarize",
+    "notes": "meeting",
+    "meeting notes": "meeting",
+    "to do": "tasks",
+    "todo": "tasks",
+    "to-do": "tasks",
+    "task": "tasks",
+    "q and a": "qa",
+    "q&a": "qa",
+    "question": "qa",
+}
+
+# What may follow the mode phrase: Whisper renders a spoken pause as ":", ",", "." or a dash
+SEPARATOR = r"[:,.;!?\-–—]+"
+
+
+class ModeDetector:
+    """Matches a leading mode phrase such as "Email:" or "Tasks, ..." in one precompiled regex.
+
+    The pattern is anchored at the start and only tries the known phrases, so a
+    transcript that does not start with one fails after a few characters; the cost
+    does not grow with the transcript length. With require_separator (the default)
+    the phrase must be followed by punctuation, so "Email is down again" stays plain
+    dictation while "Email: the server is down" becomes an email.
+    """
+    
+    def __init__(self, modes: Iterable[str], spoken_config: Dict[str, Any]):
+        modes = set(modes)
+        self.phrases: Dict[str, str] = {}
+        for mode in modes:
+            self.phrases[mode.lower()] = mode
+        for phrase, mode in {**DEFAULT_ALIASES, **(spoken_config.get("aliases") or {})}.items():
+            if mode in modes:
+                self.phrases[phrase.lower()] = mode
+                
+        # Longest first so "meeting notes" wins over "meeting"
+        alternatives = "|".join(
+            r"\s+".join(re.escape(word) for word in phrase.split())
+            for phrase in sorted(self.phrases, key=len, reverse=True)
+        )
+        separator = SEPARATOR if spoken_config.get("require_separator", True) else rf"(?:{SEPARATOR}|\s)"
+        self.pattern = re.compile(
+            rf"^\W*(?:mode\s+)?(?P<phrase>{alternatives})(?:\s+mode)?"
+            rf"\s*{separator}\s*",
+            re.IGNORECASE
+        )
+        
+    def detect(self, text: str) -> Tuple[Optional[str], str]:
+        """(mode, text without the phrase), or (None, text) when it does not start with one"""
+        match = self.pattern.match(text)
+        if match is None:
+            return None, text
+        rest = text[match.end():]
+        if not rest.strip():
+            return None, text  # Just the word "Email." is dictation, not a mode switch
+        phrase = " ".join(match.group("phrase").lower().split())
+        return self.phrases[phrase], rest[:1].upper() + rest[1:]
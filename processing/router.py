@@ -0,0 +1,120 @@
+"""
+Provider health tracking and routing for LLMClient
+"""
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+
+class ProviderHealth:
+    """Latency/error EWMAs and a circuit breaker for one provider"""
+    
+    def __init__(self, name: str, alpha: float, failure_threshold: int, cooldown_seconds: float):
+        self.name = name
+        self.alpha = alpha
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        
+        self.latency_ewma: Optional[float] = None
+        self.error_ewma = 0.0
+        self.consecutive_failures = 0
+        self.state = "closed"  # closed (healthy) -> open (skipped) -> half_open (probing)
+        self.opened_at = 0.0
+        self.requests = 0
+        self.failures = 0
+        
+    def available(self, now: float) -> bool:
+        """Whether requests may be sent; an open breaker half-opens after the cooldown"""
+        if self.state == "open" and now - self.opened_at >= self.cooldown_seconds:
+            self.state = "half_open"
+        return self.state != "open"
+        
+    def record_success(self, latency: float):
+        self.requests += 1
+        self.latency_ewma = latency if self.latency_ewma is None else (
+            self.alpha * latency + (1 - self.alpha) * self.latency_ewma
+        )
+        self.error_ewma = (1 - self.alpha) * self.error_ewma
+        self.consecutive_failures = 0
+        self.state = "closed"
+        
+    def record_censored(self, elapsed: float):
+        """A request abandoned after elapsed seconds: the latency was at least that long.
+
+        Only raises the estimate, so a provider that keeps losing hedges is not
+        ranked on its optimistic prior forever.
+        """
+        if self.latency_ewma is None or elapsed > self.latency_ewma:
+            self.latency_ewma = elapsed if self.latency_ewma is None else (
+                self.alpha * elapsed + (1 - self.alpha) * self.latency_ewma
+            )
+            
+    def record_failure(self, now: float):
+        self.requests += 1
+        self.failures += 1
+        self.error_ewma = self.alpha + (1 - self.alpha) * self.error_ewma
+        self.consecutive_failures += 1
+        # A failed probe re-opens immediately; otherwise open after repeated failures
+        if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+            self.state = "open"
+            self.opened_at = now
+            
+    def score(self, prior_latency: float) -> float:
+        """Expected latency penalized by recent errors (lower is better)"""
+        latency = prior_latency if self.latency_ewma is None else self.latency_ewma
+        return latency * (1 + 4 * self.error_ewma)
+
+
+class ProviderRouter:
+    """Ranks providers by health so LLMClient can route to, and hedge across, the fastest ones"""
+    
+    def __init__(self, providers: List[str], default_provider: str, routing_config: Dict[str, Any]):
+        if not providers:
+            raise ValueError("LLM routing needs at least one configured provider")
+        self.default_provider = default_provider
+        self.prior_latency = routing_config.get("hedge_after_ms", 1500) / 1000
+        self.logger = logging.getLogger(__name__)
+        self.health = {
+            name: ProviderHealth(
+                name,
+                alpha=routing_config.get("ewma_alpha", 0.3),
+                failure_threshold=routing_config.get("failure_threshold", 3),
+                cooldown_seconds=routing_config.get("cooldown_seconds", 30)
+            )
+            for name in providers
+        }
+        
+    def ranked(self) -> List[str]:
+        """Available providers, fastest healthy first; all providers if every breaker is open"""
+        now = time.monotonic()
+        available = [h for h in self.health.values() if h.available(now)]
+        if not available:
+            self.logger.warning("All LLM provider circuits are open, trying every provider")
+            available = list(self.health.values())
+        available.sort(key=lambda h: (h.score(self.prior_latency), h.name != self.default_provider))
+        return [h.name for h in available]
+        
+    def record_success(self, provider: str, latency: float):
+        self.health[provider].record_success(latency)
+        
+    def record_censored(self, provider: str, elapsed: float):
+        self.health[provider].record_censored(elapsed)
+        
+    def record_failure(self, provider: str):
+        health = self.health[provider]
+        health.record_failure(time.monotonic())
+        if health.state == "open":
+            self.logger.warning(f"LLM provider {provider} circuit open for {health.cooldown_seconds}s")
+            
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-provider health snapshot"""
+        return {
+            name: {
+                "state": h.state,
+                "latency_ewma": h.latency_ewma,
+                "error_ewma": h.error_ewma,
+                "requests": h.requests,
+                "failures": h.failures,
+            }
+            for name, h in self.health.items()
+        }
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Throughput micro-benchmark for the streaming polyphase resampler.
+
+Feeds white noise through audio.resample.StreamingResampler in capture-sized
+blocks and reports input samples per second and the real-time factor for each
+native rate. scipy.signal.resample_poly on the whole signal is shown for
+comparison when SciPy is installed.
+
+    python scripts/bench_resampler.py --seconds 30 --block-ms 30
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio.resample import StreamingResampler
+
+
+def bench_streaming(in_rate: int, out_rate: int, audio: np.ndarray, block: int, taps: int, repeat: int) -> float:
+    """Best-of-repeat seconds to resample audio block by block"""
+    best = float("inf")
+    for _ in range(repeat):
+        resampler = StreamingResampler(in_rate, out_rate, taps)
+        start = time.perf_counter()
+        for offset in range(0, len(audio), block):
+            resampler.process(audio[offset:offset + block])
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_scipy(in_rate: int, out_rate: int, audio: np.ndarray, repeat: int):
+    try:
+        from scipy.signal import resample_poly
+    except ImportError:
+        return None
+    from math import gcd
+    divisor = gcd(in_rate, out_rate)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        resample_poly(audio, out_rate // divisor, in_rate // divisor)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rates", type=int, nargs="+", default=[48000, 44100, 32000, 22050],
+                        help="Native capture rates to convert from")
+    parser.add_argument("--out-rate", type=int, default=16000, help="Target rate")
+    parser.add_argument("--seconds", type=float, default=30, help="Audio length per run")
+    parser.add_argument("--block-ms", type=float, default=30, help="Capture block size")
+    parser.add_argument("--taps", type=int, default=24, help="Filter taps per phase")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per rate (the best is used)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'rate':>7} {'ratio':>9} {'Msamples/s':>11} {'x realtime':>11} {'per block':>10} {'scipy x rt':>11}")
+    for in_rate in args.rates:
+        audio = rng.standard_normal(int(in_rate * args.seconds)).astype(np.float32)
+        block = max(1, int(in_rate * args.block_ms / 1000))
+        seconds = bench_streaming(in_rate, args.out_rate, audio, block, args.taps, args.repeat)
+        blocks = -(-len(audio) // block)
+        reference = bench_scipy(in_rate, args.out_rate, audio, args.repeat)
+
+        resampler = StreamingResampler(in_rate, args.out_rate, args.taps)
+        print(f"{in_rate:>7} {resampler.up:>4}/{resampler.down:<4} {len(audio) / seconds / 1e6:>11.2f} "
+              f"{args.seconds / seconds:>10.0f}x {seconds / blocks * 1e6:>8.0f}us "
+              f"{f'{args.seconds / reference:.0f}x' if reference else '-':>11}")
+
+
+if __name__ == "__main__":
+    main()
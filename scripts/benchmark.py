@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+End-to-end latency benchmark for Vibe Transcribe.
+
+Drives VibeTranscribe without hotkeys: the microphone is replaced by a WAV file
+played back in real time and the LLM provider by a local OpenAI-compatible stub
+with configurable latency. Reports release-to-clipboard latency percentiles,
+throughput and memory, and can save/compare JSON baselines.
+
+    python scripts/benchmark.py speech.wav --runs 20 --output baseline.json
+    python scripts/benchmark.py speech.wav --runs 20 --compare baseline.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import time
+import types
+import wave
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transcription.benchmark import peak_rss_mb
+
+
+def load_wav(path: str):
+    """Read a PCM WAV file as float32 of shape (frames, channels), plus its sample rate"""
+    with wave.open(path, "rb") as wav:
+        rate = wav.getframerate()
+        channels = wav.getnchannels()
+        width = wav.getsampwidth()
+        raw = wav.readframes(wav.getnframes())
+    if width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif width == 2:
+        samples = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768
+    elif width == 4:
+        samples = np.frombuffer(raw, dtype="<i4").astype(np.float32) / 2147483648
+    else:
+        raise ValueError(f"Unsupported WAV sample width: {width} bytes")
+    return samples.reshape(-1, channels), rate
+
+
+class FakeRecorder:
+    """Context manager with soundcard's record()/flush() API, paced like a real device"""
+
+    def __init__(self, audio: np.ndarray, samplerate: int, channels: int, blocksize: Optional[int]):
+        self.audio = audio
+        self.samplerate = samplerate
+        self.channels = channels
+        self.blocksize = blocksize or 1024
+        self.position = 0
+
+    def __enter__(self):
+        self.started_at = time.monotonic()
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def _read(self, frames: int) -> np.ndarray:
+        # Loop the file so recordings can be longer than the clip
+        indices = (np.arange(self.position, self.position + frames)) % len(self.audio)
+        self.position += frames
+        block = self.audio[indices]
+        if block.shape[1] != self.channels:
+            block = np.repeat(block[:, :1], self.channels, axis=1)
+        return block
+
+    def record(self, numframes: Optional[int] = None) -> np.ndarray:
+        frames = numframes or self.blocksize
+        # Block until the samples would have been captured, without accumulating drift
+        due = self.started_at + (self.position + frames) / self.samplerate
+        delay = due - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        return self._read(frames)
+
+    def flush(self) -> np.ndarray:
+        # Samples captured since the last full block
+        elapsed = int((time.monotonic() - self.started_at) * self.samplerate) - self.position
+        return self._read(max(0, min(elapsed, self.blocksize)))
+
+
+class FakeMicrophone:
+    """Stands in for a soundcard microphone, replaying a WAV file from the start on each recording"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.audio, self.rate = load_wav(path)
+        self.name = f"WAV file {os.path.basename(path)}"
+
+    def recorder(self, samplerate: int, channels: int = 1, blocksize: Optional[int] = None) -> FakeRecorder:
+        audio = self.audio
+        if samplerate != self.rate:
+            # Linear interpolation is plenty for a latency benchmark
+            positions = np.arange(0, len(audio), self.rate / samplerate)
+            audio = np.stack([np.interp(positions, np.arange(len(audio)), audio[:, c])
+                              for c in range(audio.shape[1])], axis=1).astype(np.float32)
+        return FakeRecorder(audio, samplerate, channels, blocksize)
+
+    def __repr__(self):
+        return f"<FakeMicrophone {self.name}>"
+
+
+def install_fake_soundcard(microphone: FakeMicrophone):
+    """Replace the soundcard module before the recorder imports it"""
+    module = types.ModuleType("soundcard")
+    module.default_microphone = lambda: microphone
+    module.all_microphones = lambda include_loopback=False: [microphone]
+    module.all_speakers = lambda: []
+    module.get_microphone = lambda id, include_loopback=False: microphone
+    sys.modules["soundcard"] = module
+
+
+async def start_stub_llm(ttft_ms: float, token_ms: float, tokens: int):
+    """Start a local OpenAI-compatible /chat/completions server; returns (runner, base_url)"""
+    from aiohttp import web
+
+    async def completions(request: web.Request) -> web.StreamResponse:
+        payload = await request.json()
+        words = payload["messages"][-1]["content"].split()
+        if tokens:
+            words = (words * (tokens // max(1, len(words)) + 1))[:tokens] if words else ["ok"] * tokens
+        await asyncio.sleep(ttft_ms / 1000)
+
+        if not payload.get("stream"):
+            await asyncio.sleep(token_ms * max(0, len(words) - 1) / 1000)
+            return web.json_response({"choices": [{"message": {"role": "assistant", "content": " ".join(words)}}]})
+
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        for index, word in enumerate(words):
+            if index:
+                await asyncio.sleep(token_ms / 1000)
+            chunk = {"choices": [{"delta": {"content": word if index == 0 else " " + word}}]}
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+    app = web.Application()
+    app.router.add_post("/v1/chat/completions", completions)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    return runner, f"http://127.0.0.1:{port}/v1"
+
+
+class FakeClipboard:
+    """Records when text arrives instead of touching the system clipboard"""
+
+    def __init__(self):
+        self.copies: List[Tuple[float, str]] = []
+
+    def copy_to_clipboard(self, text: str, verify: bool = True) -> bool:
+        self.copies.append((time.monotonic(), text))
+        return True
+
+    def get_from_clipboard(self) -> Optional[str]:
+        return self.copies[-1][1] if self.copies else None
+
+
+def percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    if not values:
+        return {"p50": None, "p95": None, "p99": None, "mean": None}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {"p50": float(p50), "p95": float(p95), "p99": float(p99), "mean": float(np.mean(values))}
+
+
+async def run_benchmark(args) -> Dict[str, Any]:
+    install_fake_soundcard(FakeMicrophone(args.wav))
+    runner, base_url = await start_stub_llm(args.llm_ttft_ms, args.llm_token_ms, args.llm_tokens)
+
+    import config
+    from service import VibeTranscribe
+
+    # Point the pipeline at the stub and keep caches from hiding latency
+    config.LLM_PROVIDERS["benchmark"] = {"api_key": "", "base_url": base_url, "model": "stub"}
+    config.DEFAULT_PROVIDER = "benchmark"
+    config.DEFAULT_MODE = args.mode
+    config.LLM_CACHE["enabled"] = False
+    config.LLM_ROUTING["enabled"] = False
+    config.LLM_HTTP["echo_tokens"] = False
+    config.METRICS["enabled"] = False
+    config.OUTPUT["sinks"] = ["clipboard"]
+
+    vibe = VibeTranscribe(preload=True)
+    clipboard = vibe.output.get_sink("clipboard").clipboard = FakeClipboard()
+    finished = asyncio.Queue()
+    record_trace = vibe.metrics.record_trace
+
+    def on_finished(trace):
+        record_trace(trace)
+        finished.put_nowait(trace)
+
+    vibe.metrics.record_trace = on_finished
+
+    # What VibeTranscribe.run() does, minus the hotkey listener
+    loop = asyncio.get_running_loop()
+    vibe._record_lock = asyncio.Lock()
+    vibe.jobs.start()
+    start = time.monotonic()
+    await loop.run_in_executor(None, vibe.whisper.preload, True)
+    load_seconds = time.monotonic() - start
+    rss_after_load = peak_rss_mb()
+
+    latencies: List[float] = []
+    failures = 0
+    try:
+        wall_start = time.monotonic()
+        for run in range(args.runs):
+            await vibe._handle_start_recording()
+            await asyncio.sleep(args.record_seconds)
+            copies_before = len(clipboard.copies)
+            release = time.monotonic()
+            await vibe._handle_stop_recording()
+
+            try:
+                await asyncio.wait_for(finished.get(), timeout=args.timeout)
+            except asyncio.TimeoutError:
+                pass
+            copies = clipboard.copies[copies_before:]
+            if copies:
+                latencies.append(copies[-1][0] - release)
+                print(f"run {run + 1}/{args.runs}: {latencies[-1] * 1000:.0f} ms")
+            else:
+                failures += 1
+                print(f"run {run + 1}/{args.runs}: no text copied")
+            await asyncio.sleep(args.gap)
+        wall_seconds = time.monotonic() - wall_start
+    finally:
+        await vibe.jobs.stop()
+        await vibe.llm.close()
+        vibe.whisper.shutdown()
+        vibe.output.close()
+        await runner.cleanup()
+
+    completed = len(latencies)
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "settings": {
+            "wav": os.path.basename(args.wav),
+            "runs": args.runs,
+            "record_seconds": args.record_seconds,
+            "mode": args.mode,
+            "llm_ttft_ms": args.llm_ttft_ms,
+            "llm_token_ms": args.llm_token_ms,
+            "model": config.WHISPER["model"],
+            "compute_type": config.WHISPER.get("compute_type", "default"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+        },
+        "release_to_clipboard": percentiles(latencies),
+        "throughput": {
+            "completed": completed,
+            "failed": failures,
+            "dictations_per_minute": completed / wall_seconds * 60 if wall_seconds else None,
+            "audio_seconds_per_second": completed * args.record_seconds / wall_seconds if wall_seconds else None,
+        },
+        "memory": {"rss_after_load_mb": rss_after_load, "peak_rss_mb": peak_rss_mb()},
+        "model_load_seconds": load_seconds,
+        "stages": vibe.metrics.get_stats()["stages"],
+    }
+
+
+# Lower is better for every compared metric
+COMPARED = [
+    ("release_to_clipboard", "p50"),
+    ("release_to_clipboard", "p95"),
+    ("release_to_clipboard", "p99"),
+    ("memory", "peak_rss_mb"),
+]
+
+
+def compare(result: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> bool:
+    """Print metric deltas against a baseline; False if any regressed beyond tolerance"""
+    ok = True
+    for section, key in COMPARED:
+        current = result.get(section, {}).get(key)
+        previous = baseline.get(section, {}).get(key)
+        if current is None or not previous:
+            continue
+        change = current / previous - 1
+        regressed = change > tolerance
+        ok = ok and not regressed
+        print(f"  {section}.{key}: {previous:.3f} -> {current:.3f} ({change:+.1%}){'  REGRESSION' if regressed else ''}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("wav", help="WAV file played back as the microphone")
+    parser.add_argument("--runs", type=int, default=20, help="Dictations to simulate")
+    parser.add_argument("--record-seconds", type=float, default=5.0, help="Length of each recording")
+    parser.add_argument("--gap", type=float, default=0.5, help="Pause between dictations")
+    parser.add_argument("--mode", default="transcribe+", help='Processing mode ("transcribe" skips the LLM)')
+    parser.add_argument("--llm-ttft-ms", type=float, default=300, help="Stub LLM time to first token")
+    parser.add_argument("--llm-token-ms", type=float, default=15, help="Stub LLM delay between tokens")
+    parser.add_argument("--llm-tokens", type=int, default=0, help="Tokens per stub response (0 = echo the input)")
+    parser.add_argument("--timeout", type=float, default=120, help="Seconds to wait for each dictation")
+    parser.add_argument("--output", help="Save results as a JSON baseline")
+    parser.add_argument("--compare", help="Baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed regression (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    result = asyncio.run(run_benchmark(args))
+
+    latency = result["release_to_clipboard"]
+    throughput = result["throughput"]
+    print("\n=== Release to clipboard ===")
+    if latency["p50"] is not None:
+        print(f"p50 {latency['p50'] * 1000:.0f} ms  p95 {latency['p95'] * 1000:.0f} ms  "
+              f"p99 {latency['p99'] * 1000:.0f} ms  mean {latency['mean'] * 1000:.0f} ms")
+    print(f"{throughput['completed']} completed, {throughput['failed']} failed, "
+          f"{throughput['dictations_per_minute'] or 0:.1f} dictations/min")
+    peak = result["memory"]["peak_rss_mb"]
+    print(f"Model load {result['model_load_seconds']:.1f}s, "
+          f"peak RSS {f'{peak:.0f} MB' if peak is not None else 'unavailable'}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"Saved baseline to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"\n=== Compared with {args.compare} ===")
+        if not compare(result, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Import-time budget check for the lightweight CLI commands.
+
+Runs each command in a fresh interpreter with `-X importtime` and fails if its
+total import time exceeds the budget or if it imports a heavy dependency that
+only the service, model or audio commands need.
+
+    python scripts/check_import_time.py --budget-ms 150
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Set, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+COMMANDS = [
+    ["--help"],
+    ["show-config"],
+    ["config-setup"],
+    ["stats", "--help"],
+    ["client", "--help"],
+]
+
+# Modules that must stay out of the lightweight commands
+HEAVY_MODULES = (
+    "faster_whisper", "ctranslate2", "onnxruntime", "soundcard", "keyboard",
+    "pyperclip", "aiohttp", "av", "numpy", "requests",
+)
+
+LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( +)(\S+)")
+
+
+def measure(command: List[str]) -> Tuple[float, Dict[str, float], Set[str]]:
+    """Total import time in ms, the cumulative ms of each top-level import and all top-level packages"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "main.py", *command],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"`main.py {' '.join(command)}` failed:\n{result.stderr[-2000:]}")
+        
+    top_level: Dict[str, float] = {}
+    imported = set()
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if not match:
+            continue
+        _, cumulative, indent, module = match.groups()
+        imported.add(module.split(".")[0])
+        if len(indent) == 1:  # Nested imports are indented further
+            top_level[module] = int(cumulative) / 1000
+    return sum(top_level.values()), top_level, imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=150, help="Maximum import time per command")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per command (the median is used)")
+    args = parser.parse_args()
+    
+    failed = False
+    for command in COMMANDS:
+        name = " ".join(command)
+        measure(command)  # Warm the bytecode cache
+        runs = [measure(command) for _ in range(max(1, args.repeat))]
+        total = statistics.median(run[0] for run in runs)
+        top_level, imported = runs[-1][1], runs[-1][2]
+        
+        heavy = sorted(imported.intersection(HEAVY_MODULES))
+        over = total > args.budget_ms
+        failed = failed or over or bool(heavy)
+        
+        print(f"{'FAIL' if over or heavy else 'ok  '} {name:<16} {total:7.1f} ms")
+        if heavy:
+            print(f"     imports heavy modules: {', '.join(heavy)}")
+        if over or heavy:
+            slowest = sorted(top_level.items(), key=lambda item: item[1], reverse=True)[:5]
+            for module, ms in slowest:
+                print(f"     {ms:7.1f} ms  {module}")
+                
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,426 @@
+"""
+The Vibe Transcribe service: hotkeys, recording and the dictation pipeline
+"""
+import asyncio
+import itertools
+import logging
+import sys
+import time
+from dataclasses import dataclass
+from typing import Optional
+import numpy as np
+
+import config
+from audio.hotkeys import HotkeyManager
+from audio.recorder import create_recorder
+from audio.vad import create_vad
+from transcription.whisper_client import WhisperClient, TranscriptionCancelled
+from transcription.streaming import StreamingTranscriber
+from processing.llm_client import LLMClient
+from utils.output import OutputRouter
+from utils.job_queue import JobQueue
+from utils.metrics import Metrics, MetricsServer, Trace
+
+
+@dataclass
+class Dictation:
+    """A finished recording waiting in the processing queue"""
+    audio: np.ndarray
+    stream: Optional[StreamingTranscriber] = None
+    draft: Optional[str] = None  # Draft-tier text already sent to the output sinks
+    trace: Optional[Trace] = None
+    mode: Optional[str] = None   # Processing mode override (defaults to config.DEFAULT_MODE)
+
+
+class VibeTranscribe:
+    def __init__(self, preload: Optional[bool] = None, api: Optional[bool] = None):
+        self.logger = logging.getLogger(__name__)
+        # Per-dictation stage timings, aggregated into histograms
+        self.metrics = Metrics()
+        self.output = OutputRouter(config.OUTPUT, self.metrics)
+        self.whisper = WhisperClient(config.WHISPER)
+        self.llm = LLMClient(config.LLM_PROVIDERS, config.DEFAULT_PROVIDER, config.LLM_HTTP,
+                             config.LLM_CACHE, config.LLM_ROUTING)
+        self.recorder = create_recorder(config.AUDIO)
+        self.vad = create_vad(config.VAD, self.recorder.sample_rate)
+        self.hotkey_manager = HotkeyManager(config.HOTKEYS, self.metrics)
+        self.stream: Optional[StreamingTranscriber] = None
+        self.preload = config.WHISPER.get("preload", True) if preload is None else preload
+        
+        # Finished recordings are processed in order by a bounded worker pool
+        self.jobs = JobQueue(
+            self._process_dictation,
+            max_queue=config.PIPELINE.get("max_queue", 4),
+            concurrency=config.PIPELINE.get("concurrency", 1),
+            backpressure=config.PIPELINE.get("backpressure", "queue"),
+            coalesce=self._coalesce_dictations,
+            metrics=self.metrics
+        )
+        self._record_lock: Optional[asyncio.Lock] = None
+        
+        self.metrics_server = MetricsServer(
+            self.metrics, config.METRICS.get("host", "127.0.0.1"), config.METRICS.get("port", 9477)
+        ) if config.METRICS.get("enabled") else None
+        self._job_ids = itertools.count(1)
+        self._trace: Optional[Trace] = None
+        self._record_mode: Optional[str] = None
+        self._last_dictation: Optional[Dictation] = None
+        
+        # Leading "Email: ..." style phrases choose the processing mode per dictation
+        self.mode_detector = None
+        if config.SPOKEN_MODES.get("enabled"):
+            from processing.modes import ModeDetector
+            self.mode_detector = ModeDetector(["transcribe", *config.PROCESSING_MODES], config.SPOKEN_MODES)
+            
+        # Opt-in store of recordings and results for replay/reprocess
+        self.history = None
+        if config.HISTORY.get("enabled"):
+            from utils.history import HistoryStore
+            self.history = HistoryStore(config.HISTORY)
+            
+        # Local API so other processes can use the warm model
+        self.api_server = None
+        if config.API.get("enabled") if api is None else api:
+            from utils.api_server import APIServer
+            self.api_server = APIServer(self, config.API)
+        
+        # Set up callbacks
+        self.hotkey_manager.set_callbacks(
+            toggle_callback=self._handle_toggle_recording,
+            hold_start_callback=self._handle_start_recording,
+            hold_end_callback=self._handle_stop_recording,
+            cancel_callback=self._handle_cancel,
+            reprocess_callback=self._handle_reprocess,
+            mode_callback=self._handle_mode_recording
+        )
+        
+    async def _handle_toggle_recording(self, event_at: Optional[float] = None):
+        """Handle toggle recording hotkey"""
+        dictation = None
+        async with self._record_lock:
+            if self.recorder.is_recording:
+                dictation = await self._stop_recording(event_at)
+            else:
+                self._start_recording(event_at=event_at)
+        await self._enqueue(dictation)
+            
+    async def _handle_start_recording(self, event_at: Optional[float] = None):
+        """Handle start of hold-to-record"""
+        async with self._record_lock:
+            self._start_recording(event_at=event_at)
+        
+    async def _handle_stop_recording(self, event_at: Optional[float] = None):
+        """Handle end of hold-to-record"""
+        async with self._record_lock:
+            dictation = await self._stop_recording(event_at)
+        await self._enqueue(dictation)
+        
+    async def _handle_mode_recording(self, mode: str, event_at: Optional[float] = None):
+        """Handle a per-mode hotkey: toggle a recording processed with that mode"""
+        dictation = None
+        async with self._record_lock:
+            if self.recorder.is_recording:
+                dictation = await self._stop_recording(event_at)
+            else:
+                self._start_recording(mode, event_at)
+        await self._enqueue(dictation)
+                
+    async def _handle_cancel(self, event_at: Optional[float] = None):
+        """Discard the current recording, or cancel in-flight transcriptions when idle"""
+        async with self._record_lock:
+            if not self.recorder.is_recording:
+                cancelled = self.whisper.cancel_all()
+                self.logger.info(f"🗑️ Cancelled {cancelled} transcription(s)")
+                return
+                
+            self._trace = None
+            self._record_mode = None
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self.recorder.stop_recording)
+            stream = self._detach_stream()
+            if stream is not None:
+                stream.finish(timeout=0)
+            self.metrics.increment("cancelled")
+            self.logger.info("🗑️ Recording discarded")
+            
+    async def _handle_reprocess(self, event_at: Optional[float] = None):
+        """Queue the last recording again, e.g. after a failed LLM call"""
+        last = self._last_dictation
+        if last is None:
+            self.logger.warning("Nothing to reprocess yet")
+            return
+        self.logger.info("🔁 Reprocessing the last recording")
+        await self.jobs.submit(Dictation(last.audio, mode=last.mode))
+        
+    def _start_recording(self, mode: Optional[str] = None, event_at: Optional[float] = None):
+        """Start audio recording, optionally with a processing mode for this dictation.
+
+        event_at is the time.monotonic() of the hotkey press, when there was one.
+        """
+        try:
+            if config.PIPELINE.get("preempt") and not self.recorder.is_recording:
+                cancelled = self.whisper.cancel_all()
+                if cancelled:
+                    self.metrics.increment("jobs_preempted", cancelled)
+                    self.logger.info(f"⏹️ New recording preempted {cancelled} transcription(s)")
+            if config.STREAMING.get("enabled") and not self.recorder.is_recording:
+                self.stream = StreamingTranscriber(self.whisper, config.STREAMING, self.recorder.sample_rate)
+                self.stream.start()
+                self.recorder.set_chunk_callback(self.stream.feed)
+            starting = not self.recorder.is_recording
+            self.recorder.start_recording()
+            if starting:
+                self._record_mode = mode
+                self._trace = Trace(next(self._job_ids))
+                self._trace.span("hotkey_to_record", event_at)
+                self._trace.mark("record_start")
+            self.logger.info("🎤 Recording started...")
+        except Exception as e:
+            stream = self._detach_stream()
+            if stream is not None:
+                stream.finish(timeout=0)
+            self.logger.error(f"Failed to start recording: {e}")
+            
+    def _detach_stream(self) -> Optional[StreamingTranscriber]:
+        """Detach the streaming session from the recorder"""
+        stream, self.stream = self.stream, None
+        if stream is not None:
+            self.recorder.set_chunk_callback(None)
+        return stream
+        
+    async def _stop_recording(self, event_at: Optional[float] = None) -> Optional[Dictation]:
+        """Stop recording and return the dictation to queue, None if nothing was captured"""
+        trace, self._trace = self._trace, None
+        mode, self._record_mode = self._record_mode, None
+        release = event_at if event_at is not None else time.monotonic()
+        try:
+            loop = asyncio.get_running_loop()
+            stop_start = time.monotonic()
+            audio_data = await loop.run_in_executor(None, self.recorder.stop_recording)
+            stream = self._detach_stream()
+            if trace is not None:
+                trace.mark("release", release)
+                trace.span("record", trace.marks.get("record_start"), stop_start)
+                trace.span("stop_flush", stop_start)
+            if audio_data is None:
+                self.logger.warning("No audio data captured")
+                if stream is not None:
+                    stream.finish(timeout=0)
+                return None
+                
+            self._last_dictation = Dictation(audio_data, mode=mode)
+            return Dictation(audio_data, stream, trace=trace, mode=mode)
+            
+        except Exception as e:
+            self.logger.error(f"Failed to stop recording: {e}")
+            return None
+            
+    async def _enqueue(self, dictation: Optional[Dictation]):
+        """Queue a finished recording for processing.
+
+        With the "queue" backpressure policy this waits for space, so it must run
+        after _record_lock is released; otherwise a full queue would block the
+        next record and cancel hotkeys until a job finishes.
+        """
+        if dictation is None:
+            return
+        if dictation.trace is not None:
+            dictation.trace.mark("enqueued")
+        await self.jobs.submit(dictation)
+            
+    def _coalesce_dictations(self, pending: Dictation, new: Dictation) -> Dictation:
+        """Merge a new recording into a queued one when the queue is full"""
+        # Streaming sessions only cover their own recording, so fall back to a full decode
+        for stream in (pending.stream, new.stream):
+            if stream is not None:
+                stream.finish(timeout=0)
+        return Dictation(np.concatenate([pending.audio, new.audio]), trace=pending.trace, mode=pending.mode)
+            
+    async def _trim_silence(self, audio_data: np.ndarray) -> np.ndarray:
+        """Run the VAD stage, returning audio with silence trimmed"""
+        if self.vad is None:
+            return audio_data
+            
+        loop = asyncio.get_running_loop()
+        trimmed, result = await loop.run_in_executor(None, self.vad.process, audio_data)
+        self.logger.info(f"✂️ VAD saved {result.saved_seconds:.1f}s "
+                         f"({result.original_seconds:.1f}s -> {result.trimmed_seconds:.1f}s)")
+        return trimmed
+            
+    async def _transcribe(self, dictation: Dictation, trace: Trace) -> str:
+        """Transcribe a recording, using its streaming session if it has one"""
+        if dictation.stream is None:
+            start = time.monotonic()
+            audio_data = await self._trim_silence(dictation.audio)
+            trace.span("vad", start)
+            if len(audio_data) == 0:
+                return ""
+                
+            start = time.monotonic()
+            if self.whisper.draft is None:
+                text = await self.whisper.transcribe(audio_data, queue_depth=self.jobs.depth - 1)
+                trace.span("decode", start)
+                return text
+                
+            # Copy the draft straight away; the refined text replaces it later
+            draft, refine = await self.whisper.transcribe_tiered(audio_data)
+            if draft:
+                if self.mode_detector is not None and dictation.mode is None:
+                    _, draft = self.mode_detector.detect(draft)
+                dictation.draft = draft
+                await self._deliver(draft, "📄 Draft", draft=True)
+                trace.span("release_to_draft", trace.marks.get("release"))
+            text = await refine
+            trace.span("decode", start)
+            return text
+            
+        # Only the unstable tail is left to decode at this point
+        start = time.monotonic()
+        loop = asyncio.get_running_loop()
+        text = await loop.run_in_executor(None, dictation.stream.finish)
+        error = dictation.stream.error
+        if error is not None:
+            if isinstance(error, TranscriptionCancelled):
+                raise error
+            # The committed text stops where the stream failed; the recording itself is complete
+            self.logger.warning(f"Streaming transcription incomplete ({error}), decoding the full recording")
+            self.metrics.increment("stream_fallback")
+            dictation.stream = None
+            return await self._transcribe(dictation, trace)
+        trace.span("decode", start)
+        return text
+            
+    async def _process_dictation(self, dictation: Dictation):
+        """Transcribe and process a queued recording"""
+        trace = dictation.trace or Trace(next(self._job_ids))
+        trace.span("queue_wait", trace.marks.get("enqueued"))
+        mode = dictation.mode or config.DEFAULT_MODE
+        outcome = {"status": "ok", "mode": mode, "model": self.whisper.model_name}
+        try:
+            self.logger.info(f"🔄 Transcribing job {trace.job_id}...")
+            transcription = await self._transcribe(dictation, trace)
+            outcome["transcription"] = transcription
+
+            if not transcription.strip():
+                self.logger.warning("No speech detected")
+                self.metrics.increment("no_speech")
+                outcome["status"] = "no_speech"
+                return
+                
+            if self.mode_detector is not None and dictation.mode is None:
+                start = time.monotonic()
+                spoken_mode, transcription = self.mode_detector.detect(transcription)
+                trace.span("mode_detect", start)
+                if spoken_mode is not None:
+                    self.logger.info(f"🎯 Spoken mode: {spoken_mode}")
+                    mode = outcome["mode"] = spoken_mode
+
+            # Process with LLM if not just transcribe mode
+            if mode != "transcribe":
+                self.logger.info(f"🧠 Processing with mode: {mode}")
+                echo = config.LLM_HTTP.get("echo_tokens")
+                stream_tokens = config.OUTPUT.get("stream_tokens", True)
+                
+                def on_token(token: str):
+                    if "llm_first_token" not in trace.marks:
+                        trace.span("llm_ttft", trace.marks["llm_start"], trace.mark("llm_first_token"))
+                    if stream_tokens:
+                        self.output.stream(token)
+                    if echo:
+                        self._echo_token(token)
+                        
+                try:
+                    trace.mark("llm_start")
+                    processed_text = await self.llm.process_text(transcription, mode,
+                                                                 on_token=on_token)
+                    trace.span("llm_total", trace.marks["llm_start"])
+                    if echo:
+                        sys.stdout.write("\n")
+                    final_text = processed_text
+                    outcome["processed"] = processed_text
+                except Exception as e:
+                    self.logger.warning(f"LLM processing failed, using transcription: {e}")
+                    final_text = transcription
+                    outcome.update(status="llm_failed", error=str(e))
+            else:
+                final_text = transcription
+
+            self.logger.info(f"Transcribed text[:50] = {final_text[:50]}")
+            if final_text == dictation.draft:
+                self.logger.info("✅ Refined text matches the draft, output unchanged")
+                self.output.send(final_text, skip_drafted=True)
+            else:
+                start = time.monotonic()
+                await self._deliver(final_text, "✅ Text")
+                trace.span("clipboard", start)
+            trace.span("release_to_clipboard", trace.marks.get("release"))
+
+        except TranscriptionCancelled:
+            self.logger.info("⏹️ Dictation discarded")
+            self.metrics.increment("cancelled")
+            outcome["status"] = "cancelled"
+        except Exception as e:
+            self.logger.error(f"Processing failed: {e}")
+            self.metrics.increment("failed")
+            outcome.update(status="failed", error=str(e))
+        finally:
+            self.metrics.record_trace(trace)
+            if self.history is not None:
+                self.history.record(dictation.audio, self.recorder.sample_rate, **outcome)
+            
+    async def _deliver(self, text: str, label: str, draft: bool = False):
+        """Send text to every output sink, waiting only for the primary one"""
+        primary = self.output.send(text, draft=draft)
+        if primary is None:
+            return
+        if await asyncio.wrap_future(primary):
+            self.logger.info(f"{label} sent to {self.output.primary.name}")
+        else:
+            self.logger.info(f"📝 Output to {self.output.primary.name} failed")
+            
+    def _echo_token(self, token: str):
+        """Show streamed LLM output as soon as each token arrives"""
+        sys.stdout.write(token)
+        sys.stdout.flush()
+        
+    async def run(self):
+        """Main application loop"""
+        self.logger.info("🚀 Vibe Transcribe starting...")
+        self.logger.info(f"🎯 Mode: {config.DEFAULT_MODE}")
+        self.logger.info(f"🔥 Hotkeys: {config.HOTKEYS}")
+        
+        self._record_lock = asyncio.Lock()
+        self.jobs.start()
+        if self.metrics_server is not None:
+            self.metrics_server.start()
+        if self.api_server is not None:
+            await self.api_server.start()
+        
+        try:
+            # Start hotkey listeners; callbacks are dispatched onto this loop
+            self.hotkey_manager.start(asyncio.get_running_loop())
+            self.logger.info("🎮 Hotkeys active - Press Ctrl+C to exit")
+            
+            # Load the model in the background; an early hotkey press waits on this load
+            if self.preload:
+                loop = asyncio.get_running_loop()
+                loop.run_in_executor(None, self.whisper.preload, config.WHISPER.get("warmup", True))
+            
+            # Keep running until interrupted
+            while True:
+                await asyncio.sleep(1)
+                
+        except KeyboardInterrupt:
+            self.logger.info("👋 Shutting down...")
+        finally:
+            self.hotkey_manager.stop()
+            await self.jobs.stop()
+            await self.llm.close()
+            self.whisper.shutdown()
+            if self.metrics_server is not None:
+                self.metrics_server.stop()
+            if self.api_server is not None:
+                await self.api_server.stop()
+            if self.history is not None:
+                self.history.close()
+            self.output.close()
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from audio.buffer import AudioBuffer
+
+
+def test_write_appends_and_view_is_zero_copy():
+    buffer = AudioBuffer(10)
+    buffer.write(np.arange(4, dtype=np.float32))
+    buffer.write(np.arange(4, 7, dtype=np.float32))
+
+    assert len(buffer) == 7
+    assert buffer.remaining == 3
+    np.testing.assert_array_equal(buffer.view(), [0, 1, 2, 3, 4, 5, 6])
+    assert np.shares_memory(buffer.view(), buffer._data)
+
+
+def test_write_discards_frames_past_capacity():
+    buffer = AudioBuffer(5)
+    written = buffer.write(np.ones(8, dtype=np.float32))
+
+    assert len(written) == 5
+    assert buffer.full
+    assert len(buffer.write(np.ones(3, dtype=np.float32))) == 0
+    assert len(buffer) == 5
+
+
+def test_multichannel_downmix():
+    chunk = np.array([[1.0, 3.0], [2.0, 6.0]], dtype=np.float32)
+
+    first = AudioBuffer(4)
+    first.write(chunk)
+    np.testing.assert_array_equal(first.view(), [1.0, 2.0])
+
+    mean = AudioBuffer(4, downmix="mean")
+    mean.write(chunk)
+    np.testing.assert_array_equal(mean.view(), [2.0, 4.0])
+
+
+def test_write_converts_to_float32():
+    buffer = AudioBuffer(3)
+    buffer.write(np.array([0.5, -0.25, 1.0], dtype=np.float64))
+
+    assert buffer.view().dtype == np.float32
+    np.testing.assert_array_equal(buffer.view(), [0.5, -0.25, 1.0])
+
+
+def test_unknown_downmix_rejected():
+    with pytest.raises(ValueError):
+        AudioBuffer(4, downmix="max")
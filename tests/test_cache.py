@@ -0,0 +1,92 @@
+import pytest
+
+from processing import cache as cache_module
+from processing.cache import ResponseCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, "time", clock)
+    return clock
+
+
+def make_cache(tmp_path, **overrides) -> ResponseCache:
+    return ResponseCache(dict({"path": str(tmp_path / "cache.sqlite3")}, **overrides))
+
+
+def test_make_key_ignores_dict_order():
+    assert ResponseCache.make_key({"a": 1, "b": [1, 2]}) == ResponseCache.make_key({"b": [1, 2], "a": 1})
+    assert ResponseCache.make_key({"a": 1}) != ResponseCache.make_key({"a": 2})
+
+
+def test_put_get_and_counters(tmp_path, clock):
+    cache = make_cache(tmp_path)
+    assert cache.get("k") is None
+    cache.put("k", "response")
+
+    assert cache.get("k") == "response"
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+    assert stats["hit_rate"] == pytest.approx(0.5)
+
+
+def test_entries_expire_after_ttl(tmp_path, clock):
+    cache = make_cache(tmp_path, ttl_seconds=60)
+    cache.put("k", "response")
+
+    clock.now += 59
+    assert cache.get("k") == "response"
+    clock.now += 2
+    assert cache.get("k") is None
+    assert cache.get_stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_evicted(tmp_path, clock):
+    cache = make_cache(tmp_path, max_entries=2)
+    cache.put("a", "1")
+    clock.now += 1
+    cache.put("b", "2")
+    clock.now += 1
+    cache.get("a")  # b is now the least recently used
+    clock.now += 1
+    cache.put("c", "3")
+
+    assert cache.get("a") == "1"
+    assert cache.get("b") is None
+    assert cache.get("c") == "3"
+
+
+def test_byte_cap_evicts(tmp_path, clock):
+    cache = make_cache(tmp_path, max_bytes=10)
+    cache.put("a", "x" * 6)
+    clock.now += 1
+    cache.put("b", "y" * 6)
+
+    assert cache.get("a") is None
+    assert cache.get("b") == "y" * 6
+
+
+def test_get_first_counts_one_lookup(tmp_path, clock):
+    cache = make_cache(tmp_path)
+    cache.put("second", "response")
+
+    assert cache.get_first(["first", "second"]) == "response"
+    assert cache.get_first(["first", "third"]) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_entries_persist_across_instances(tmp_path, clock):
+    cache = make_cache(tmp_path)
+    cache.put("k", "response")
+    cache.close()
+
+    assert make_cache(tmp_path).get("k") == "response"
@@ -0,0 +1,122 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("faster_whisper")
+
+from transcription.chunking import AudioChunk, split_audio, stitch_segments
+from transcription.whisper_client import Segment, WhisperClient
+
+RATE = 16000
+
+
+def speech(seconds: float) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return (0.3 * rng.standard_normal(int(seconds * RATE))).astype(np.float32)
+
+
+def test_short_audio_is_one_chunk():
+    assert split_audio(speech(10), RATE, chunk_seconds=30) == [AudioChunk(0, 10 * RATE)]
+
+
+def test_cuts_at_a_pause_without_overlap():
+    audio = speech(40)
+    audio[27 * RATE:28 * RATE] = 0  # A pause inside the search window
+
+    chunks = split_audio(audio, RATE, chunk_seconds=30, overlap_seconds=1, search_seconds=5)
+
+    assert len(chunks) == 2
+    assert 27 * RATE <= chunks[0].end <= 28 * RATE
+    assert chunks[1].start == chunks[0].end
+    assert chunks[-1].end == len(audio)
+
+
+def test_no_pause_cuts_at_window_with_overlap():
+    chunks = split_audio(speech(70), RATE, chunk_seconds=30, overlap_seconds=1)
+
+    assert all(chunk.end - chunk.start <= 30 * RATE for chunk in chunks)
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert previous.end - chunk.start == 1 * RATE
+    assert chunks[0].start == 0 and chunks[-1].end == 70 * RATE
+
+
+@pytest.mark.parametrize("chunk_seconds, overlap_seconds", [(5, 1), (3, 1), (2, 5)])
+def test_window_shorter_than_search_still_progresses(chunk_seconds, overlap_seconds):
+    audio = speech(20)
+    audio[:RATE // 10] = 0  # The quietest frame is the first one of the window
+
+    chunks = split_audio(audio, RATE, chunk_seconds=chunk_seconds, overlap_seconds=overlap_seconds,
+                         search_seconds=5)
+
+    assert all(chunk.end > chunk.start for chunk in chunks)
+    assert all(chunk.end - chunk.start <= chunk_seconds * RATE for chunk in chunks)
+    assert chunks[0].start == 0 and chunks[-1].end == len(audio)
+    assert len(chunks) < 20
+
+
+def test_stitch_offsets_and_splits_the_overlap():
+    first, second = AudioChunk(0, 30 * RATE), AudioChunk(29 * RATE, 50 * RATE)
+    decoded = [
+        (first, [Segment(0.0, 28.0, "hello there"), Segment(29.2, 30.0, "general")]),
+        (second, [Segment(0.0, 0.4, "there"), Segment(0.6, 5.0, "general kenobi")]),
+    ]
+
+    stitched = stitch_segments(decoded, RATE)
+
+    # The overlap midpoint is 29.5s: the first chunk keeps what starts before it,
+    # the second what ends after it
+    assert [s.text for s in stitched] == ["hello there", "general", "kenobi"]
+    assert stitched[-1].start == pytest.approx(29.6)
+    assert stitched[-1].end == pytest.approx(34.0)
+
+
+def test_stitch_drops_words_repeated_across_a_cut():
+    decoded = [
+        (AudioChunk(0, 10 * RATE), [Segment(0.0, 9.0, "we will meet at noon")]),
+        (AudioChunk(10 * RATE, 20 * RATE), [Segment(0.0, 4.0, "At noon, then lunch")]),
+    ]
+
+    assert [s.text for s in stitch_segments(decoded, RATE)] == ["we will meet at noon", "then lunch"]
+
+
+def test_long_audio_needs_parallel_decoding():
+    base = {"model": "base", "long_audio": {"enabled": True, "min_seconds": 60}}
+    audio = np.zeros(90 * RATE, dtype=np.float32)
+
+    assert not WhisperClient(base)._is_long(audio)
+    assert WhisperClient(dict(base, num_workers=2))._is_long(audio)
+    batched = dict(base, long_audio={"enabled": True, "min_seconds": 60, "batched": True})
+    assert WhisperClient(batched)._is_long(audio)
+    assert not WhisperClient(dict(base, num_workers=2))._is_long(audio[:30 * RATE])
+
+
+def test_batched_pipeline_gets_non_overlapping_clips_and_skips_policy(monkeypatch):
+    import asyncio
+    from types import SimpleNamespace
+
+    import faster_whisper
+
+    calls = {}
+
+    class FakePipeline:
+        def __init__(self, model):
+            pass
+
+        def transcribe(self, audio, clip_timestamps, **kwargs):
+            calls["clips"] = clip_timestamps
+            return [SimpleNamespace(start=0.0, end=1.0, text=" hello ")], SimpleNamespace(language="en")
+
+    monkeypatch.setattr(faster_whisper, "BatchedInferencePipeline", FakePipeline, raising=False)
+    client = WhisperClient({
+        "model": "base",
+        "long_audio": {"enabled": True, "min_seconds": 60, "chunk_seconds": 30,
+                       "overlap_seconds": 1.0, "batched": True},
+        "policy": {"enabled": True, "tiers": [{"model": "small"}, {"model": "tiny"}]},
+    })
+    client._load_model = lambda: None
+    recorded = []
+    monkeypatch.setattr(client.policy, "record", lambda *args: recorded.append(args))
+
+    assert asyncio.run(client.transcribe(speech(70))) == "hello"
+    clips = calls["clips"]
+    assert all(previous["end"] <= clip["start"] for previous, clip in zip(clips, clips[1:]))
+    assert recorded == []
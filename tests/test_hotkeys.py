@@ -0,0 +1,122 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+keyboard = pytest.importorskip("keyboard")
+
+from audio.hotkeys import ChordMatcher, HotkeyManager
+
+
+def make_matcher() -> ChordMatcher:
+    return ChordMatcher([
+        ("toggle", "ctrl+shift+t", None),
+        ("hold", "ctrl+space", None),
+        ("mode", "ctrl+shift+1", "summarize"),
+    ], debounce=0.15)
+
+
+def press(matcher: ChordMatcher, *keys, now: float = 0.0):
+    return [matcher.key_down(key, now) for key in keys][-1]
+
+
+def test_chord_fires_on_last_key():
+    matcher = make_matcher()
+
+    assert press(matcher, "ctrl", "shift") is None
+    binding = matcher.key_down("t", 0.0)
+    assert (binding.action, binding.chord) == ("toggle", "ctrl+shift+t")
+    assert press(make_matcher(), "shift", "ctrl", "1").arg == "summarize"
+
+
+def test_aliases_and_shifted_letters():
+    matcher = make_matcher()
+
+    assert press(matcher, "right ctrl", "left shift", "T").action == "toggle"
+
+
+def test_auto_repeat_and_debounce():
+    matcher = make_matcher()
+    assert press(matcher, "ctrl", "shift", "t").action == "toggle"
+    assert matcher.key_down("t", 0.05) is None  # Auto-repeat
+
+    matcher.key_up("t")
+    assert matcher.key_down("t", 0.1) is None  # Within debounce
+    matcher.key_up("t")
+    assert matcher.key_down("t", 0.3).action == "toggle"
+
+
+def test_extra_modifier_prevents_match():
+    matcher = make_matcher()
+
+    assert press(matcher, "ctrl", "shift", "alt", "t") is None
+    assert press(make_matcher(), "windows", "ctrl", "space") is None
+
+
+def test_unbound_keys_are_ignored():
+    matcher = make_matcher()
+
+    assert matcher.key_down("q", 0.0) is None
+    assert press(matcher, "ctrl", "shift", "t").action == "toggle"
+
+
+def test_hold_ends_when_a_key_is_released():
+    matcher = make_matcher()
+    assert press(matcher, "ctrl", "space").action == "hold"
+
+    assert [b.action for b in matcher.key_up("space")] == ["hold"]
+    assert matcher.key_up("ctrl") == []
+    assert matcher.state == 0
+
+
+def test_releasing_one_side_keeps_the_modifier_held():
+    matcher = make_matcher()
+    press(matcher, "left ctrl", "right ctrl")
+    matcher.key_up("left ctrl")
+
+    assert matcher.key_down("space", 0.0).action == "hold"
+    matcher.key_up("space")
+
+
+def test_hold_survives_release_of_one_side():
+    matcher = make_matcher()
+    press(matcher, "left ctrl", "right ctrl", "space")
+
+    assert matcher.key_up("left ctrl") == []
+    assert [b.action for b in matcher.key_up("right ctrl")] == ["hold"]
+    matcher.key_up("space")
+    assert matcher.state == 0
+
+
+def test_conflicting_bindings_rejected():
+    with pytest.raises(ValueError):
+        ChordMatcher([("toggle", "ctrl+t", None), ("cancel", "control+T", None)])
+    with pytest.raises(ValueError):
+        ChordMatcher([("toggle", "ctrl++", None)])
+
+
+def test_each_callback_gets_its_own_event_time():
+    async def scenario():
+        calls = []
+
+        async def on_toggle(event_at=None):
+            calls.append(("toggle", event_at))
+
+        async def on_cancel(event_at=None):
+            calls.append(("cancel", event_at))
+
+        manager = HotkeyManager({"toggle": "ctrl+t", "cancel": "ctrl+q"})
+        manager.set_callbacks(toggle_callback=on_toggle, cancel_callback=on_cancel)
+        manager.loop = asyncio.get_running_loop()
+        now = time.time()
+        # Both hotkeys are dispatched before either callback runs on the loop
+        for name, event_type, at in [("ctrl", keyboard.KEY_DOWN, now - 1.0), ("t", keyboard.KEY_DOWN, now - 1.0),
+                                     ("t", keyboard.KEY_UP, now - 0.5), ("q", keyboard.KEY_DOWN, now - 0.5)]:
+            manager._on_key_event(SimpleNamespace(name=name, event_type=event_type, time=at))
+        await asyncio.sleep(0.05)
+        return calls
+
+    calls = asyncio.run(scenario())
+    assert [action for action, _ in calls] == ["toggle", "cancel"]
+    assert calls[1][1] - calls[0][1] == pytest.approx(0.5, abs=0.05)
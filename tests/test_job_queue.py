@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+
+from utils.job_queue import JobQueue
+from utils.metrics import Metrics
+
+
+async def run_blocked(backpressure, payloads, max_queue=1, **kwargs):
+    """Submit payloads while the single worker is blocked, then let everything finish"""
+    handled = []
+    gate = asyncio.Event()
+
+    async def handler(payload):
+        await gate.wait()
+        handled.append(payload)
+
+    queue = JobQueue(handler, max_queue=max_queue, backpressure=backpressure, **kwargs)
+    queue.start()
+    results = []
+    for payload in payloads:
+        results.append(await queue.submit(payload))
+        await asyncio.sleep(0)  # Let the worker take the first job
+    gate.set()
+    await asyncio.sleep(0.01)
+    await queue.stop()
+    return queue, handled, results
+
+
+def test_jobs_run_in_order():
+    queue, handled, _ = asyncio.run(run_blocked("queue", [1, 2, 3], max_queue=4))
+
+    assert handled == [1, 2, 3]
+    assert queue.counters["completed"] == 3
+
+
+def test_drop_rejects_when_full():
+    queue, handled, results = asyncio.run(run_blocked("drop", [1, 2, 3]))
+
+    assert handled == [1, 2]
+    assert results[2] is None
+    assert queue.counters["dropped"] == 1
+
+
+def test_coalesce_merges_into_newest_pending():
+    queue, handled, results = asyncio.run(
+        run_blocked("coalesce", [[1], [2], [3]], coalesce=lambda pending, new: pending + new)
+    )
+
+    assert handled == [[1], [2, 3]]
+    assert results[2] is results[1]
+    assert results[1].coalesced == 2
+    assert queue.counters["coalesced"] == 1
+
+
+def test_queue_policy_waits_for_space():
+    async def scenario():
+        gate = asyncio.Event()
+        handled = []
+
+        async def handler(payload):
+            await gate.wait()
+            handled.append(payload)
+
+        queue = JobQueue(handler, max_queue=1)
+        queue.start()
+        await queue.submit(1)
+        await asyncio.sleep(0)
+        await queue.submit(2)
+        blocked = asyncio.create_task(queue.submit(3))
+        await asyncio.sleep(0.01)
+        assert not blocked.done()
+
+        gate.set()
+        await blocked
+        await asyncio.sleep(0.01)
+        await queue.stop()
+        return handled
+
+    assert asyncio.run(scenario()) == [1, 2, 3]
+
+
+def test_failures_are_counted_and_do_not_stop_the_worker():
+    async def scenario():
+        async def handler(payload):
+            if payload == "bad":
+                raise RuntimeError("boom")
+
+        queue = JobQueue(handler)
+        queue.start()
+        await queue.submit("bad")
+        await queue.submit("good")
+        await asyncio.sleep(0.01)
+        await queue.stop()
+        return queue
+
+    queue = asyncio.run(scenario())
+    assert queue.counters["failed"] == 1
+    assert queue.counters["completed"] == 1
+    assert queue.recent[0].failed
+
+
+def test_counters_mirrored_into_metrics():
+    metrics = Metrics()
+    asyncio.run(run_blocked("drop", [1, 2, 3], metrics=metrics))
+
+    counters = metrics.get_stats()["counters"]
+    assert counters["jobs_submitted"] == 3
+    assert counters["jobs_dropped"] == 1
+    assert counters["jobs_completed"] == 2
+
+
+def test_invalid_configuration():
+    async def handler(payload):
+        pass
+
+    with pytest.raises(ValueError):
+        JobQueue(handler, backpressure="lifo")
+    with pytest.raises(ValueError):
+        JobQueue(handler, backpressure="coalesce")
@@ -0,0 +1,47 @@
+import pytest
+
+from processing.modes import ModeDetector
+
+MODES = ["transcribe+", "summarize", "meeting", "email", "tasks", "qa"]
+
+
+@pytest.fixture
+def detector() -> ModeDetector:
+    return ModeDetector(iter(MODES), {})  # Any iterable, including a one-shot one
+
+
+@pytest.mark.parametrize("text, mode, rest", [
+    ("Email: the server is down.", "email", "The server is down."),
+    ("email, the server is down", "email", "The server is down"),
+    ("Meeting notes - ship on Friday", "meeting", "Ship on Friday"),
+    ("Email mode: hello", "email", "Hello"),
+    ("Mode email. hello", "email", "Hello"),
+    ("To do: buy milk", "tasks", "Buy milk"),
+    ("Q&A: what is a regex?", "qa", "What is a regex?"),
+])
+def test_detects_leading_mode_phrase(detector, text, mode, rest):
+    assert detector.detect(text) == (mode, rest)
+
+
+@pytest.mark.parametrize("text", [
+    "Email is down again.",
+    "I sent the email: it bounced",
+    "Email.",
+    "",
+])
+def test_plain_dictation_unchanged(detector, text):
+    assert detector.detect(text) == (None, text)
+
+
+def test_separator_optional_when_configured():
+    detector = ModeDetector(MODES, {"require_separator": False})
+
+    assert detector.detect("Summarize the meeting went well") == ("summarize", "The meeting went well")
+
+
+def test_aliases_only_for_configured_modes():
+    detector = ModeDetector(["email"], {"aliases": {"mail": "email", "jot": "notes"}})
+
+    assert detector.detect("Mail: hi") == ("email", "Hi")
+    assert detector.detect("Summary: hi") == (None, "Summary: hi")
+    assert detector.detect("Jot: hi") == (None, "Jot: hi")
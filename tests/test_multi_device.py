@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("soundcard")
+
+from audio.multi_device import _Capture, channel_snr, combine_channels
+
+RATE = 16000
+
+
+def noisy_speech(snr_scale: float, seed: int) -> np.ndarray:
+    """One second of background noise with a louder burst in the middle"""
+    rng = np.random.default_rng(seed)
+    audio = 0.01 * rng.standard_normal(RATE)
+    audio[RATE // 4:3 * RATE // 4] += snr_scale * rng.standard_normal(RATE // 2)
+    return audio.astype(np.float32)
+
+
+def test_channel_snr_ranks_channels():
+    audio = np.stack([noisy_speech(0.02, 0), noisy_speech(0.5, 1)], axis=1)
+
+    snr = channel_snr(audio, RATE)
+
+    assert snr.shape == (2,)
+    assert snr[1] > snr[0] + 10
+
+
+def test_channel_snr_too_short():
+    np.testing.assert_array_equal(channel_snr(np.ones((10, 3), dtype=np.float32), RATE), [0, 0, 0])
+
+
+def test_combine_best_keeps_one_channel():
+    audio = np.stack([noisy_speech(0.02, 0), noisy_speech(0.5, 1)], axis=1)
+
+    mono, weights = combine_channels(audio, np.array([5.0, 20.0]), "best")
+
+    np.testing.assert_array_equal(mono, audio[:, 1])
+    np.testing.assert_array_equal(weights, [0.0, 1.0])
+
+
+def test_combine_mix_weights_close_channels():
+    audio = np.stack([noisy_speech(0.5, 0), noisy_speech(0.25, 1), noisy_speech(0.01, 2)], axis=1)
+
+    mono, weights = combine_channels(audio, np.array([20.0, 17.0, 2.0]), "mix", mix_within_db=6.0)
+
+    assert weights[2] == 0
+    assert weights.sum() == pytest.approx(1.0)
+    assert weights[0] == pytest.approx(2 * weights[1], rel=0.01)  # 3 dB apart
+    assert mono.shape == (RATE,) and mono.dtype == np.float32
+
+
+def test_combine_rejects_unknown_mode():
+    with pytest.raises(ValueError):
+        combine_channels(np.zeros((4, 2), dtype=np.float32), np.array([1.0, 2.0]), "sum")
+
+
+def test_capture_keeps_selected_channels_and_first_sample_time():
+    capture = _Capture(None, "mic", [1, 2], capacity=100, sample_rate=RATE, capture_rate=RATE)
+    block = np.arange(30, dtype=np.float32).reshape(10, 3)
+
+    capture.write(block, now=2.0)
+    capture.write(block, now=3.0)
+
+    assert capture.first_at == pytest.approx(2.0 - 10 / RATE)
+    assert capture.length == 20
+    np.testing.assert_array_equal(capture.data[:10], block[:, 1:])
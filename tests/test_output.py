@@ -0,0 +1,136 @@
+import sys
+from typing import List, Tuple
+
+import pytest
+
+from utils.metrics import Metrics
+from utils.output import OutputRouter, OutputSink, SINKS
+
+
+class RecordingSink(OutputSink):
+    """Records every call instead of delivering anywhere"""
+
+    name = "recording"
+    accepts_drafts = False
+    accepts_tokens = False
+
+    def __init__(self, sink_config):
+        super().__init__(sink_config)
+        self.calls: List[Tuple] = []
+
+    def deliver(self, text, draft=False):
+        self.calls.append(("text", text, draft))
+        return True
+
+    def deliver_token(self, token):
+        self.calls.append(("token", token))
+
+    def finish_stream(self, streamed, text):
+        self.calls.append(("finish", streamed, text))
+        return True
+
+
+def make_router(monkeypatch, metrics=None, **sinks) -> OutputRouter:
+    """Router over RecordingSink variants, e.g. plain={"accepts_tokens": True}"""
+    for name, attributes in sinks.items():
+        monkeypatch.setitem(SINKS, name, type(name, (RecordingSink,), dict(attributes, name=name)))
+    return OutputRouter({"sinks": list(sinks)}, metrics)
+
+
+def wait(router: OutputRouter, text: str, **kwargs) -> bool:
+    future = router.send(text, **kwargs)
+    return future.result(timeout=1) if future is not None else None
+
+
+def test_drafts_reach_only_sinks_that_accept_them(monkeypatch):
+    router = make_router(monkeypatch, typed={"accepts_drafts": True}, clip={})
+    assert wait(router, "draft", draft=True) is True  # typed is primary and takes drafts
+    assert wait(router, "final", skip_drafted=True) is None  # typed already has it
+    router.close()
+
+    typed, clip = router.sinks
+    assert typed.calls == [("text", "draft", True)]
+    assert clip.calls == [("text", "final", False)]
+
+
+def test_primary_future_is_none_when_the_primary_is_skipped(monkeypatch):
+    router = make_router(monkeypatch, clip={}, typed={"accepts_drafts": True})
+    assert router.send("draft", draft=True) is None
+    assert wait(router, "final") is True
+    router.close()
+
+    clip, typed = router.sinks
+    assert clip.calls == [("text", "final", False)]
+    assert typed.calls == [("text", "draft", True), ("text", "final", False)]
+
+
+def test_failed_delivery_resolves_false_and_is_counted(monkeypatch):
+    def deliver(self, text, draft=False):
+        raise OSError("socket closed")
+
+    metrics = Metrics()
+    router = make_router(monkeypatch, metrics, broken={"deliver": deliver})
+    assert wait(router, "text") is False
+    router.close()
+
+    assert metrics.counters["output_broken_failed"] == 1
+
+
+def test_unknown_sink_is_rejected():
+    with pytest.raises(ValueError, match="Unknown output sink"):
+        OutputRouter({"sinks": ["pager"]})
+
+
+def test_tokens_reach_only_streaming_sinks_before_the_final_text(monkeypatch):
+    router = make_router(monkeypatch, typed={"accepts_tokens": True}, plain={})
+    for token in ["Hello", " world"]:
+        router.stream(token)
+    wait(router, "Hello world")
+    router.close()
+
+    typed, plain = router.sinks
+    assert typed.calls == [("token", "Hello"), ("token", " world"), ("finish", "Hello world", "Hello world")]
+    assert plain.calls == [("text", "Hello world", False)]
+
+
+def test_each_final_text_finishes_only_its_own_stream(monkeypatch):
+    router = make_router(monkeypatch, typed={"accepts_drafts": True, "accepts_tokens": True})
+    wait(router, "draft", draft=True)
+    router.stream("Dear Bob")
+    wait(router, "dear bob the meeting moved")  # LLM failed part way: the transcription is final
+    wait(router, "plain")
+
+    assert router.sinks[0].calls == [
+        ("text", "draft", True),
+        ("token", "Dear Bob"),
+        ("finish", "Dear Bob", "dear bob the meeting moved"),
+        ("text", "plain", False),
+    ]
+    router.close()
+
+
+def test_typing_sink_retypes_a_mismatched_stream(monkeypatch):
+    keys = []
+    fake_keyboard = type("keyboard", (), {
+        "write": staticmethod(lambda text, delay=0: keys.append(text)),
+        "send": staticmethod(lambda key: keys.append(key)),
+    })
+    monkeypatch.setitem(sys.modules, "keyboard", fake_keyboard)
+    sink = SINKS["typing"]({})
+
+    assert sink.finish_stream(" Hi there", "Hi there")
+    assert keys == []
+    assert sink.finish_stream("Oops", "Fallback")
+    assert keys == ["backspace"] * 4 + ["Fallback"]
+
+
+def test_stdout_sink_streams_on_one_line(monkeypatch, capsys):
+    router = OutputRouter({"sinks": ["stdout"]})
+    router.stream(" Hi")
+    router.stream(" there")
+    wait(router, "Hi there")
+    router.stream("Oops")
+    wait(router, "Fallback")
+    router.close()
+
+    assert capsys.readouterr().out == " Hi there\nOops\nFallback\n"
@@ -0,0 +1,87 @@
+import pytest
+
+from transcription.policy import DecodeSettings, ModelPolicy
+
+ACCURATE = {"model": "small", "beam_size": 5}
+FAST = {"model": "tiny"}
+
+
+def make_policy(**overrides) -> ModelPolicy:
+    return ModelPolicy(dict({
+        "tiers": [ACCURATE, FAST],
+        "slo": [{"max_seconds": 10, "target_latency": 1.0}, {"max_seconds": None, "target_latency": 5.0}],
+        "min_effective_seconds": 5.0,
+        "recovery": 0.5,
+    }, **overrides))
+
+
+def test_target_latency_bands():
+    policy = make_policy()
+
+    assert policy.target_latency(3) == 1.0
+    assert policy.target_latency(60) == 5.0
+    assert make_policy(slo=[]).target_latency(3) is None
+
+
+def test_chooses_most_accurate_tier_meeting_the_slo():
+    policy = make_policy()
+    accurate, fast = policy.tiers
+
+    # small with beam 5: prior RTF 0.3 * 3 = 0.9, so 5s effective -> 4.5s predicted
+    assert policy.predict(accurate, 2) == pytest.approx(4.5)
+    assert policy.choose(2) == fast
+    assert make_policy(slo=[{"max_seconds": None, "target_latency": 5.0}]).choose(2) == accurate
+
+
+def test_queue_depth_scales_prediction():
+    policy = make_policy(slo=[{"max_seconds": None, "target_latency": 5.0}])
+    accurate, fast = policy.tiers
+
+    assert policy.choose(2, queue_depth=0) == accurate
+    assert policy.choose(2, queue_depth=1) == fast
+
+
+def test_falls_back_to_fastest_tier():
+    policy = make_policy(slo=[{"max_seconds": None, "target_latency": 0.01}])
+
+    assert policy.choose(30) == policy.tiers[-1]
+
+
+def test_measured_rtf_replaces_prior_and_recovers():
+    policy = make_policy(slo=[{"max_seconds": None, "target_latency": 5.0}])
+    accurate, fast = policy.tiers
+
+    policy.record(accurate, duration=10, elapsed=20)
+    assert policy.rtf(accurate) == pytest.approx(2.0)
+    assert policy.choose(10) == fast
+
+    # Each skip pulls the measurement halfway back toward the prior (0.9)
+    assert policy.rtf(accurate) == pytest.approx(1.45)
+
+
+def test_needs_a_tier():
+    with pytest.raises(ValueError):
+        ModelPolicy({"tiers": []})
+
+
+def test_model_key():
+    assert DecodeSettings("small", "int8", 5, 4).model_key == ("small", "int8", 4)
+
+
+def test_draft_client_has_no_policy_or_chunking():
+    pytest.importorskip("faster_whisper")
+    from transcription.whisper_client import WhisperClient
+
+    client = WhisperClient({
+        "model": "small",
+        "num_workers": 2,
+        "tiers": {"enabled": True, "draft_model": "tiny"},
+        "policy": {"enabled": True, "tiers": [ACCURATE, FAST]},
+        "long_audio": {"enabled": True},
+    })
+
+    assert client.policy is not None
+    assert client.draft.model_name == "tiny"
+    assert client.draft.policy is None
+    assert client.draft.draft is None
+    assert client.draft.long_audio == {}
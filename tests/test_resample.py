@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from audio.resample import StreamingResampler, design_filter
+
+
+def reference(audio: np.ndarray, in_rate: int, out_rate: int, taps: int = 24) -> np.ndarray:
+    """Textbook resampling of the whole signal: zero-stuff, low-pass, decimate"""
+    resampler = StreamingResampler(in_rate, out_rate, taps)
+    up, down = resampler.up, resampler.down
+    h = resampler.filters[:, ::-1].T.reshape(-1).astype(np.float64)  # Undo the polyphase layout
+    upsampled = np.zeros(len(audio) * up)
+    upsampled[::up] = audio
+    size = len(upsampled) + len(h) - 1
+    filtered = np.fft.irfft(np.fft.rfft(upsampled, size) * np.fft.rfft(h, size), size)
+    # Output n depends on input up to sample n * down // up, so the last one is at (len * up - 1) // down
+    return filtered[::down][:(len(audio) * up - 1) // down + 1].astype(np.float32)
+
+
+@pytest.mark.parametrize("in_rate", [48000, 44100, 32000, 22050])
+def test_block_output_matches_whole_signal(in_rate):
+    rng = np.random.default_rng(0)
+    audio = rng.standard_normal(in_rate // 10).astype(np.float32)
+    resampler = StreamingResampler(in_rate, 16000)
+
+    blocks = [resampler.process(audio[i:i + 331]) for i in range(0, len(audio), 331)]
+    streamed = np.concatenate(blocks)
+    whole = StreamingResampler(in_rate, 16000).process(audio)
+
+    np.testing.assert_allclose(streamed, whole, atol=1e-5)
+    np.testing.assert_allclose(streamed, reference(audio, in_rate, 16000), atol=1e-4)
+
+
+def test_output_length_tracks_input():
+    resampler = StreamingResampler(48000, 16000)
+    lengths = [len(resampler.process(np.zeros(block, dtype=np.float32))) for block in (1, 2, 3, 1440, 7)]
+
+    assert sum(lengths) == -(-1453 // 3)
+    assert lengths[:3] == [1, 0, 1]  # Outputs 0 and 1 need inputs 0 and 3
+
+
+def test_multichannel_blocks():
+    rng = np.random.default_rng(1)
+    audio = rng.standard_normal((4410, 2)).astype(np.float32)
+    resampler = StreamingResampler(44100, 16000)
+
+    out = np.concatenate([resampler.process(audio[:1000]), resampler.process(audio[1000:])])
+
+    assert out.shape[1] == 2
+    np.testing.assert_allclose(out[:, 1], StreamingResampler(44100, 16000).process(audio[:, 1]), atol=1e-5)
+
+
+def test_passband_tone_keeps_its_level():
+    in_rate = 48000
+    t = np.arange(in_rate) / in_rate
+    out = StreamingResampler(in_rate, 16000).process(np.sin(2 * np.pi * 1000 * t))
+
+    steady = out[100:-100]
+    assert np.sqrt(np.mean(steady ** 2)) == pytest.approx(np.sqrt(0.5), rel=0.02)
+
+
+def test_filter_bank_shape_and_dc_gain():
+    filters = design_filter(2, 3, taps_per_phase=16)
+
+    assert filters.shape == (2, 16)
+    np.testing.assert_allclose(filters.sum(axis=1), 1.0, atol=0.02)
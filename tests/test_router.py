@@ -0,0 +1,140 @@
+import asyncio
+
+import pytest
+
+from processing.llm_client import LLMClient
+from processing.router import ProviderHealth, ProviderRouter
+
+PROVIDERS = {name: {"api_key": "", "base_url": f"http://{name}.invalid/v1", "model": "m"}
+             for name in ("fast", "slow")}
+
+
+def make_health(**overrides) -> ProviderHealth:
+    return ProviderHealth("p", **dict({"alpha": 0.5, "failure_threshold": 2, "cooldown_seconds": 10}, **overrides))
+
+
+def test_latency_ewma():
+    health = make_health()
+    health.record_success(1.0)
+    health.record_success(3.0)
+
+    assert health.latency_ewma == pytest.approx(2.0)
+    assert health.score(prior_latency=9.0) == pytest.approx(2.0)
+
+
+def test_errors_penalize_score():
+    health = make_health()
+    health.record_success(1.0)
+    health.record_failure(now=0.0)
+
+    assert health.error_ewma == pytest.approx(0.5)
+    assert health.score(prior_latency=1.0) == pytest.approx(3.0)
+
+
+def test_breaker_opens_half_opens_and_closes():
+    health = make_health()
+    health.record_failure(now=0.0)
+    assert health.state == "closed"
+    health.record_failure(now=1.0)
+    assert health.state == "open"
+
+    assert not health.available(now=5.0)
+    assert health.available(now=11.0)
+    assert health.state == "half_open"
+    health.record_success(0.5)
+    assert health.state == "closed"
+
+
+def test_failed_probe_reopens():
+    health = make_health()
+    health.record_failure(now=0.0)
+    health.record_failure(now=0.0)
+    health.available(now=10.0)
+
+    health.record_failure(now=10.0)
+    assert health.state == "open"
+    assert not health.available(now=15.0)
+
+
+def test_censored_latency_only_raises_the_estimate():
+    health = make_health()
+    health.record_censored(2.0)
+    assert health.latency_ewma == pytest.approx(2.0)
+
+    health.record_censored(1.0)
+    assert health.latency_ewma == pytest.approx(2.0)
+    health.record_censored(4.0)
+    assert health.latency_ewma == pytest.approx(3.0)
+    assert health.requests == 0
+
+
+def test_ranked_prefers_fast_then_default_and_skips_open():
+    router = ProviderRouter(["a", "b", "c"], "b", {"failure_threshold": 1})
+    assert router.ranked() == ["b", "a", "c"]  # Equal priors: default first
+
+    router.record_success("c", 0.1)
+    router.record_failure("b")
+    assert router.ranked() == ["c", "a"]
+
+
+def test_all_open_tries_every_provider():
+    router = ProviderRouter(["a", "b"], "a", {"failure_threshold": 1})
+    router.record_failure("a")
+    router.record_failure("b")
+
+    assert sorted(router.ranked()) == ["a", "b"]
+
+
+def test_router_needs_providers():
+    with pytest.raises(ValueError):
+        ProviderRouter([], "openai", {})
+
+
+def make_client(tmp_path, delays, cache=False) -> LLMClient:
+    """Client whose providers answer after delays[name] seconds, without HTTP"""
+    client = LLMClient(
+        PROVIDERS, "slow", {"stream": False},
+        {"enabled": cache, "path": str(tmp_path / "cache.sqlite3")},
+        {"enabled": True, "hedge_after_ms": 20, "max_parallel": 2}
+    )
+    client.calls = []
+
+    async def first_response(text, mode, provider):
+        client.calls.append(provider)
+        await asyncio.sleep(delays[provider])
+        return None, f"{text} via {provider}"
+
+    client._first_response = first_response
+    return client
+
+
+def test_routing_falls_back_to_default_provider():
+    client = LLMClient(PROVIDERS, "fast", {}, None, {"enabled": True, "providers": ["missing"]})
+
+    assert list(client.router.health) == ["fast"]
+
+
+def test_hedge_loser_recorded_as_censored_latency(tmp_path):
+    client = make_client(tmp_path, {"slow": 1.0, "fast": 0.01})
+
+    text, provider = asyncio.run(client._process_routed("hi", "prompt", None))
+
+    assert (text, provider) == ("hi via fast", "fast")
+    assert client.calls == ["slow", "fast"]
+    slow = client.router.health["slow"]
+    assert slow.requests == 0 and slow.failures == 0
+    assert 0.02 <= slow.latency_ewma < 1.0
+    assert client.router.ranked()[0] == "fast"
+
+
+def test_routed_response_cached_under_answering_provider(tmp_path):
+    client = make_client(tmp_path, {"slow": 1.0, "fast": 0.01}, cache=True)
+
+    assert asyncio.run(client.process_text("hi", "prompt")) == "hi via fast"
+    assert client.cache.get(client._cache_key("hi", "prompt", "fast")) == "hi via fast"
+    assert client.cache.get(client._cache_key("hi", "prompt", "slow")) is None
+
+    # A later routed request reuses it whichever provider ranks first
+    client.calls = []
+    assert asyncio.run(client.process_text("hi", "prompt")) == "hi via fast"
+    assert client.calls == []
@@ -0,0 +1,78 @@
+import asyncio
+import itertools
+import logging
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+for module in ("faster_whisper", "keyboard", "soundcard", "aiohttp"):
+    pytest.importorskip(module)
+
+from service import VibeTranscribe
+from utils.job_queue import JobQueue
+from utils.metrics import Metrics
+
+
+class FakeRecorder:
+    sample_rate = 16000
+
+    def __init__(self):
+        self.is_recording = False
+
+    def start_recording(self):
+        self.is_recording = True
+
+    def stop_recording(self):
+        self.is_recording = False
+        return np.zeros(1600, dtype=np.float32)
+
+    def set_chunk_callback(self, callback):
+        pass
+
+
+def make_service(handler) -> VibeTranscribe:
+    """A service with a fake recorder and Whisper, built without loading anything"""
+    service = VibeTranscribe.__new__(VibeTranscribe)
+    service.logger = logging.getLogger("test")
+    service.metrics = Metrics()
+    service.recorder = FakeRecorder()
+    service.whisper = SimpleNamespace(cancel_all=lambda: 0)
+    service.stream = None
+    service.jobs = JobQueue(handler, max_queue=1, backpressure="queue")
+    service._record_lock = asyncio.Lock()
+    service._job_ids = itertools.count(1)
+    service._trace = None
+    service._record_mode = None
+    service._last_dictation = None
+    return service
+
+
+def test_full_queue_does_not_block_record_and_cancel_hotkeys():
+    async def scenario():
+        gate = asyncio.Event()
+
+        async def handler(dictation):
+            await gate.wait()
+
+        service = make_service(handler)
+        service.jobs.start()
+        await service.jobs.submit("running")
+        await asyncio.sleep(0)
+        await service.jobs.submit("pending")  # The queue is now full
+
+        service.recorder.is_recording = True
+        stopping = asyncio.create_task(service._handle_toggle_recording())
+        await asyncio.sleep(0.01)
+        assert not stopping.done()  # Waiting for queue space...
+
+        # ...but not holding the record lock
+        await asyncio.wait_for(service._handle_cancel(), timeout=1)
+        await asyncio.wait_for(service._handle_start_recording(), timeout=1)
+        assert service.recorder.is_recording
+
+        gate.set()
+        await asyncio.wait_for(stopping, timeout=1)
+        await service.jobs.stop()
+
+    asyncio.run(scenario())
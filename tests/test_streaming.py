@@ -0,0 +1,150 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+pytest.importorskip("faster_whisper")
+
+from transcription.streaming import StreamingTranscriber
+from transcription.whisper_client import Segment
+
+RATE = 100  # Low rate keeps the fake audio small; every sample holds its absolute second
+
+
+class FakeWhisper:
+    """Returns one segment per whole second of the buffer, named after the audio's absolute second"""
+
+    def __init__(self, fail_on_call=None, gate=None):
+        self.buffer_seconds = []
+        self.fail_on_call = fail_on_call
+        self.gate = gate
+
+    def transcribe_segments(self, audio, initial_prompt=None):
+        self.buffer_seconds.append(len(audio) / RATE)
+        if self.gate is not None:
+            self.gate.wait()
+        if len(self.buffer_seconds) == self.fail_on_call:
+            raise RuntimeError("decoder crashed")
+        seconds = len(audio) // RATE
+        segments = [Segment(float(i), float(i + 1), f"w{int(audio[i * RATE])}") for i in range(seconds)]
+        return segments, SimpleNamespace(language="en")
+
+
+class LongSegmentWhisper(FakeWhisper):
+    """Returns the whole buffer as one segment, like a speaker who never pauses"""
+
+    def transcribe_segments(self, audio, initial_prompt=None):
+        self.buffer_seconds.append(len(audio) / RATE)
+        text = f"w{int(audio[0])}-{int(audio[-1])}"
+        return [Segment(0.0, len(audio) / RATE, text)], SimpleNamespace(language="en")
+
+
+class SilentWhisper(FakeWhisper):
+    """Never finds speech"""
+
+    def transcribe_segments(self, audio, initial_prompt=None):
+        self.buffer_seconds.append(len(audio) / RATE)
+        return [], SimpleNamespace(language="en")
+
+
+def recording(seconds: int) -> np.ndarray:
+    return np.repeat(np.arange(seconds, dtype=np.float32), RATE)
+
+
+def stream(whisper, audio, chunk_seconds=0.5, **config) -> StreamingTranscriber:
+    transcriber = StreamingTranscriber(whisper, dict({"step_seconds": 2, "unstable_seconds": 3}, **config), RATE)
+    transcriber.start()
+    chunk = int(chunk_seconds * RATE)
+    for offset in range(0, len(audio), chunk):
+        transcriber.feed(audio[offset:offset + chunk])
+    return transcriber
+
+
+def test_stable_segments_are_committed_once_and_the_buffer_stays_bounded():
+    whisper = FakeWhisper()
+
+    text = stream(whisper, recording(20)).finish(timeout=1)
+
+    assert text.split() == [f"w{i}" for i in range(20)]
+    # Committed audio is dropped: only the unstable tail plus a step is re-decoded
+    assert max(whisper.buffer_seconds) <= 3 + 2 + 1
+
+
+def test_long_buffer_commits_all_but_the_live_edge():
+    # Nothing is ever "stable" with a 10s unstable window, so only the max_buffer cap commits
+    whisper = FakeWhisper()
+
+    text = stream(whisper, recording(20), unstable_seconds=10, max_buffer_seconds=4).finish(timeout=1)
+
+    assert text.split() == [f"w{i}" for i in range(20)]
+    assert max(whisper.buffer_seconds) <= 4 + 2
+
+
+def test_single_long_segment_is_force_committed():
+    whisper = LongSegmentWhisper()
+
+    text = stream(whisper, recording(20), max_buffer_seconds=5).finish(timeout=1)
+
+    assert text.split() == ["w0-5", "w6-11", "w12-17", "w18-19"]
+    assert max(whisper.buffer_seconds) <= 5 + 2
+
+
+def test_silence_is_dropped_down_to_the_unstable_tail():
+    whisper = SilentWhisper()
+    transcriber = stream(whisper, recording(20), max_buffer_seconds=5)
+
+    text = transcriber.finish(timeout=1)
+
+    assert text == ""
+    assert transcriber.error is None
+    assert max(whisper.buffer_seconds) <= 5 + 2
+    assert whisper.buffer_seconds[-1] <= 3 + 2
+
+
+def test_decode_failure_is_recorded():
+    transcriber = stream(FakeWhisper(fail_on_call=3), recording(10))
+
+    text = transcriber.finish()
+
+    assert isinstance(transcriber.error, RuntimeError)
+    assert text.split() == ["w0"]  # Only what was committed before the failure
+
+
+def test_finish_timeout_is_recorded():
+    gate = threading.Event()
+    transcriber = stream(FakeWhisper(gate=gate), recording(3))
+
+    transcriber.finish(timeout=0.05)
+    gate.set()
+
+    assert isinstance(transcriber.error, TimeoutError)
+
+
+def test_service_falls_back_to_full_decode_when_streaming_fails():
+    for module in ("keyboard", "soundcard", "aiohttp"):
+        pytest.importorskip(module)
+    from service import Dictation, VibeTranscribe
+    from utils.metrics import Metrics, Trace
+
+    audio = recording(10)
+    transcriber = stream(FakeWhisper(fail_on_call=3), audio)
+    decoded = []
+
+    async def transcribe(audio_data, queue_depth=0):
+        decoded.append(len(audio_data))
+        return "full text"
+
+    service = VibeTranscribe.__new__(VibeTranscribe)
+    service.logger = SimpleNamespace(warning=lambda message: None)
+    service.metrics = Metrics()
+    service.vad = None
+    service.whisper = SimpleNamespace(draft=None, transcribe=transcribe)
+    service.jobs = SimpleNamespace(depth=1)
+
+    text = asyncio.run(service._transcribe(Dictation(audio, transcriber), Trace(1)))
+
+    assert text == "full text"
+    assert decoded == [len(audio)]
+    assert service.metrics.counters["stream_fallback"] == 1
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from audio.vad import EnergyVAD, create_vad
+
+RATE = 16000
+
+
+def tone(seconds: float, amplitude: float = 0.3) -> np.ndarray:
+    t = np.arange(int(seconds * RATE)) / RATE
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def quiet(seconds: float) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return (0.001 * rng.standard_normal(int(seconds * RATE))).astype(np.float32)
+
+
+def test_trims_leading_and_trailing_silence():
+    audio = np.concatenate([quiet(1.0), tone(1.0), quiet(1.0)])
+    vad = EnergyVAD({"pad_ms": 100}, RATE)
+
+    trimmed, result = vad.process(audio)
+
+    assert result.regions == 1
+    assert result.original_seconds == pytest.approx(3.0)
+    assert 1.0 <= result.trimmed_seconds <= 1.3
+    assert result.saved_seconds == pytest.approx(3.0 - result.trimmed_seconds)
+    assert len(trimmed) == int(result.trimmed_seconds * RATE)
+
+
+def test_long_pause_shortened_to_max_pause():
+    audio = np.concatenate([tone(0.5), quiet(3.0), tone(0.5)])
+    vad = EnergyVAD({"pad_ms": 0, "max_pause_ms": 500}, RATE)
+
+    _, result = vad.process(audio)
+
+    assert result.regions == 2
+    assert result.trimmed_seconds == pytest.approx(1.5, abs=0.1)
+
+
+def test_digital_silence_returns_empty_audio():
+    trimmed, result = EnergyVAD({}, RATE).process(np.zeros(RATE, dtype=np.float32))
+
+    assert len(trimmed) == 0
+    assert result.regions == 0
+
+
+def test_constant_speech_is_kept_whole():
+    audio = tone(2.0)
+    trimmed, _ = EnergyVAD({}, RATE).process(audio)
+
+    assert len(trimmed) == len(audio)
+
+
+def test_create_vad_backends():
+    assert create_vad({"enabled": False}, RATE) is None
+    assert create_vad({"backend": "none"}, RATE) is None
+    assert isinstance(create_vad({"backend": "energy"}, RATE), EnergyVAD)
+    with pytest.raises(ValueError):
+        create_vad({"backend": "webrtc"}, RATE)
@@ -0,0 +1,132 @@
+"""
+Offline batch transcription across a pool of worker processes
+"""
+import glob
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+AUDIO_EXTENSIONS = {".wav", ".mp3", ".m4a", ".flac", ".ogg", ".opus", ".webm", ".mp4", ".aac", ".wma"}
+
+# Each worker process holds its own model, created once by the pool initializer
+_worker_client = None
+
+
+def find_audio_files(inputs: Iterable[str]) -> List[Path]:
+    """Expand files, directories (recursively) and glob patterns into a sorted file list"""
+    files: Set[Path] = set()
+    for item in inputs:
+        path = Path(item).expanduser()
+        if path.is_dir():
+            files.update(p for p in path.rglob("*") if p.suffix.lower() in AUDIO_EXTENSIONS)
+        elif path.is_file():
+            files.add(path)
+        else:
+            files.update(Path(p) for p in glob.glob(os.path.expanduser(item), recursive=True)
+                         if Path(p).is_file())
+    return sorted(files)
+
+
+def default_cpu_threads(workers: int) -> int:
+    """Split the machine's cores evenly between worker processes"""
+    return max(1, (os.cpu_count() or 1) // max(1, workers))
+
+
+def _init_worker(whisper_config: Dict[str, Any]):
+    """Pool initializer: load the model once per process"""
+    global _worker_client
+    from transcription.whisper_client import WhisperClient
+    
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+    _worker_client = WhisperClient(whisper_config)
+    _worker_client.preload(warmup=False)
+
+
+def _transcribe_file(path: str, sample_rate: int) -> Dict[str, Any]:
+    """Decode and transcribe one file inside a worker process"""
+    from audio.decode import load_audio_file
+    
+    start = time.monotonic()
+    try:
+        audio = load_audio_file(path, sample_rate)
+        duration = len(audio) / sample_rate
+        segments, info = _worker_client.transcribe_segments(audio)
+        elapsed = time.monotonic() - start
+        return {
+            "path": path,
+            "duration": round(duration, 3),
+            "language": info.language,
+            "text": " ".join(segment.text for segment in segments).strip(),
+            "segments": [
+                {"start": round(s.start, 3), "end": round(s.end, 3), "text": s.text} for s in segments
+            ],
+            "processing_seconds": round(elapsed, 3),
+            "rtf": round(elapsed / duration, 4) if duration else None,
+        }
+    except Exception as e:
+        return {"path": path, "error": str(e), "processing_seconds": round(time.monotonic() - start, 3)}
+
+
+def completed_paths(output_path: Path) -> Set[str]:
+    """Paths already transcribed successfully in an existing JSONL output"""
+    done: Set[str] = set()
+    if not output_path.exists():
+        return done
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Partial line from an interrupted run
+            if "error" not in record:
+                done.add(record.get("path"))
+    return done
+
+
+def run_batch(files: List[Path], output_path: Path, whisper_config: Dict[str, Any],
+              workers: int, sample_rate: int = 16000,
+              on_result: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """Transcribe files across worker processes, appending one JSON line per file as each finishes"""
+    logger = logging.getLogger(__name__)
+    workers = max(1, min(workers, len(files))) if files else 1
+    
+    # One decode at a time per process; parallelism comes from the processes. Draft
+    # tiers, policy tiers and long-audio chunking would load extra models per worker.
+    worker_config = dict(whisper_config, num_workers=1, preload=False, tiers={}, policy={}, long_audio={})
+    if not worker_config.get("cpu_threads"):
+        worker_config["cpu_threads"] = default_cpu_threads(workers)
+        
+    logger.info(f"🗂️ Transcribing {len(files)} file(s) with {workers} worker(s), "
+                f"{worker_config['cpu_threads']} thread(s) each")
+                
+    summary = {"files": 0, "failed": 0, "audio_seconds": 0.0, "wall_seconds": 0.0}
+    start = time.monotonic()
+    
+    # Spawn keeps workers independent of any threads already running in the parent
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_worker, initargs=(worker_config,)) as pool, \
+            open(output_path, "a", encoding="utf-8") as out:
+        futures = [pool.submit(_transcribe_file, str(path), sample_rate) for path in files]
+        for future in as_completed(futures):
+            record = future.result()
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            
+            summary["files"] += 1
+            if "error" in record:
+                summary["failed"] += 1
+            else:
+                summary["audio_seconds"] += record["duration"]
+            if on_result:
+                on_result(record)
+                
+    summary["wall_seconds"] = time.monotonic() - start
+    summary["throughput"] = (summary["audio_seconds"] / summary["wall_seconds"]
+                             if summary["wall_seconds"] else None)
+    return summary
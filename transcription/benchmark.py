@@ -0,0 +1,182 @@
+"""
+Benchmark Whisper model variants on a local corpus with reference transcripts
+"""
+import logging
+import multiprocessing
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from transcription.batch import AUDIO_EXTENSIONS
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def find_corpus(corpus_dir: Path) -> List[Tuple[Path, str]]:
+    """Audio files in corpus_dir that have a reference transcript alongside (same stem, .txt)"""
+    corpus = []
+    for path in sorted(corpus_dir.expanduser().rglob("*")):
+        reference = path.with_suffix(".txt")
+        if path.suffix.lower() in AUDIO_EXTENSIONS and reference.is_file():
+            corpus.append((path, reference.read_text(encoding="utf-8")))
+    return corpus
+
+
+def installed_models(download_root: str) -> List[str]:
+    """Models already downloaded by faster-whisper into download_root"""
+    models = []
+    root = Path(download_root).expanduser()
+    if not root.is_dir():
+        return models
+    for entry in sorted(root.glob("models--*")):
+        repo_id = entry.name[len("models--"):].replace("--", "/")
+        _, _, name = repo_id.rpartition("/")
+        # Systran's repos map onto the short names WhisperModel accepts
+        if repo_id.startswith("Systran/faster-whisper-"):
+            models.append(name[len("faster-whisper-"):])
+        else:
+            models.append(repo_id)
+    return models
+
+
+def supported_compute_types(device: str) -> List[str]:
+    """Compute types CTranslate2 supports on this device"""
+    import ctranslate2
+    return sorted(ctranslate2.get_supported_compute_types(device))
+
+
+def _words(text: str) -> List[str]:
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+
+def word_errors(reference: str, hypothesis: str) -> Tuple[int, int]:
+    """Word-level edit distance and reference length (WER = errors / length)"""
+    ref, hyp = _words(reference), _words(hypothesis)
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (ref_word != hyp_word)))
+        previous = current
+    return previous[-1], len(ref)
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident memory of this process in MB, or None where it cannot be measured"""
+    if resource is not None:
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    if sys.platform == "win32":
+        return _windows_peak_working_set_mb()
+    return None
+
+
+def _windows_peak_working_set_mb() -> Optional[float]:
+    import ctypes
+    from ctypes import wintypes
+    
+    class ProcessMemoryCounters(ctypes.Structure):
+        _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+                    
+    try:
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return None
+        return counters.PeakWorkingSetSize / (1024 * 1024)
+    except (AttributeError, OSError):
+        return None
+
+
+def _bench_variant(whisper_config: Dict[str, Any], corpus: List[Tuple[str, str]],
+                   sample_rate: int) -> Dict[str, Any]:
+    """Load one model variant and transcribe the corpus; runs in a fresh process"""
+    from audio.decode import load_audio_file
+    from transcription.whisper_client import WhisperClient
+    
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+    result = {"model": whisper_config.get("model_path") or whisper_config["model"],
+              "compute_type": whisper_config.get("compute_type", "default")}
+    try:
+        # Decode all audio up front so file I/O is not counted against the model
+        audio = [(load_audio_file(path, sample_rate), reference) for path, reference in corpus]
+        
+        client = WhisperClient(whisper_config)
+        start = time.monotonic()
+        client.preload(warmup=False)
+        result["load_seconds"] = round(time.monotonic() - start, 3)
+        # WhisperClient falls back to tiny when a model fails to load; never report that as this variant
+        if client.fallback_model is not None:
+            raise RuntimeError(f"{result['model']} failed to load (fell back to {client.fallback_model})")
+        if client.state == "failed":
+            raise RuntimeError(f"{result['model']} failed to load")
+        client.warmup()
+        
+        audio_seconds = decode_seconds = 0.0
+        errors = reference_words = 0
+        for samples, reference in audio:
+            start = time.monotonic()
+            segments, _ = client.transcribe_segments(samples)
+            decode_seconds += time.monotonic() - start
+            audio_seconds += len(samples) / sample_rate
+            
+            file_errors, file_words = word_errors(reference, " ".join(s.text for s in segments))
+            errors += file_errors
+            reference_words += file_words
+            
+        peak = peak_rss_mb()
+        result.update({
+            "files": len(audio),
+            "audio_seconds": round(audio_seconds, 3),
+            "decode_seconds": round(decode_seconds, 3),
+            "rtf": round(decode_seconds / audio_seconds, 4) if audio_seconds else None,
+            "wer": round(errors / reference_words, 4) if reference_words else None,
+            "peak_rss_mb": round(peak, 1) if peak is not None else None,
+        })
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+
+def run_benchmark(corpus: List[Tuple[Path, str]], whisper_config: Dict[str, Any],
+                  models: List[str], compute_types: List[str], sample_rate: int = 16000,
+                  on_result: Optional[Callable[[Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
+    """Benchmark every model x compute_type combination, one fresh process per variant.
+
+    A separate process per variant keeps peak RSS and load time independent of
+    the models measured before it.
+    """
+    logger = logging.getLogger(__name__)
+    corpus = [(str(path), reference) for path, reference in corpus]
+    base_config = dict(whisper_config, preload=False, tiers={}, policy={}, long_audio={})
+    context = multiprocessing.get_context("spawn")
+    
+    results = []
+    for model in models:
+        for compute_type in compute_types:
+            variant = dict(base_config, model=model, compute_type=compute_type, model_path=None)
+            if os.path.isdir(os.path.expanduser(model)):
+                variant["model_path"] = model
+            logger.info(f"⏱️ Benchmarking {model} ({compute_type}) on {len(corpus)} file(s)")
+            
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                result = pool.submit(_bench_variant, variant, corpus, sample_rate).result()
+            results.append(result)
+            if on_result:
+                on_result(result)
+                
+    return results
@@ -0,0 +1,111 @@
+"""
+Split long recordings into chunks and stitch the decoded segments back together
+"""
+import re
+from typing import List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+from transcription.whisper_client import Segment
+
+
+class AudioChunk(NamedTuple):
+    """Sample range of one chunk within the full recording"""
+    start: int
+    end: int
+
+
+def split_audio(audio: np.ndarray, sample_rate: int, chunk_seconds: float = 30.0,
+                overlap_seconds: float = 1.0, search_seconds: float = 5.0,
+                frame_ms: int = 100) -> List[AudioChunk]:
+    """Split audio into chunks of at most chunk_seconds.
+
+    Each cut is placed at the quietest frame within the last search_seconds of
+    the window. If that frame is not clearly quieter than typical audio, there
+    is no pause to cut at, so the cut is made at the window edge and neighbouring
+    chunks overlap by overlap_seconds so no word is lost.
+    """
+    chunk = int(chunk_seconds * sample_rate)
+    if len(audio) <= chunk:
+        return [AudioChunk(0, len(audio))]
+        
+    # Frame energies for the whole recording, computed once
+    frame = max(1, int(frame_ms * sample_rate / 1000))
+    n_frames = len(audio) // frame
+    energy = np.mean(audio[:n_frames * frame].reshape(n_frames, frame) ** 2, axis=1)
+    quiet_level = np.median(energy) * 0.1
+    
+    # Keep the overlap and search inside the window so every cut makes progress
+    overlap = min(int(overlap_seconds * sample_rate), chunk // 2)
+    search = min(int(search_seconds * sample_rate), chunk - frame)
+    chunks: List[AudioChunk] = []
+    start = 0
+    while len(audio) - start > chunk:
+        window_end = start + chunk
+        first_frame = max(start, window_end - search) // frame
+        last_frame = min(window_end // frame, n_frames)
+        candidates = energy[first_frame:last_frame]
+        
+        cut = start
+        if len(candidates) and candidates.min() <= quiet_level:
+            cut = (first_frame + int(np.argmin(candidates))) * frame + frame // 2
+        if cut > start:
+            chunks.append(AudioChunk(start, cut))
+            start = cut
+        else:
+            chunks.append(AudioChunk(start, window_end))
+            start = window_end - overlap
+            
+    chunks.append(AudioChunk(start, len(audio)))
+    return chunks
+
+
+def _words(text: str) -> List[str]:
+    return [re.sub(r"[^\w']", "", word).lower() for word in text.split()]
+
+
+def _drop_repeated_words(previous: str, text: str, max_words: int = 8) -> str:
+    """Remove leading words of text that repeat the trailing words of previous"""
+    prev_words, words = _words(previous), text.split()
+    norm = _words(text)
+    for size in range(min(max_words, len(prev_words), len(norm)), 0, -1):
+        if prev_words[-size:] == norm[:size]:
+            return " ".join(words[size:])
+    return text
+
+
+def stitch_segments(decoded: Sequence[Tuple[AudioChunk, List[Segment]]], sample_rate: int) -> List[Segment]:
+    """Merge per-chunk segments into one timeline, de-duplicating overlapped speech.
+
+    Segment times are shifted by each chunk's offset. Where two chunks overlap,
+    the earlier chunk keeps segments starting before the middle of the overlap and
+    the later chunk keeps segments ending after it; words repeated across the join
+    are then dropped.
+    """
+    stitched: List[Segment] = []
+    for index, (chunk, segments) in enumerate(decoded):
+        offset = chunk.start / sample_rate
+        
+        # Midpoints of the overlaps with the neighbouring chunks (if any)
+        keep_from = 0.0
+        keep_until = float("inf")
+        if index > 0 and decoded[index - 1][0].end > chunk.start:
+            keep_from = (chunk.start + decoded[index - 1][0].end) / 2 / sample_rate
+        if index + 1 < len(decoded) and decoded[index + 1][0].start < chunk.end:
+            keep_until = (decoded[index + 1][0].start + chunk.end) / 2 / sample_rate
+            
+        first_kept = True
+        for segment in segments:
+            start, end = segment.start + offset, segment.end + offset
+            # Skip speech that the neighbouring chunk owns
+            if end <= keep_from or start >= keep_until:
+                continue
+                
+            text = segment.text
+            if first_kept and stitched:
+                text = _drop_repeated_words(stitched[-1].text, text)
+            first_kept = False
+            if text:
+                stitched.append(Segment(start, end, text))
+                
+    return stitched
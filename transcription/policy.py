@@ -0,0 +1,112 @@
+"""
+Adaptive decode settings - pick model size and speed/accuracy knobs per job
+"""
+import logging
+import threading
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+# Rough CPU real-time factors used until a tier has been measured
+PRIOR_RTF = {
+    "tiny": 0.05,
+    "base": 0.1,
+    "small": 0.3,
+    "medium": 0.8,
+    "large-v2": 1.6,
+    "large-v3": 1.6,
+    "turbo": 0.6,
+}
+
+
+class DecodeSettings(NamedTuple):
+    """Everything that varies between policy tiers"""
+    model: str
+    compute_type: str = "default"
+    beam_size: int = 1
+    cpu_threads: int = 0
+    
+    @property
+    def model_key(self) -> Tuple[str, str, int]:
+        """Settings that require a separately loaded model instance"""
+        return self.model, self.compute_type, self.cpu_threads
+
+
+class ModelPolicy:
+    """Choose the most accurate tier predicted to meet the latency SLO.
+
+    Tiers are listed from most accurate to fastest. A job's latency is predicted
+    as the tier's measured real-time factor times the clip duration, scaled by the
+    number of jobs queued ahead of it. Whisper's fixed per-window cost dominates
+    short clips, so durations below min_effective_seconds count as that length.
+    The SLO is a list of {"max_seconds", "target_latency"} bands; the first band
+    covering the clip applies. If no tier is predicted to meet the target, the
+    fastest is used. Skipped tiers drift back toward their prior so one slow
+    sample does not rule a tier out for good.
+    """
+    
+    def __init__(self, policy_config: Dict[str, Any]):
+        self.tiers = [DecodeSettings(**tier) for tier in policy_config.get("tiers", [])]
+        if not self.tiers:
+            raise ValueError("Model policy needs at least one tier")
+        self.slo = sorted(policy_config.get("slo", []),
+                          key=lambda band: band.get("max_seconds") or float("inf"))
+        self.alpha = policy_config.get("ewma_alpha", 0.3)
+        self.recovery = policy_config.get("recovery", 0.05)
+        self.min_effective_seconds = policy_config.get("min_effective_seconds", 5.0)
+        self.logger = logging.getLogger(__name__)
+        
+        self._rtf: Dict[DecodeSettings, float] = {}
+        self._lock = threading.Lock()
+        
+    def target_latency(self, duration: float) -> Optional[float]:
+        """Latency target for a clip of this duration, None if no band applies"""
+        for band in self.slo:
+            max_seconds = band.get("max_seconds")
+            if max_seconds is None or duration <= max_seconds:
+                return band["target_latency"]
+        return None
+        
+    def rtf(self, tier: DecodeSettings) -> float:
+        """Measured real-time factor, or a prior based on model size"""
+        with self._lock:
+            measured = self._rtf.get(tier)
+        if measured is not None:
+            return measured
+        return self._prior(tier)
+        
+    def _prior(self, tier: DecodeSettings) -> float:
+        return PRIOR_RTF.get(tier.model, 1.0) * (1 + 0.5 * (tier.beam_size - 1))
+        
+    def predict(self, tier: DecodeSettings, duration: float, queue_depth: int = 0) -> float:
+        """Predicted seconds until this job's text is ready"""
+        return self.rtf(tier) * max(duration, self.min_effective_seconds) * (1 + max(0, queue_depth))
+        
+    def choose(self, duration: float, queue_depth: int = 0) -> DecodeSettings:
+        """Pick settings for a job"""
+        target = self.target_latency(duration)
+        if target is None:
+            return self.tiers[0]
+            
+        chosen = self.tiers[-1]
+        for tier in self.tiers:
+            if self.predict(tier, duration, queue_depth) <= target:
+                chosen = tier
+                break
+                
+        with self._lock:
+            for tier, measured in self._rtf.items():
+                if tier != chosen:
+                    self._rtf[tier] = measured + self.recovery * (self._prior(tier) - measured)
+        return chosen
+        
+    def record(self, tier: DecodeSettings, duration: float, elapsed: float):
+        """Feed back the measured decode time of a finished job"""
+        if duration <= 0:
+            return
+        sample = elapsed / max(duration, self.min_effective_seconds)
+        with self._lock:
+            previous = self._rtf.get(tier)
+            self._rtf[tier] = sample if previous is None else self.alpha * sample + (1 - self.alpha) * previous
+            
+    def get_stats(self) -> List[Dict[str, Any]]:
+        """Current real-time factor estimate per tier"""
+        return [dict(tier._asdict(), rtf=self.rtf(tier), measured=tier in self._rtf) for tier in self.tiers]
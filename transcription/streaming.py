@@ -0,0 +1,117 @@
+"""
+Streaming transcription - decode audio chunks while recording is still running
+"""
+import logging
+import queue
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from transcription.whisper_client import WhisperClient
+
+
+class StreamingTranscriber:
+    """Incrementally transcribe a live recording.
+
+    Chunks are fed from the recorder thread and decoded on a background thread.
+    Segments that end well before the live edge are committed and their audio is
+    dropped, so only the unstable tail is ever re-decoded. When recording stops,
+    finish() decodes that tail and returns the full text. If a decode fails or
+    the worker misses finish()'s timeout, the text is incomplete and error is set.
+    """
+
+    def __init__(self, whisper: WhisperClient, streaming_config: Dict[str, Any], sample_rate: int):
+        self.whisper = whisper
+        self.sample_rate = sample_rate
+        self.step_seconds = streaming_config.get("step_seconds", 2.0)
+        self.unstable_seconds = streaming_config.get("unstable_seconds", 3.0)
+        self.max_buffer_seconds = streaming_config.get("max_buffer_seconds", 25.0)
+        self.logger = logging.getLogger(__name__)
+
+        self._chunks: "queue.Queue[Optional[np.ndarray]]" = queue.Queue()
+        self._buffer = np.zeros(0, dtype=np.float32)
+        self._new_chunks: List[np.ndarray] = []
+        self._committed: List[str] = []
+        self._undecoded_samples = 0
+        self._worker: Optional[threading.Thread] = None
+        self.error: Optional[BaseException] = None
+
+    def start(self):
+        """Start the background decode worker"""
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def feed(self, chunk: np.ndarray):
+        """Queue a mono float32 chunk for decoding (called from the recorder thread)"""
+        self._chunks.put(chunk)
+
+    def finish(self, timeout: Optional[float] = None) -> str:
+        """Stop streaming, decode the remaining tail and return the full transcription"""
+        self._chunks.put(None)
+        if self._worker is not None:
+            self._worker.join(timeout=timeout)
+            if self._worker.is_alive():
+                self.logger.warning("Streaming transcription did not finish in time")
+                if self.error is None:
+                    self.error = TimeoutError("Streaming transcription did not finish in time")
+        return " ".join(self._committed).strip()
+
+    def _run(self):
+        """Worker loop: accumulate chunks and decode every step_seconds of new audio"""
+        step_samples = int(self.step_seconds * self.sample_rate)
+        try:
+            while True:
+                chunk = self._chunks.get()
+                if chunk is None:
+                    break
+                self._append(chunk)
+                if self._undecoded_samples >= step_samples:
+                    self._decode(final=False)
+
+            # Final pass: everything left in the buffer becomes committed text
+            if len(self._buffer) or self._new_chunks:
+                self._decode(final=True)
+        except Exception as e:
+            self.error = e
+            self.logger.error(f"Streaming transcription failed: {e}")
+
+    def _append(self, chunk: np.ndarray):
+        """Collect a chunk; capture blocks are small, so they are joined once per decode"""
+        self._new_chunks.append(chunk.astype(np.float32, copy=True))
+        self._undecoded_samples += len(chunk)
+
+    def _decode(self, final: bool):
+        """Decode the pending buffer and commit the stable segments"""
+        self._buffer = np.concatenate([self._buffer] + self._new_chunks)
+        self._new_chunks = []
+        self._undecoded_samples = 0
+        prompt = self._committed[-1] if self._committed else None
+        segments, _ = self.whisper.transcribe_segments(self._buffer, initial_prompt=prompt)
+        segments = [segment for segment in segments if segment.text]
+
+        if final:
+            self._committed.extend(segment.text for segment in segments)
+            self._buffer = np.zeros(0, dtype=np.float32)
+            return
+
+        buffer_seconds = len(self._buffer) / self.sample_rate
+        stable_until = buffer_seconds - self.unstable_seconds
+        stable = [segment for segment in segments if segment.end <= stable_until]
+
+        if not stable and buffer_seconds > self.max_buffer_seconds:
+            if not segments:
+                # Nothing but silence - drop it, keeping only the unstable tail
+                self._buffer = self._buffer[int(stable_until * self.sample_rate):]
+                return
+            # A single long segment can keep the buffer growing - bound it by
+            # committing everything except the segment at the live edge
+            stable = segments[:-1] if len(segments) > 1 else segments
+
+        if not stable:
+            return
+
+        self._committed.extend(segment.text for segment in stable)
+        cut = min(int(stable[-1].end * self.sample_rate), len(self._buffer))
+        self._buffer = self._buffer[cut:]
+        self.logger.debug(f"Committed {len(stable)} streaming segment(s), {len(self._buffer) / self.sample_rate:.1f}s tail")
@@ -1,39 +1,153 @@
 """
 Faster-Whisper integration for speech-to-text transcription
 """
+import asyncio
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 from faster_whisper import WhisperModel
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, NamedTuple, Optional, Tuple
 import os
 
+from transcription.policy import DecodeSettings, ModelPolicy
+
+
+class Segment(NamedTuple):
+    """A decoded span of speech, timestamps in seconds relative to the input audio"""
+    start: float
+    end: float
+    text: str
+
+
+# faster-whisper expects 16 kHz mono input
+SAMPLE_RATE = 16000
+
+
+class TranscriptionCancelled(Exception):
+    """Raised when an in-flight transcription is cancelled or preempted"""
+
 
 class WhisperClient:
     def __init__(self, whisper_config: Dict[str, Any]):
         self.model_name = whisper_config["model"]
         self.language = whisper_config.get("language")
         self.device = whisper_config.get("device", "cpu")
+        self.compute_type = whisper_config.get("compute_type", "default")
+        self.cpu_threads = whisper_config.get("cpu_threads", 0)  # 0 = CTranslate2 default
+        self.num_workers = max(1, whisper_config.get("num_workers", 1))
+        # A local CTranslate2 model directory takes precedence over the model name
+        self.model_path = whisper_config.get("model_path")
+        self.download_root = os.path.expanduser(whisper_config.get("download_root") or "~/.cache/whisper")
+        self.long_audio = whisper_config.get("long_audio", {})
         self.logger = logging.getLogger(__name__)
         
+        # Optional per-job selection of model size, compute type, beam and threads
+        policy_config = whisper_config.get("policy", {})
+        self.policy: Optional[ModelPolicy] = ModelPolicy(policy_config) if policy_config.get("enabled") else None
+        self._policy_models: Dict[Tuple[str, str, int], WhisperModel] = {}
+        
+        # Optional fast draft tier; this client's own model is the refinement tier
+        tiers = whisper_config.get("tiers", {})
+        self.draft: Optional["WhisperClient"] = None
+        if tiers.get("enabled") and tiers.get("draft_model", "tiny") != self.model_name:
+            self.draft = WhisperClient(dict(
+                whisper_config,
+                model=tiers.get("draft_model", "tiny"),
+                model_path=None,
+                cpu_threads=tiers.get("draft_cpu_threads", self.cpu_threads),
+                num_workers=1,
+                long_audio={},
+                policy={},
+                tiers={}
+            ))
+        
+        # Decoding runs on a dedicated pool sized to the model's parallel workers.
+        # CTranslate2 releases the GIL while decoding, so threads are sufficient.
+        self._executor = ThreadPoolExecutor(max_workers=self.num_workers, thread_name_prefix="whisper")
+        self._active_cancels = set()
+        self._cancels_lock = threading.Lock()
+        
         self.model: Optional[WhisperModel] = None
+        self.fallback_model: Optional[str] = None  # Set when the configured model failed and tiny was loaded
         self._model_loaded = False
+        self._batched_pipeline = None
+        
+        # Readiness state shared between the preload thread and transcription callers
+        self._load_lock = threading.Lock()
+        self.ready = threading.Event()
+        self.state = "idle"  # idle -> loading -> loaded -> warming -> ready (or failed)
+        
+    @property
+    def is_ready(self) -> bool:
+        """True once the model is loaded and warmed up"""
+        return self.ready.is_set()
+        
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """Block until a preload finishes, return False on timeout"""
+        return self.ready.wait(timeout)
+        
+    def preload(self, warmup: bool = True):
+        """Load the model eagerly and optionally prime it with a short silent decode"""
+        if self.draft is not None:
+            # Draft first: it is small and serves the first dictation
+            self.draft.preload(warmup)
+            
+        try:
+            start = time.monotonic()
+            self._load_model()
+            if self.policy is not None:
+                for tier in self.policy.tiers:
+                    self._get_model(tier)
+            if warmup:
+                self.warmup()
+            self.logger.info(f"Whisper model ready in {time.monotonic() - start:.1f}s")
+        except Exception as e:
+            self.state = "failed"
+            self.logger.error(f"Whisper preload failed: {e}")
+            
+    def warmup(self, seconds: float = 1.0, sample_rate: int = SAMPLE_RATE):
+        """Run a throwaway decode on silence so kernels and allocators are initialized"""
+        self.state = "warming"
+        self.transcribe_segments(np.zeros(int(seconds * sample_rate), dtype=np.float32))
         
     def _load_model(self):
         """Load the Whisper model (lazy loading)"""
         if self._model_loaded:
             return
             
+        if self._load_lock.locked():
+            self.logger.info("⏳ Waiting for Whisper model to finish loading...")
+            
+        # Concurrent callers wait for an in-flight load instead of starting another
+        with self._load_lock:
+            if self._model_loaded:
+                return
+            self.state = "loading"
+            try:
+                self._load_model_locked()
+            except Exception:
+                self.state = "failed"
+                raise
+            self.state = "loaded"
+            
+    def _load_model_locked(self):
+        """Load the Whisper model, falling back to 'tiny' on failure"""
         try:
-            self.logger.info(f"Loading Whisper model: {self.model_name}")
+            model_id = os.path.expanduser(self.model_path) if self.model_path else self.model_name
+            self.logger.info(f"Loading Whisper model: {model_id} ({self.compute_type})")
             
             # Set up model cache directory
-            cache_dir = os.path.expanduser("~/.cache/whisper")
-            os.makedirs(cache_dir, exist_ok=True)
+            os.makedirs(self.download_root, exist_ok=True)
             
             self.model = WhisperModel(
-                self.model_name,
+                model_id,
                 device=self.device,
-                download_root=cache_dir
+                download_root=self.download_root,
+                compute_type=self.compute_type,
+                cpu_threads=self.cpu_threads,
+                num_workers=self.num_workers
             )
             
             self._model_loaded = True
@@ -46,8 +160,11 @@ class WhisperClient:
             if self.model_name != "tiny":
                 self.logger.info("Attempting fallback to 'tiny' model...")
                 try:
-                    self.model = WhisperModel("tiny", device=self.device, download_root=cache_dir)
+                    self.model = WhisperModel("tiny", device=self.device, download_root=self.download_root,
+                                              compute_type=self.compute_type, cpu_threads=self.cpu_threads,
+                                              num_workers=self.num_workers)
                     self._model_loaded = True
+                    self.fallback_model = "tiny"
                     self.logger.info("Fallback to tiny model successful")
                 except Exception as fallback_error:
                     self.logger.error(f"Fallback model also failed: {fallback_error}")
@@ -55,40 +172,204 @@ class WhisperClient:
             else:
                 raise
                 
-    async def transcribe(self, audio_data: np.ndarray) -> str:
-        """Transcribe audio data to text"""
-        try:
-            # Ensure model is loaded
+    def _get_model(self, settings: Optional[DecodeSettings] = None) -> WhisperModel:
+        """Return the model for a policy tier, loading it on first use"""
+        if settings is None or settings.model_key == (self.model_name, self.compute_type, self.cpu_threads):
             self._load_model()
-            
             if self.model is None:
                 raise RuntimeError("Whisper model not available")
+            return self.model
+            
+        model = self._policy_models.get(settings.model_key)
+        if model is not None:
+            return model
+            
+        with self._load_lock:
+            if settings.model_key not in self._policy_models:
+                self.logger.info(f"Loading Whisper model: {settings.model} ({settings.compute_type}, "
+                                 f"{settings.cpu_threads or 'default'} threads)")
+                os.makedirs(self.download_root, exist_ok=True)
+                self._policy_models[settings.model_key] = WhisperModel(
+                    settings.model,
+                    device=self.device,
+                    download_root=self.download_root,
+                    compute_type=settings.compute_type,
+                    cpu_threads=settings.cpu_threads,
+                    num_workers=self.num_workers
+                )
+            return self._policy_models[settings.model_key]
+            
+    def _prepare_audio(self, audio_data: np.ndarray) -> np.ndarray:
+        """Convert audio to the float32 [-1, 1] format Whisper expects"""
+        if audio_data.dtype != np.float32:
+            audio_data = audio_data.astype(np.float32)
+            
+        # Normalize audio to [-1, 1] range if needed
+        max_val = np.abs(audio_data).max() if audio_data.size else 0.0
+        if max_val > 1.0:
+            audio_data = audio_data / max_val
+            
+        return audio_data
+        
+    def transcribe_segments(self, audio_data: np.ndarray, initial_prompt: Optional[str] = None,
+                            cancel_event: Optional[threading.Event] = None,
+                            settings: Optional[DecodeSettings] = None) -> Tuple[List[Segment], Any]:
+        """Decode audio synchronously and return timestamped segments plus decode info.
+
+        If cancel_event is set while decoding, TranscriptionCancelled is raised at the
+        next segment boundary. settings selects a policy tier instead of the default model.
+        """
+        # Ensure model is loaded
+        model = self._get_model(settings)
+        
+        audio_data = self._prepare_audio(audio_data)
+        
+        segments, info = model.transcribe(
+            audio_data,
+            language=self.language,
+            beam_size=settings.beam_size if settings else 1,  # 1 = fastest inference
+            best_of=1,    # Faster inference
+            vad_filter=False,  # Voice activity detection - for now some onnx lib issues
+            vad_parameters=dict(min_silence_duration_ms=500),
+            initial_prompt=initial_prompt
+        )
+        
+        # The segment generator drives decoding, so consume it here
+        decoded = []
+        for segment in segments:
+            if cancel_event is not None and cancel_event.is_set():
+                raise TranscriptionCancelled()
+            decoded.append(Segment(segment.start, segment.end, segment.text.strip()))
+        
+        # The first completed decode (warm-up or real) marks the model as primed
+        if not self.ready.is_set():
+            self.state = "ready"
+            self.ready.set()
+            
+        return decoded, info
+        
+    async def transcribe_segments_async(self, audio_data: np.ndarray, initial_prompt: Optional[str] = None,
+                                        settings: Optional[DecodeSettings] = None) -> Tuple[List[Segment], Any]:
+        """Decode on the Whisper pool without blocking the event loop.
+
+        Cancelling the awaiting task (or calling cancel_all) stops the decode at the
+        next segment boundary and frees the worker.
+        """
+        cancel_event = threading.Event()
+        with self._cancels_lock:
+            self._active_cancels.add(cancel_event)
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor, self.transcribe_segments, audio_data, initial_prompt, cancel_event, settings
+            )
+        except asyncio.CancelledError:
+            cancel_event.set()
+            raise
+        finally:
+            with self._cancels_lock:
+                self._active_cancels.discard(cancel_event)
                 
-            # Ensure audio is in the right format for Whisper
-            if audio_data.dtype != np.float32:
-                audio_data = audio_data.astype(np.float32)
+    def _is_long(self, audio_data: np.ndarray) -> bool:
+        """Whether a recording should use chunked long-audio decoding.
+
+        Chunks only pay for their seams when they decode in parallel, so a single
+        decode worker without the batched pipeline always decodes in one pass.
+        """
+        return (self.long_audio.get("enabled", False)
+                and (self.num_workers > 1 or self.long_audio.get("batched", False))
+                and len(audio_data) >= self.long_audio.get("min_seconds", 60) * SAMPLE_RATE)
                 
-            # Normalize audio to [-1, 1] range if needed
-            max_val = np.abs(audio_data).max()
-            if max_val > 1.0:
-                audio_data = audio_data / max_val
+    async def transcribe_long_async(self, audio_data: np.ndarray,
+                                    settings: Optional[DecodeSettings] = None) -> Tuple[List[Segment], Any]:
+        """Decode a long recording as chunks in parallel and stitch the segments.
+
+        Chunks are cut at pauses (or fixed windows with overlap) and decoded
+        concurrently on the Whisper pool, so num_workers bounds the parallelism.
+        With long_audio["batched"], the chunks are instead handed to
+        faster-whisper's batched pipeline as clip timestamps. Its segments come
+        back as one list that cannot be de-duplicated per chunk, so those chunks
+        do not overlap, and it always runs this client's own model.
+        """
+        from transcription.chunking import split_audio, stitch_segments
+        
+        batched = self.long_audio.get("batched", False)
+        chunks = split_audio(
+            audio_data, SAMPLE_RATE,
+            chunk_seconds=self.long_audio.get("chunk_seconds", 30),
+            overlap_seconds=0.0 if batched else self.long_audio.get("overlap_seconds", 1.0)
+        )
+        self.logger.info(f"Decoding {len(audio_data) / SAMPLE_RATE:.0f}s of audio as {len(chunks)} chunks")
+        
+        if batched:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self._transcribe_batched, audio_data, chunks)
+            
+        results = await asyncio.gather(
+            *(self.transcribe_segments_async(audio_data[chunk.start:chunk.end], settings=settings)
+              for chunk in chunks)
+        )
+        decoded = [(chunk, segments) for chunk, (segments, _) in zip(chunks, results)]
+        return stitch_segments(decoded, SAMPLE_RATE), results[0][1]
+        
+    def _transcribe_batched(self, audio_data: np.ndarray, chunks) -> Tuple[List[Segment], Any]:
+        """Decode chunks together with faster-whisper's BatchedInferencePipeline"""
+        from faster_whisper import BatchedInferencePipeline
+        
+        self._load_model()
+        if self._batched_pipeline is None:
+            self._batched_pipeline = BatchedInferencePipeline(model=self.model)
+            
+        segments, info = self._batched_pipeline.transcribe(
+            self._prepare_audio(audio_data),
+            language=self.language,
+            batch_size=self.long_audio.get("batch_size", 8),
+            vad_filter=False,
+            clip_timestamps=[{"start": chunk.start, "end": chunk.end} for chunk in chunks]  # sample offsets
+        )
+        return [Segment(segment.start, segment.end, segment.text.strip()) for segment in segments], info
+        
+    def cancel_all(self) -> int:
+        """Cancel every in-flight transcription, returning how many were signalled"""
+        cancelled = self.draft.cancel_all() if self.draft is not None else 0
+        with self._cancels_lock:
+            for cancel_event in self._active_cancels:
+                cancel_event.set()
+            return cancelled + len(self._active_cancels)
+            
+    def shutdown(self):
+        """Cancel in-flight work and release the decode pool"""
+        self.cancel_all()
+        self._executor.shutdown(wait=False)
+        if self.draft is not None:
+            self.draft.shutdown()
+        
+    async def transcribe(self, audio_data: np.ndarray, queue_depth: int = 0) -> str:
+        """Transcribe audio data to text, raising TranscriptionCancelled if preempted.
+
+        queue_depth is the number of jobs waiting behind this one; the model policy
+        uses it to trade accuracy for latency under load.
+        """
+        try:
+            settings = None
+            duration = len(audio_data) / SAMPLE_RATE
+            is_long = self._is_long(audio_data)
+            # The batched pipeline ignores per-job settings, so the policy neither chooses nor learns
+            if self.policy is not None and not (is_long and self.long_audio.get("batched", False)):
+                settings = self.policy.choose(duration, queue_depth)
+                self.logger.info(f"🎛️ Using {settings.model}/{settings.compute_type} beam {settings.beam_size} "
+                                 f"for {duration:.1f}s clip (queue {queue_depth})")
                 
-            # Transcribe
-            segments, info = self.model.transcribe(
-                audio_data,
-                language=self.language,
-                beam_size=1,  # Faster inference
-                best_of=1,    # Faster inference
-                vad_filter=False,  # Voice activity detection - for now some onnx lib issues
-                vad_parameters=dict(min_silence_duration_ms=500)
-            )
+            start = time.monotonic()
+            if is_long:
+                segments, info = await self.transcribe_long_async(audio_data, settings)
+            else:
+                segments, info = await self.transcribe_segments_async(audio_data, settings=settings)
+            if settings is not None:
+                self.policy.record(settings, duration, time.monotonic() - start)
             
             # Combine all segments into single text
-            transcription_parts = []
-            for segment in segments:
-                transcription_parts.append(segment.text.strip())
-                
-            transcription = " ".join(transcription_parts).strip()
+            transcription = " ".join(segment.text for segment in segments).strip()
             
             if transcription:
                 self.logger.info(f"Transcription completed (language: {info.language})")
@@ -98,10 +379,34 @@ class WhisperClient:
                 
             return transcription
             
+        except TranscriptionCancelled:
+            self.logger.info("⏹️ Transcription cancelled")
+            raise
         except Exception as e:
             self.logger.error(f"Transcription failed: {e}")
             return ""
             
+    async def transcribe_tiered(self, audio_data: np.ndarray) -> Tuple[str, "asyncio.Task[str]"]:
+        """Return a fast draft transcription plus a task re-decoding the audio with the main model.
+
+        The refinement starts once the draft is done, so the draft never competes
+        with it for CPU. Without a draft tier, the draft is empty and the task is a
+        plain transcription.
+        """
+        draft_text = ""
+        if self.draft is not None:
+            start = time.monotonic()
+            draft_text = await self.draft.transcribe(audio_data)
+            self.logger.info(f"📄 Draft ({self.draft.model_name}) in {time.monotonic() - start:.2f}s")
+            
+        async def refine() -> str:
+            start = time.monotonic()
+            text = await self.transcribe(audio_data)
+            self.logger.info(f"📑 Refined ({self.model_name}) in {time.monotonic() - start:.2f}s")
+            return text
+            
+        return draft_text, asyncio.create_task(refine())
+        
     def get_available_models(self):
         """Get list of available Whisper models"""
         return ["tiny", "base", "small", "medium", "large-v2", "large-v3", "turbo"]
@@ -113,6 +418,8 @@ class WhisperClient:
             
         return {
             "model_name": self.model_name,
+            "model_path": self.model_path,
+            "compute_type": self.compute_type,
             "device": self.device,
             "language": self.language
         }
\ No newline at end of file
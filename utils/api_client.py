@@ -0,0 +1,89 @@
+"""
+Thin client for the local API of a running Vibe Transcribe service (standard library only)
+"""
+import http.client
+import json
+import os
+import socket
+from typing import Any, Dict, Optional
+from urllib.parse import urlencode
+
+
+class APIError(Exception):
+    """The service could not be reached or rejected the request"""
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP over a Unix domain socket"""
+    
+    def __init__(self, socket_path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+        
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class APIClient:
+    def __init__(self, api_config: Dict[str, Any], timeout: float = 300):
+        self.host = api_config.get("host", "127.0.0.1")
+        self.port = api_config.get("port", 9478)
+        self.unix_socket = api_config.get("unix_socket")
+        if self.unix_socket:
+            self.unix_socket = os.path.expanduser(self.unix_socket)
+        self.token = api_config.get("token")
+        self.timeout = timeout
+        
+    def _request(self, method: str, path: str, body: Optional[bytes] = None,
+                 content_type: Optional[str] = None) -> Dict[str, Any]:
+        if self.unix_socket:
+            connection = UnixHTTPConnection(self.unix_socket, self.timeout)
+            where = self.unix_socket
+        else:
+            connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            where = f"{self.host}:{self.port}"
+            
+        headers = {"Content-Type": content_type} if content_type else {}
+        if self.token and not self.unix_socket:
+            headers["Authorization"] = f"Bearer {self.token}"
+        try:
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            payload = response.read()
+        except OSError as e:
+            raise APIError(f"Could not reach Vibe Transcribe at {where} ({e}); is `start --api` running?")
+        finally:
+            connection.close()
+            
+        try:
+            result = json.loads(payload)
+        except json.JSONDecodeError:
+            raise APIError(f"Unexpected response ({response.status})")
+        if response.status >= 400:
+            raise APIError(result.get("error", f"Request failed ({response.status})"))
+        return result
+        
+    def status(self) -> Dict[str, Any]:
+        return self._request("GET", "/status")
+        
+    def transcribe_file(self, path: str, mode: Optional[str] = None, vad: bool = True) -> Dict[str, Any]:
+        """Send an encoded audio file; the service decodes it"""
+        with open(os.path.expanduser(path), "rb") as f:
+            data = f.read()
+        return self.transcribe_bytes(data, mode=mode, vad=vad)
+        
+    def transcribe_bytes(self, data: bytes, raw_f32: bool = False, mode: Optional[str] = None,
+                         vad: bool = True) -> Dict[str, Any]:
+        """Send an encoded audio file, or raw 16 kHz mono float32 samples when raw_f32 is set"""
+        query = {"vad": "1" if vad else "0"}
+        if raw_f32:
+            query["format"] = "f32"
+        if mode:
+            query["mode"] = mode
+        return self._request("POST", f"/transcribe?{urlencode(query)}", data, "application/octet-stream")
+        
+    def process_text(self, text: str, mode: str, provider: Optional[str] = None) -> Dict[str, Any]:
+        body = json.dumps({"text": text, "mode": mode, "provider": provider}).encode("utf-8")
+        return self._request("POST", "/process", body, "application/json")
@@ -0,0 +1,189 @@
+"""
+Local HTTP API so scripts and editor integrations can use the running service's warm model
+"""
+import asyncio
+import hmac
+import io
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+from aiohttp import web
+
+from transcription.whisper_client import SAMPLE_RATE, TranscriptionCancelled
+
+# Bodies a web page can POST cross-origin without a preflight
+FORM_CONTENT_TYPES = ("text/plain", "application/x-www-form-urlencoded", "multipart/form-data")
+
+
+class APIServer:
+    """Serves transcription, text processing and status on localhost TCP or a Unix socket.
+
+    POST /transcribe  body is an encoded audio file, raw float32 mono samples at
+                      16 kHz (?format=f32) or JSON {"path": ...} for a file on this
+                      machine; ?mode=<mode> also runs the LLM on the transcription
+    POST /process     JSON {"text": ..., "mode": ..., "provider": ...}
+    GET  /status      model state, queue depth and counters
+
+    Requests from browsers (anything with an Origin header) and form-style
+    bodies are rejected so web pages cannot reach the service, and JSON
+    endpoints require a JSON Content-Type. With a token configured, TCP
+    requests must send "Authorization: Bearer <token>".
+
+    vibe is the running VibeTranscribe instance whose model, VAD and LLM client are used.
+    """
+    
+    def __init__(self, vibe, api_config: Dict[str, Any]):
+        self.vibe = vibe
+        self.host = api_config.get("host", "127.0.0.1")
+        self.port = api_config.get("port", 9478)
+        self.unix_socket = api_config.get("unix_socket")
+        if self.unix_socket:
+            self.unix_socket = os.path.expanduser(self.unix_socket)
+        self.token = api_config.get("token")
+        self.logger = logging.getLogger(__name__)
+        
+        self.started_at = time.monotonic()
+        self.requests = 0
+        self._runner: Optional[web.AppRunner] = None
+        
+    async def start(self):
+        app = web.Application(client_max_size=512 * 1024 * 1024, middlewares=[self._guard])
+        app.router.add_post("/transcribe", self._transcribe)
+        app.router.add_post("/process", self._process)
+        app.router.add_get("/status", self._status)
+        
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        if self.unix_socket:
+            os.makedirs(os.path.dirname(self.unix_socket) or ".", exist_ok=True)
+            if os.path.exists(self.unix_socket):
+                os.unlink(self.unix_socket)  # Left behind by a previous run
+            site = web.UnixSite(self._runner, self.unix_socket)
+            await site.start()
+            os.chmod(self.unix_socket, 0o600)
+            self.logger.info(f"🔌 API listening on {self.unix_socket}")
+        else:
+            site = web.TCPSite(self._runner, self.host, self.port)
+            await site.start()
+            self.logger.info(f"🔌 API listening on http://{self.host}:{self.port}")
+            
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+        if self.unix_socket and os.path.exists(self.unix_socket):
+            os.unlink(self.unix_socket)
+            
+    @staticmethod
+    def _error(status: int, message: str) -> web.Response:
+        return web.json_response({"error": message}, status=status)
+        
+    @web.middleware
+    async def _guard(self, request: web.Request, handler):
+        """Keep browsers out and check the token on TCP listeners"""
+        if "Origin" in request.headers:
+            return self._error(403, "Browser requests are not accepted")
+        if request.method == "POST" and request.content_type in FORM_CONTENT_TYPES:
+            return self._error(415, f"Unsupported Content-Type: {request.content_type}")
+        if self.token and not self.unix_socket:
+            supplied = request.headers.get("Authorization", "")
+            if not hmac.compare_digest(supplied.encode("utf-8"), f"Bearer {self.token}".encode("utf-8")):
+                return self._error(401, "Missing or invalid API token")
+        return await handler(request)
+        
+    @staticmethod
+    async def _read_json(request: web.Request) -> Dict[str, Any]:
+        """The request body as a JSON object, or ValueError"""
+        try:
+            body = await request.json()
+        except json.JSONDecodeError:
+            raise ValueError("Expected a JSON body")
+        if not isinstance(body, dict):
+            raise ValueError("Expected a JSON object")
+        return body
+        
+    async def _read_audio(self, request: web.Request) -> np.ndarray:
+        """Decode the request body into mono float32 samples at 16 kHz"""
+        loop = asyncio.get_running_loop()
+        if request.content_type == "application/json":
+            body = await self._read_json(request)
+            path = os.path.expanduser(body.get("path", ""))
+            if not os.path.isfile(path):
+                raise ValueError(f"No such file: {path}")
+            source = path
+        else:
+            data = await request.read()
+            if request.query.get("format") == "f32":
+                if int(request.query.get("sample_rate", SAMPLE_RATE)) != SAMPLE_RATE:
+                    raise ValueError(f"Raw samples must be {SAMPLE_RATE} Hz mono float32")
+                return np.frombuffer(data, dtype=np.float32)
+            source = io.BytesIO(data)
+            
+        from audio.decode import load_audio_file
+        return await loop.run_in_executor(None, load_audio_file, source, SAMPLE_RATE)
+        
+    async def _transcribe(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        start = time.monotonic()
+        try:
+            audio = await self._read_audio(request)
+        except Exception as e:
+            return self._error(400, f"Could not read audio: {e}")
+            
+        result = {"duration": round(len(audio) / SAMPLE_RATE, 3)}
+        try:
+            vad = self.vibe.vad
+            if vad is not None and request.query.get("vad", "1") != "0":
+                loop = asyncio.get_running_loop()
+                audio, _ = await loop.run_in_executor(None, vad.process, audio)
+            result["text"] = await self.vibe.whisper.transcribe(audio) if len(audio) else ""
+            
+            mode = request.query.get("mode")
+            if mode and mode != "transcribe" and result["text"].strip():
+                result["processed"] = await self.vibe.llm.process_text(result["text"], mode)
+        except TranscriptionCancelled:
+            return self._error(409, "Transcription was preempted by a new recording")
+        except Exception as e:
+            self.logger.error(f"API transcription failed: {e}")
+            return self._error(500, str(e))
+            
+        result["seconds"] = round(time.monotonic() - start, 3)
+        return web.json_response(result)
+        
+    async def _process(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        if request.content_type != "application/json":
+            return self._error(415, "Expected Content-Type: application/json")
+        try:
+            body = await self._read_json(request)
+        except ValueError as e:
+            return self._error(400, str(e))
+        if not body.get("text") or not body.get("mode"):
+            return self._error(400, "Both text and mode are required")
+            
+        start = time.monotonic()
+        try:
+            text = await self.vibe.llm.process_text(body["text"], body["mode"], body.get("provider"))
+        except ValueError as e:
+            return self._error(400, str(e))
+        except Exception as e:
+            return self._error(502, f"LLM processing failed: {e}")
+        return web.json_response({"text": text, "seconds": round(time.monotonic() - start, 3)})
+        
+    async def _status(self, request: web.Request) -> web.Response:
+        whisper = self.vibe.whisper
+        return web.json_response({
+            "model": whisper.model_path or whisper.model_name,
+            "compute_type": whisper.compute_type,
+            "model_state": whisper.state,
+            "ready": whisper.is_ready,
+            "recording": self.vibe.recorder.is_recording,
+            "uptime_seconds": round(time.monotonic() - self.started_at, 1),
+            "api_requests": self.requests,
+            "jobs": self.vibe.jobs.get_stats(),
+            "counters": self.vibe.metrics.get_stats()["counters"],
+        })
@@ -10,11 +10,13 @@ class ClipboardManager:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         
-    def copy_to_clipboard(self, text: str) -> bool:
+    def copy_to_clipboard(self, text: str, verify: bool = True) -> bool:
         """Copy text to clipboard, return True if successful"""
         try:
             pyperclip.copy(text)
-            
+            if not verify:
+                return True
+                
             # Verify the copy worked by reading it back
             copied_text = pyperclip.paste()
             if copied_text == text:
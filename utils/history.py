@@ -0,0 +1,164 @@
+"""
+Opt-in recording history: SQLite index plus compressed audio, written in the background
+"""
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# Blob file extension for each audio encoding
+EXTENSIONS = {"flac": ".flac", "opus": ".opus"}
+
+_STOP = object()
+
+
+class HistoryStore:
+    """Stores each dictation's audio and results so it can be replayed or reprocessed.
+
+    record() only queues the entry; a writer thread encodes the audio, writes the
+    blob and appends the index row, so the clipboard path never waits on disk.
+    Retention drops the oldest entries past max_age_days or once the audio blobs
+    exceed max_bytes.
+    """
+    
+    def __init__(self, history_config: Dict[str, Any]):
+        self.path = os.path.expanduser(history_config.get("path", "~/.local/share/vibe-transcribe/history"))
+        self.encoding = history_config.get("encoding", "flac")
+        if self.encoding not in EXTENSIONS:
+            raise ValueError(f"Unknown history encoding: {self.encoding}")
+        self.max_age_days = history_config.get("max_age_days", 30)
+        self.max_bytes = history_config.get("max_bytes", 500 * 1024 * 1024)
+        self.logger = logging.getLogger(__name__)
+        
+        self.audio_dir = os.path.join(self.path, "audio")
+        os.makedirs(self.audio_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(self.path, "history.sqlite3"), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS recordings ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, created_at REAL NOT NULL, "
+            "duration REAL NOT NULL, sample_rate INTEGER NOT NULL, audio_file TEXT, audio_bytes INTEGER, "
+            "status TEXT NOT NULL, mode TEXT, model TEXT, transcription TEXT, processed TEXT, error TEXT)"
+        )
+        self._conn.commit()
+        
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        
+    def record(self, audio: np.ndarray, sample_rate: int, status: str, **fields):
+        """Queue a finished dictation for storage (non-blocking)"""
+        if self._writer is None or not self._writer.is_alive():
+            self._writer = threading.Thread(target=self._write_loop, name="history", daemon=True)
+            self._writer.start()
+        self._queue.put((time.time(), audio, sample_rate, status, fields))
+        
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                self._write(*item)
+            except Exception as e:
+                self.logger.error(f"Failed to save recording to history: {e}")
+            finally:
+                self._queue.task_done()
+                
+    def _write(self, created_at: float, audio: np.ndarray, sample_rate: int, status: str,
+               fields: Dict[str, Any]):
+        from audio.decode import encode_audio_file
+        
+        audio_file = None
+        audio_bytes = 0
+        if len(audio):
+            stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(created_at))
+            audio_file = f"{stamp}-{uuid.uuid4().hex[:8]}{EXTENSIONS[self.encoding]}"
+            target = os.path.join(self.audio_dir, audio_file)
+            partial = target + ".part"
+            encode_audio_file(partial, audio, sample_rate, self.encoding)
+            os.replace(partial, target)
+            audio_bytes = os.path.getsize(target)
+            
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO recordings (created_at, duration, sample_rate, audio_file, audio_bytes, "
+                "status, mode, model, transcription, processed, error) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (created_at, len(audio) / sample_rate, sample_rate, audio_file, audio_bytes, status,
+                 fields.get("mode"), fields.get("model"), fields.get("transcription"),
+                 fields.get("processed"), fields.get("error"))
+            )
+            self._apply_retention()
+            self._conn.commit()
+        self.logger.debug(f"Saved recording {cursor.lastrowid} to history ({audio_bytes} bytes)")
+        
+    def _apply_retention(self):
+        """Delete entries past the age limit, then the oldest until the audio fits max_bytes"""
+        expired = []
+        if self.max_age_days:
+            cutoff = time.time() - self.max_age_days * 86400
+            expired = self._conn.execute(
+                "SELECT id, audio_file FROM recordings WHERE created_at < ?", (cutoff,)
+            ).fetchall()
+            
+        if self.max_bytes:
+            (total,) = self._conn.execute("SELECT COALESCE(SUM(audio_bytes), 0) FROM recordings").fetchone()
+            expired_ids = {row[0] for row in expired}
+            for entry_id, audio_file, size in self._conn.execute(
+                "SELECT id, audio_file, audio_bytes FROM recordings ORDER BY id ASC"
+            ).fetchall():
+                if total <= self.max_bytes:
+                    break
+                if entry_id not in expired_ids:
+                    expired.append((entry_id, audio_file))
+                total -= size or 0
+                
+        for entry_id, audio_file in expired:
+            self._conn.execute("DELETE FROM recordings WHERE id = ?", (entry_id,))
+            if audio_file:
+                try:
+                    os.remove(os.path.join(self.audio_dir, audio_file))
+                except FileNotFoundError:
+                    pass
+        if expired:
+            self.logger.debug(f"Removed {len(expired)} old recording(s) from history")
+            
+    def _row_to_dict(self, cursor: sqlite3.Cursor, row: tuple) -> Dict[str, Any]:
+        return {column[0]: value for column, value in zip(cursor.description, row)}
+        
+    def recent(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Most recent entries first"""
+        with self._lock:
+            cursor = self._conn.execute("SELECT * FROM recordings ORDER BY id DESC LIMIT ?", (limit,))
+            return [self._row_to_dict(cursor, row) for row in cursor.fetchall()]
+            
+    def get(self, entry_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            cursor = self._conn.execute("SELECT * FROM recordings WHERE id = ?", (entry_id,))
+            row = cursor.fetchone()
+            return self._row_to_dict(cursor, row) if row is not None else None
+            
+    def load_audio(self, entry: Dict[str, Any], sample_rate: Optional[int] = None) -> np.ndarray:
+        """Decode an entry's stored audio back to mono float32 (at its own rate unless given)"""
+        if not entry.get("audio_file"):
+            raise FileNotFoundError(f"Recording {entry['id']} has no stored audio")
+        from audio.decode import load_audio_file
+        return load_audio_file(os.path.join(self.audio_dir, entry["audio_file"]),
+                               sample_rate or entry["sample_rate"])
+                               
+    def flush(self):
+        """Wait until every queued recording has been written"""
+        self._queue.join()
+        
+    def close(self):
+        """Finish pending writes and close the index"""
+        if self._writer is not None and self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,172 @@
+"""
+Bounded, ordered job queue for the processing pipeline
+"""
+import asyncio
+import itertools
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+
+BACKPRESSURE_POLICIES = ("queue", "drop", "coalesce")
+
+
+@dataclass
+class JobMetrics:
+    """Timing for a single job, all timestamps from time.monotonic()"""
+    job_id: int
+    enqueued_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    coalesced: int = 1
+    failed: bool = False
+
+    @property
+    def queue_wait(self) -> Optional[float]:
+        """Seconds spent waiting in the queue"""
+        if self.started_at is None:
+            return None
+        return self.started_at - self.enqueued_at
+
+    @property
+    def service_time(self) -> Optional[float]:
+        """Seconds spent in the handler"""
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+
+
+class _Job:
+    def __init__(self, payload: Any, metrics: JobMetrics):
+        self.payload = payload
+        self.metrics = metrics
+
+
+class JobQueue:
+    """FIFO job queue with a size bound, a worker pool and a backpressure policy.
+
+    When the queue is full, new jobs are handled according to the policy:
+    "queue" waits for space, "drop" rejects the new job and "coalesce" merges it
+    into the newest pending job using the supplied coalesce function. Counters
+    are mirrored into metrics (a utils.metrics.Metrics) as jobs_<counter> when
+    one is given, so they show up in the stats command and on /metrics.
+    """
+
+    def __init__(self, handler: Callable[[Any], Awaitable[Any]], max_queue: int = 4,
+                 concurrency: int = 1, backpressure: str = "queue",
+                 coalesce: Optional[Callable[[Any, Any], Any]] = None, history: int = 100,
+                 metrics=None):
+        if backpressure not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"Unknown backpressure policy: {backpressure}")
+        if backpressure == "coalesce" and coalesce is None:
+            raise ValueError("Coalesce policy requires a coalesce function")
+
+        self.handler = handler
+        self.max_queue = max(1, max_queue)
+        self.concurrency = max(1, concurrency)
+        self.backpressure = backpressure
+        self.coalesce = coalesce
+        self.metrics = metrics
+        self.logger = logging.getLogger(__name__)
+
+        self._pending: Deque[_Job] = deque()
+        self._condition: Optional[asyncio.Condition] = None
+        self._workers: List[asyncio.Task] = []
+        self._ids = itertools.count(1)
+        self._active = 0
+
+        self.recent: Deque[JobMetrics] = deque(maxlen=history)
+        self.counters = {"submitted": 0, "completed": 0, "failed": 0, "dropped": 0, "coalesced": 0}
+
+    def _count(self, counter: str):
+        self.counters[counter] += 1
+        if self.metrics is not None:
+            self.metrics.increment(f"jobs_{counter}")
+
+    def start(self):
+        """Start the worker tasks on the running event loop"""
+        self._condition = asyncio.Condition()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def stop(self):
+        """Cancel the workers, discarding any pending jobs"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._pending.clear()
+
+    @property
+    def depth(self) -> int:
+        """Number of jobs waiting plus jobs being processed"""
+        return len(self._pending) + self._active
+
+    async def submit(self, payload: Any) -> Optional[JobMetrics]:
+        """Add a job, returning its metrics or None if it was dropped"""
+        async with self._condition:
+            self._count("submitted")
+
+            if len(self._pending) >= self.max_queue:
+                if self.backpressure == "drop":
+                    self._count("dropped")
+                    self.logger.warning(f"Processing queue full ({self.max_queue}), dropping job")
+                    return None
+                if self.backpressure == "coalesce":
+                    newest = self._pending[-1]
+                    newest.payload = self.coalesce(newest.payload, payload)
+                    newest.metrics.coalesced += 1
+                    self._count("coalesced")
+                    self.logger.info(f"Processing queue full, coalesced into job #{newest.metrics.job_id}")
+                    return newest.metrics
+                await self._condition.wait_for(lambda: len(self._pending) < self.max_queue)
+
+            metrics = JobMetrics(job_id=next(self._ids), enqueued_at=time.monotonic())
+            self._pending.append(_Job(payload, metrics))
+            self._condition.notify_all()
+            return metrics
+
+    async def _worker(self):
+        """Take jobs in FIFO order and run the handler"""
+        while True:
+            async with self._condition:
+                await self._condition.wait_for(lambda: len(self._pending) > 0)
+                job = self._pending.popleft()
+                self._active += 1
+                self._condition.notify_all()
+
+            metrics = job.metrics
+            metrics.started_at = time.monotonic()
+            try:
+                await self.handler(job.payload)
+                self._count("completed")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                metrics.failed = True
+                self._count("failed")
+                self.logger.error(f"Job #{metrics.job_id} failed: {e}")
+            finally:
+                metrics.finished_at = time.monotonic()
+                self._active -= 1
+                self.recent.append(metrics)
+
+            self.logger.info(f"⏱️ Job #{metrics.job_id}: waited {metrics.queue_wait:.2f}s, "
+                             f"processed in {metrics.service_time:.2f}s")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth, counters and average timings over recent jobs"""
+        finished = [m for m in self.recent if m.service_time is not None]
+        waits = [m.queue_wait for m in finished]
+        services = [m.service_time for m in finished]
+        return {
+            "depth": self.depth,
+            "pending": len(self._pending),
+            "active": self._active,
+            **self.counters,
+            "avg_queue_wait": sum(waits) / len(waits) if waits else None,
+            "max_queue_wait": max(waits) if waits else None,
+            "avg_service_time": sum(services) / len(services) if services else None,
+            "max_service_time": max(services) if services else None,
+        }
@@ -0,0 +1,190 @@
+"""
+Per-dictation stage timings, latency histograms and a local metrics endpoint
+"""
+import bisect
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Sequence
+
+# Histogram bucket upper bounds in seconds (an implicit +Inf bucket follows)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Pipeline stages in the order they happen
+STAGES = (
+    "hotkey_to_record",  # Hotkey event until the recorder was running
+    "record",            # Recording duration
+    "stop_flush",        # Stopping the recorder and collecting the captured audio
+    "queue_wait",        # Waiting for a free pipeline worker
+    "vad",               # Silence trimming
+    "decode",            # Whisper (or the tail of a streaming session)
+    "mode_detect",       # Spoken mode phrase matching
+    "llm_ttft",          # LLM time to first token
+    "llm_total",         # LLM request until the full completion
+    "clipboard",         # Delivering the final text to the primary output sink
+    "release_to_draft",  # Stop hotkey until the draft-tier text was delivered
+    "release_to_clipboard",  # Stop hotkey until the final text was delivered
+)
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram in the Prometheus style"""
+    
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate a quantile by interpolating within its bucket"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                if index == len(self.buckets):
+                    return lower  # Beyond the last bound, report the bound
+                return lower + (self.buckets[index] - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+
+class Trace:
+    """Monotonic timing spans for one dictation as it moves through the pipeline"""
+    
+    def __init__(self, job_id: int):
+        self.job_id = job_id
+        self.marks: Dict[str, float] = {}
+        self.spans: Dict[str, float] = {}
+        
+    def mark(self, name: str, at: Optional[float] = None) -> float:
+        """Record a point in time (now unless given)"""
+        self.marks[name] = time.monotonic() if at is None else at
+        return self.marks[name]
+        
+    def span(self, stage: str, start: Optional[float], end: Optional[float] = None):
+        """Record a stage lasting from start until end (now unless given)"""
+        if start is None:
+            return
+        self.spans[stage] = (time.monotonic() if end is None else end) - start
+        
+    def summary(self) -> str:
+        return " ".join(f"{stage}={self.spans[stage] * 1000:.0f}ms" for stage in STAGES if stage in self.spans)
+
+
+class Metrics:
+    """Aggregates trace spans into per-stage histograms"""
+    
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.histograms: Dict[str, Histogram] = {}
+        self.counters: Dict[str, int] = {"dictations": 0}
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+        
+    def observe(self, stage: str, seconds: float):
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = Histogram(self.buckets)
+            histogram.observe(seconds)
+            
+    def increment(self, counter: str, amount: int = 1):
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+            
+    def record_trace(self, trace: Trace):
+        """Fold a finished dictation's spans into the histograms"""
+        for stage, seconds in trace.spans.items():
+            self.observe(stage, seconds)
+        self.increment("dictations")
+        self.logger.info(f"⏱️ Job {trace.job_id}: {trace.summary()}")
+        
+    def get_stats(self) -> Dict[str, Any]:
+        """Count, mean and estimated quantiles per stage"""
+        with self._lock:
+            stages = {}
+            for stage, h in self.histograms.items():
+                stages[stage] = {
+                    "count": h.count,
+                    "mean": h.sum / h.count if h.count else None,
+                    "p50": h.quantile(0.5),
+                    "p95": h.quantile(0.95),
+                    "p99": h.quantile(0.99),
+                }
+            return {"counters": dict(self.counters), "stages": stages}
+            
+    def render_prometheus(self) -> str:
+        """Text exposition format for Prometheus scrapers"""
+        lines: List[str] = []
+        with self._lock:
+            for name, value in self.counters.items():
+                lines.append(f"# TYPE vibe_{name}_total counter")
+                lines.append(f"vibe_{name}_total {value}")
+            lines.append("# HELP vibe_stage_seconds Time spent in each pipeline stage")
+            lines.append("# TYPE vibe_stage_seconds histogram")
+            for stage, h in self.histograms.items():
+                cumulative = 0
+                for bound, count in zip(h.buckets, h.counts):
+                    cumulative += count
+                    lines.append(f'vibe_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'vibe_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {h.count}')
+                lines.append(f'vibe_stage_seconds_sum{{stage="{stage}"}} {h.sum}')
+                lines.append(f'vibe_stage_seconds_count{{stage="{stage}"}} {h.count}')
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """Serves /metrics (Prometheus text) and /stats (JSON) from a background thread"""
+    
+    def __init__(self, metrics: Metrics, host: str = "127.0.0.1", port: int = 9477):
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self.logger = logging.getLogger(__name__)
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        
+    def start(self):
+        metrics = self.metrics
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/metrics":
+                    body, content_type = metrics.render_prometheus(), "text/plain; version=0.0.4"
+                elif self.path == "/stats":
+                    body, content_type = json.dumps(metrics.get_stats()), "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                data = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+                
+            def log_message(self, format, *args):
+                pass  # Keep scrapes out of the application log
+                
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics", daemon=True)
+        self._thread.start()
+        self.logger.info(f"📈 Metrics at http://{self.host}:{self.port}/metrics")
+        
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
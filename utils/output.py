@@ -0,0 +1,305 @@
+"""
+Output sinks: where finished text goes (clipboard, typing, file, stdout, socket)
+"""
+import json
+import logging
+import os
+import queue
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional
+
+_STOP = object()
+
+
+class OutputSink:
+    """One output destination, fed by its own worker thread.
+
+    deliver() runs on that worker, so a slow backend (an xclip launch, simulated
+    typing, a stalled socket) never blocks the event loop or the other sinks.
+    Sinks that accept drafts also get the draft-tier text, which the final text
+    later replaces; the others only see final text. Sinks that accept tokens
+    also get LLM output as it streams in, then finish_stream() with the final
+    text, which may differ from the tokens if the LLM call failed part way.
+    """
+    
+    name = "sink"
+    accepts_drafts = False
+    accepts_tokens = False
+    
+    def __init__(self, sink_config: Dict[str, Any]):
+        self.verify = sink_config.get("verify", False)
+        self.logger = logging.getLogger(__name__)
+        
+    def deliver(self, text: str, draft: bool = False) -> bool:
+        raise NotImplementedError
+        
+    def deliver_token(self, token: str):
+        raise NotImplementedError
+        
+    def finish_stream(self, streamed: str, text: str) -> bool:
+        """Complete a streamed delivery; streamed is every token sent so far"""
+        return self.deliver(text)
+        
+    def close(self):
+        pass
+
+
+class ClipboardSink(OutputSink):
+    """System clipboard; verify reads the text back (an extra xclip/xsel launch on Linux)"""
+    
+    name = "clipboard"
+    accepts_drafts = True
+    
+    def __init__(self, sink_config: Dict[str, Any]):
+        super().__init__(sink_config)
+        from utils.clipboard import ClipboardManager
+        self.clipboard = ClipboardManager()
+        
+    def deliver(self, text: str, draft: bool = False) -> bool:
+        return self.clipboard.copy_to_clipboard(text, verify=self.verify)
+
+
+class TypingSink(OutputSink):
+    """Types the text into the focused window as keystrokes"""
+    
+    name = "typing"
+    accepts_tokens = True
+    
+    def __init__(self, sink_config: Dict[str, Any]):
+        super().__init__(sink_config)
+        self.delay = sink_config.get("delay", 0)
+        
+    def deliver(self, text: str, draft: bool = False) -> bool:
+        import keyboard
+        keyboard.write(text, delay=self.delay)
+        return True
+        
+    def deliver_token(self, token: str):
+        self.deliver(token)
+        
+    def finish_stream(self, streamed: str, text: str) -> bool:
+        if streamed.strip() == text:
+            return True
+        # The final text is not what was typed (e.g. the LLM failed part way): retype it
+        import keyboard
+        for _ in range(len(streamed)):
+            keyboard.send("backspace")
+        return self.deliver(text)
+
+
+class FileSink(OutputSink):
+    """Appends each text to a file kept open for the life of the service; verify fsyncs"""
+    
+    name = "file"
+    
+    def __init__(self, sink_config: Dict[str, Any]):
+        super().__init__(sink_config)
+        self.path = os.path.expanduser(sink_config.get("path", "~/vibe-transcribe.txt"))
+        self.timestamps = sink_config.get("timestamps", True)
+        self._file = None
+        
+    def deliver(self, text: str, draft: bool = False) -> bool:
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        if self.timestamps:
+            self._file.write(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] ")
+        self._file.write(text + "\n")
+        self._file.flush()
+        if self.verify:
+            os.fsync(self._file.fileno())
+        return True
+        
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class StdoutSink(OutputSink):
+    name = "stdout"
+    accepts_tokens = True
+    
+    def deliver(self, text: str, draft: bool = False) -> bool:
+        sys.stdout.write(text + "\n")
+        sys.stdout.flush()
+        return True
+        
+    def deliver_token(self, token: str):
+        sys.stdout.write(token)
+        sys.stdout.flush()
+        
+    def finish_stream(self, streamed: str, text: str) -> bool:
+        if streamed.strip() == text:
+            return self.deliver("")  # End the streamed line
+        return self.deliver("\n" + text)
+
+
+class SocketSink(OutputSink):
+    """Sends one JSON line per text ({"text", "draft"}) over a persistent local connection.
+
+    Streamed LLM tokens are sent as {"token"} lines ahead of the final text.
+    address is "host:port" or a Unix socket path. A dropped connection is
+    re-established once per delivery.
+    """
+    
+    name = "socket"
+    accepts_drafts = True
+    accepts_tokens = True
+    
+    def __init__(self, sink_config: Dict[str, Any]):
+        super().__init__(sink_config)
+        self.address = sink_config.get("address", "127.0.0.1:9479")
+        self.timeout = sink_config.get("timeout", 2.0)
+        self._sock: Optional[socket.socket] = None
+        
+    def _connect(self) -> socket.socket:
+        if ":" in self.address and not self.address.startswith(("/", "~", ".")):
+            host, port = self.address.rsplit(":", 1)
+            sock = socket.create_connection((host, int(port)), timeout=self.timeout)
+        else:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(os.path.expanduser(self.address))
+        return sock
+        
+    def deliver(self, text: str, draft: bool = False) -> bool:
+        return self._send({"text": text, "draft": draft})
+        
+    def deliver_token(self, token: str):
+        self._send({"token": token})
+        
+    def _send(self, message: Dict[str, Any]) -> bool:
+        line = (json.dumps(message) + "\n").encode("utf-8")
+        for attempt in range(2):
+            try:
+                if self._sock is None:
+                    self._sock = self._connect()
+                self._sock.sendall(line)
+                return True
+            except OSError:
+                self.close()
+                if attempt:
+                    raise
+        return False
+        
+    def close(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+
+
+SINKS = {sink.name: sink for sink in (ClipboardSink, TypingSink, FileSink, StdoutSink, SocketSink)}
+
+
+class OutputRouter:
+    """Fans text out to every enabled sink, each on its own worker thread.
+
+    send() only queues the text and returns a Future for the primary (first
+    configured) sink, so callers can wait for the one destination the user is
+    watching while the rest finish in the background. stream() passes LLM
+    tokens to the sinks that accept them as they arrive, in order with the
+    sink's other deliveries, so typing can start at the first token; the next
+    final send() completes that stream. Each sink's delivery time is observed
+    as the output_<name> stage and failures are counted.
+    """
+    
+    def __init__(self, output_config: Dict[str, Any], metrics=None):
+        self.logger = logging.getLogger(__name__)
+        self.metrics = metrics  # Optional utils.metrics.Metrics for per-sink latency
+        self.sinks: List[OutputSink] = []
+        for name in output_config.get("sinks", ["clipboard"]):
+            if name not in SINKS:
+                raise ValueError(f"Unknown output sink: {name} (choose from {', '.join(SINKS)})")
+            self.sinks.append(SINKS[name](output_config.get(name) or {}))
+            
+        self._queues: Dict[str, "queue.Queue[Any]"] = {sink.name: queue.Queue() for sink in self.sinks}
+        self._streamed: Dict[str, List[str]] = {sink.name: [] for sink in self.sinks}  # Worker-owned
+        self._workers: Dict[str, threading.Thread] = {}
+        
+    @property
+    def primary(self) -> Optional[OutputSink]:
+        return self.sinks[0] if self.sinks else None
+        
+    def get_sink(self, name: str) -> Optional[OutputSink]:
+        return next((sink for sink in self.sinks if sink.name == name), None)
+        
+    def send(self, text: str, draft: bool = False, skip_drafted: bool = False) -> Optional[Future]:
+        """Queue text for every sink; returns the primary sink's Future (resolves to success).
+
+        skip_drafted leaves out sinks that accept drafts, for final text identical
+        to the draft they already received.
+        """
+        primary = None
+        for sink in self.sinks:
+            if sink.accepts_drafts if skip_drafted else (draft and not sink.accepts_drafts):
+                continue
+            future: Future = Future()
+            self._put(sink, (text, draft, future))
+            if sink is self.primary:
+                primary = future
+        return primary
+        
+    def stream(self, token: str):
+        """Queue one streamed LLM token for every sink that accepts tokens"""
+        for sink in self.sinks:
+            if sink.accepts_tokens:
+                self._put(sink, (token, None, None))
+                
+    def _put(self, sink: OutputSink, item):
+        worker = self._workers.get(sink.name)
+        if worker is None or not worker.is_alive():
+            worker = self._workers[sink.name] = threading.Thread(
+                target=self._work, args=(sink,), name=f"output-{sink.name}", daemon=True
+            )
+            worker.start()
+        self._queues[sink.name].put(item)
+        
+    def _work(self, sink: OutputSink):
+        sink_queue = self._queues[sink.name]
+        streamed = self._streamed[sink.name]
+        while True:
+            item = sink_queue.get()
+            if item is _STOP:
+                sink.close()
+                return
+            text, draft, future = item
+            if future is None:
+                try:
+                    sink.deliver_token(text)
+                    streamed.append(text)
+                except Exception as e:
+                    self.logger.error(f"Streaming to {sink.name} failed: {e}")
+                continue
+                
+            start = time.monotonic()
+            try:
+                if streamed and not draft:
+                    ok = sink.finish_stream("".join(streamed), text)
+                else:
+                    ok = sink.deliver(text, draft)
+            except Exception as e:
+                self.logger.error(f"Output to {sink.name} failed: {e}")
+                ok = False
+            if self.metrics is not None:
+                self.metrics.observe(f"output_{sink.name}", time.monotonic() - start)
+                if not ok:
+                    self.metrics.increment(f"output_{sink.name}_failed")
+            if not draft:
+                streamed.clear()
+            future.set_result(ok)
+            
+    def close(self, timeout: float = 5.0):
+        """Let the sinks finish queued text, then release their backends"""
+        for name, worker in self._workers.items():
+            if worker.is_alive():
+                self._queues[name].put(_STOP)
+        for worker in self._workers.values():
+            worker.join(timeout)